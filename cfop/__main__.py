@@ -0,0 +1,73 @@
+"""
+Solves scrambles from the command line, reading them one per line from
+files or stdin and writing the result of each as one JSON line to stdout:
+
+    python -m cfop scrambles.txt
+    cat scrambles.txt | python -m cfop --workers 4 > solves.jsonl
+
+A line is either a scramble in cubing notation (or the code syntax with
+--code) or the permutation of a scrambled cube as the 6 element list of 9 char
+strings from tools.dict_to_list, written like that list or as its 54 stickers.
+Blank lines are skipped.
+
+The lines are read only as the solver pool needs them (see
+solver.solve_many) so a file of any size is solved in the same memory. With
+--stats, the search stats of every solve added together are written to
+stderr as one JSON line at the end.
+"""
+import json
+import sys
+from argparse import ArgumentParser
+from fileinput import input as read_lines
+
+from cfop.formats import parse_scramble, to_json
+from cfop.search import SearchStats
+from cfop.solver import solve_many
+
+
+def main(argv=None):
+    """
+    Runs the command line solver with the arguments argv (sys.argv if None).
+    """
+    parser = ArgumentParser(prog='python -m cfop',
+                            description='Solves scrambles with CFOP and '
+                                        'writes one JSON line per solve.')
+    parser.add_argument('files', nargs='*', default=['-'],
+                        help="files of scrambles, one per line ('-' or none "
+                             'for stdin)')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='number of worker processes (default: one per '
+                             'CPU, 0 to solve in this process)')
+    parser.add_argument('-c', '--chunksize', type=int, default=16,
+                        help='scrambles sent to a worker at once')
+    parser.add_argument('--unordered', action='store_true',
+                        help='write the solves as they finish instead of in '
+                             'the order of the input')
+    parser.add_argument('--code', action='store_true',
+                        help='the scrambles are in the code syntax')
+    parser.add_argument('--max-nodes', type=int, default=None,
+                        help='most nodes each search can expand')
+    parser.add_argument('--time-limit', type=float, default=None,
+                        help='most seconds each search can take')
+    parser.add_argument('--stats', action='store_true',
+                        help='write the search stats of all the solves to '
+                             'stderr at the end')
+    args = parser.parse_args(argv)
+
+    search = SearchStats()
+    scrambles = (parse_scramble(line) for line in read_lines(args.files)
+                 if line.strip())
+    for result in solve_many(scrambles, args.workers, args.chunksize,
+                             not args.unordered, not args.code,
+                             args.max_nodes, args.time_limit):
+        print(to_json(result))
+        search += sum(result['stats'].values(), SearchStats())
+
+    if args.stats:
+        print(json.dumps(search.to_dict()), file=sys.stderr)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Contains the local database of the OLL and PLL algorithms so that they don't
+have to be scraped from the speedsolving wiki every time they are needed.
+
+The database is a JSON file (algs.json next to this file) holding a snapshot
+of the algorithms in the same form as is returned by oll_algs.scrape_algs and
+pll_algs.scrape_algs along with the version of its schema and the sha256
+checksum of the algorithms. It is loaded the first time it is needed.
+
+A new snapshot is only made by running this module, which scrapes the wiki,
+checks each algorithm by simulating it (see verify.py) and writes the
+algorithms that pass, best first.
+"""
+import hashlib
+import json
+import os
+from datetime import date
+
+DB_PATH = os.path.join(os.path.dirname(__file__), 'algs.json')
+SCHEMA_VERSION = 1
+
+_DB = {}
+
+
+def checksum(algs):
+    """
+    Returns the sha256 checksum of the algorithms of a database.
+    """
+    text = json.dumps(algs, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def load(path=None):
+    """
+    Returns the database at path (DB_PATH if None), reading it the first time
+    it is needed. Raises an exception if its schema version or checksum is
+    wrong.
+    """
+    path = path or DB_PATH
+    if path not in _DB:
+        with open(path) as db_file:
+            db = json.load(db_file)
+
+        if db.get('schema_version') != SCHEMA_VERSION:
+            raise Exception('The database {} has a schema version of '.format(
+                path) + '{} instead of {}.'.format(db.get('schema_version'),
+                                                   SCHEMA_VERSION))
+        if db.get('checksum') != checksum(db.get('algs')):
+            raise Exception('The checksum of the database {} '.format(path) +
+                            'does not match its algorithms.')
+
+        _DB[path] = db
+
+    return _DB[path]
+
+
+def get_algs(alg_set, path=None):
+    """
+    Returns a dict of the algs of each case of alg_set.
+
+    Parameters:
+    alg_set - Either 'oll' or 'pll'
+    path - (default None) The path of the database if not DB_PATH
+    """
+    algs = load(path)['algs'][alg_set]
+
+    # Copies so that the loaded database can't be changed
+    return {case: list(case_algs) for case, case_algs in algs.items()}
+
+
+def write(algs, path=None, source=''):
+    """
+    Writes a new database to path (DB_PATH if None).
+
+    Parameters:
+    algs - A dict with a dict of the algs of each case for 'oll' and 'pll'
+    path - (default None) The path to write to if not DB_PATH
+    source - (default '') Where the algs came from
+    """
+    path = path or DB_PATH
+    db = {'schema_version': SCHEMA_VERSION,
+          'created': date.today().isoformat(),
+          'source': source,
+          'checksum': checksum(algs),
+          'algs': algs}
+
+    # Write to a temporary file so a partial database is never loaded
+    with open(path + '.tmp', 'w') as db_file:
+        json.dump(db, db_file, indent=1)
+    os.replace(path + '.tmp', path)
+    _DB.pop(path, None)
+
+
+def refresh(path=None):
+    """
+    Scrapes the speedsolving wiki, verifies every alg and writes the ones
+    that pass, ranked, as the new database. Returns the rejected algs of
+    each set.
+    """
+    from cfop.algorithms import oll_algs, pll_algs
+    from cfop.algorithms.verify import verify
+
+    algs, rejected = {}, {}
+    for alg_set, module in [('oll', oll_algs), ('pll', pll_algs)]:
+        algs[alg_set], rejected[alg_set] = verify(module.scrape_algs(),
+                                                  alg_set)
+        if any(not case_algs for case_algs in algs[alg_set].values()):
+            raise Exception('No alg of some {} cases '.format(alg_set) +
+                            'passed, the database was not written.')
+
+    write(algs, path, 'https://www.speedsolving.com/wiki/index.php/')
+
+    return rejected
+
+
+if __name__ == '__main__':
+    for alg_set, bad_algs in refresh().items():
+        num_algs = sum(map(len, get_algs(alg_set).values()))
+        print('{}: {} algs written, {} rejected'.format(
+            alg_set.upper(), num_algs, len(bad_algs)))
+        for case, alg, reason in bad_algs:
+            print('    {}: {} {}'.format(case, alg, reason))
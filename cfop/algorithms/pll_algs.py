@@ -7,9 +7,6 @@ And creates a dict, where each entry is one PLL case
 """
 import re
 
-from bs4 import BeautifulSoup
-from requests import get
-
 
 ALG_CHARS = "ULFRBDulfrbdxyzMES()'23456789w "
 
@@ -30,6 +27,9 @@ def _get_tags():
     """
     Gets the appropriate tags from the website.
     """
+    from bs4 import BeautifulSoup
+    from requests import get
+
     soup = BeautifulSoup(
         get('https://www.speedsolving.com/wiki/index.php/PLL').content,
         'html.parser'
@@ -86,7 +86,17 @@ def _make_algs_readable(algs_dict):
 
 def get_algs():
     """
-    Does everything and returns the readable algs
+    Returns the readable algs from the local database (see database.py)
+    instead of the website.
+    """
+    from cfop.algorithms.database import get_algs as db_algs
+
+    return db_algs('pll')
+
+
+def scrape_algs():
+    """
+    Does everything and returns the readable algs scraped from the website
     """
     # 1) Gets the tags from the HTML
     alg_tags = _get_tags()
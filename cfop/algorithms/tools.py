@@ -3,6 +3,7 @@ Contains various useful functions that are used throughout this project.
 '''
 from string import ascii_lowercase, ascii_uppercase
 from random import choice
+import re
 
 import numpy as np
 
@@ -119,6 +120,102 @@ def code_to_alg(code):
     return alg
 
 
+# The code syntax turns of each kind for move_count
+ROTATION_CODES = 'xyzXYZ890'
+SLICE_CODES = 'Mm7'
+HALF_TURN_CODES = '!@#$%^1234567'
+METRICS = ['htm', 'stm', 'qtm']
+
+
+def move_count(code, metric='htm'):
+    """
+    Counts the moves of an algorithm in code syntax. Rotations are never
+    counted. The metrics are:
+        htm - (half turn metric) Every face turn is one move and a slice
+              turn is two moves
+        stm - (slice turn metric) Every face or slice turn is one move
+        qtm - (quarter turn metric) Every quarter face turn is one move so a
+              half turn is two moves and a slice turn is twice that
+
+    Parameters:
+    code - The algorithm in code syntax
+    metric - (default 'htm') One of 'htm', 'stm' or 'qtm'
+    """
+    if metric not in METRICS:
+        raise Exception("A metric of '{}' was chosen ".format(metric) +
+                        'which is not one of {}.'.format(METRICS))
+
+    count = 0
+    for turn in code:
+        if turn in ROTATION_CODES:
+            continue
+
+        moves = 1
+        if metric == 'qtm' and turn in HALF_TURN_CODES:
+            moves *= 2
+        if metric != 'stm' and turn in SLICE_CODES:
+            moves *= 2
+        count += moves
+
+    return count
+
+
+# Each clockwise turn or rotation in code syntax with its inverse
+INVERSE_TURNS = dict(zip('ULFRBDulfrbdMxyz', 'TKEQACtkeqacmXYZ'))
+INVERSE_TURNS.update({ccw: cw for cw, ccw in INVERSE_TURNS.items()})
+
+
+def invert_code(code):
+    """
+    Returns the inverse of an algorithm in code syntax, i.e. the algorithm
+    that undoes it.
+
+    Parameters:
+    code - The algorithm in code syntax to invert
+    """
+    return ''.join(INVERSE_TURNS.get(turn, turn) for turn in reversed(code))
+
+
+# One turn as written on the speedsolving wiki, e.g. R, Rw2, r', E or U2'
+WIKI_TURN = r"([ULFRBDMESxyzulfrbd])(w?)(\d*)('?)"
+# The E and S slices as the turns of the code syntax they are made of, with
+# the wide turn first (e.g. E = d D')
+SLICE_TURNS = {'E': 'dD', 'S': 'fF'}
+
+
+def wiki_to_code(alg):
+    """
+    Converts an algorithm as written on the speedsolving wiki (see
+    oll_algs.py and pll_algs.py) into the code syntax. Unlike alg_to_code,
+    this also allows wide turns written as Rw, the E and S slices, turns
+    such as U2' or U3, parentheses and algorithms without spaces.
+
+    Parameters:
+    alg - The algorithm to convert
+    """
+    if not re.fullmatch(r"(?:{}|[\s()])*".format(WIKI_TURN), alg):
+        raise Exception('Incorrect syntax; could not read the algorithm: ' +
+                        '{}'.format(alg))
+
+    code = ''
+    for face, wide, amount, prime in re.findall(WIKI_TURN, alg):
+        # Number of clockwise quarter turns
+        quarters = int(amount or 1) * (-1 if prime else 1) % 4
+        if not quarters:
+            continue
+
+        faces = [face.lower() if wide else face]
+        if face in SLICE_TURNS:
+            faces = SLICE_TURNS[face]
+
+        for n, turn in enumerate(faces):
+            # The second turn of a slice is turned the other way
+            turn_quarters = quarters if not n else -quarters % 4
+            code += alg_to_code(turn + ['', '', '2', "'"][turn_quarters])
+
+    return code
+
+
 def dict_to_list(cube_dict):
     """
     Given a the permutation of the cube as a dict (from a Cube object), this
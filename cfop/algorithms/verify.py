@@ -0,0 +1,126 @@
+"""
+Verifies the scraped OLL and PLL algorithms by simulating them and ranks the
+ones that pass.
+
+Every algorithm is undone from a solved cube, all at once on a CubeBatch, to
+give the case it solves. The case is then turned by each pre-AUF (and for PLL
+the solved cube by each post-AUF first) and the smallest of the keys of these
+(see oll.pattern and pll.signature) is the key of the case no matter how it
+is held. The case that most of the algorithms of a case name give is taken
+as the case the name claims and any algorithm that gives another case is
+broken. Two names can't claim the same case, so a name loses its case to
+any other name that claims it with at least as many algorithms. This keeps
+a name with a single broken algorithm from claiming the case of another.
+"""
+from collections import Counter
+
+from cfop.algorithms.tools import ROTATION_CODES, move_count, wiki_to_code
+from cfop.cube import CubeBatch
+from cfop.facelets import compile_alg, invert
+from cfop.oll import LAYER_FACELETS, center_preserving
+from cfop.pll import U_PERMS
+
+
+def rank_key(alg):
+    """
+    Returns what an alg is ranked by, fewest first: its HTM move count, its
+    STM move count and the number of rotations in it.
+
+    Parameters:
+    alg - The algorithm as written on the speedsolving wiki
+    """
+    code = wiki_to_code(alg)
+    return (move_count(code, 'htm'), move_count(code, 'stm'),
+            sum(turn in ROTATION_CODES for turn in code))
+
+
+def case_keys(codes, alg_set):
+    """
+    Simulates every alg at once and returns the step of the case each one
+    solves and the key of that case for any pre-AUF (and post-AUF for PLL).
+
+    Parameters:
+    codes - A list of center preserving algs in code syntax
+    alg_set - Either 'oll' or 'pll'
+    """
+    posts = range(4) if alg_set == 'pll' else [0]
+    combos = [(perm, post, pre) for perm in map(compile_alg, codes)
+              for post in posts for pre in range(4)]
+    num_aufs = 4 * len(posts)
+
+    batch = CubeBatch(len(combos))
+    batch.apply_perms([U_PERMS[post] for _, post, _ in combos])
+    batch.apply_perms([invert(perm) for perm, _, _ in combos])
+    # The step is taken before the pre-AUF since a pre-AUF can solve a PLL
+    steps = batch.find_steps()[::num_aufs]
+    batch.apply_perms([U_PERMS[pre] for _, _, pre in combos])
+
+    layers = batch.states[:, LAYER_FACELETS]
+    # The color index of the Up face is 0
+    if alg_set == 'oll':
+        layers = layers == 0
+    layers = layers.reshape(len(codes), num_aufs, -1)
+
+    return list(steps), [min(row.tobytes() for row in aufs)
+                         for aufs in layers]
+
+
+def verify(algs, alg_set):
+    """
+    Verifies every alg of every case and ranks the ones that pass by
+    rank_key. An alg fails if it can't be read, if its case isn't at the
+    alg_set step, if its case isn't the one most algs of its case solve or
+    if another case claims that one with at least as many algs.
+    Returns a dict of the ranked algs of each case and a list of
+    (case, alg, reason) of the ones that failed.
+
+    Parameters:
+    algs - A dict of the algs of each case as is returned by
+           oll_algs.get_algs or pll_algs.get_algs
+    alg_set - Either 'oll' or 'pll'
+    """
+    readable, rejected = [], []
+    for case, case_algs in algs.items():
+        for alg in case_algs:
+            try:
+                code = center_preserving(wiki_to_code(alg))
+            except Exception:
+                rejected.append((case, alg, 'could not be read'))
+                continue
+            readable.append((case, alg, code))
+
+    steps, keys = case_keys([code for _, _, code in readable], alg_set)
+
+    votes = {case: Counter() for case in algs}
+    for (case, _, _), step, key in zip(readable, steps, keys):
+        if step == alg_set:
+            votes[case][key] += 1
+    claimed = {case: counts.most_common(1)[0]
+               for case, counts in votes.items() if counts}
+    # The case each case lost its key to, the one with the most votes
+    lost = {}
+    for case, (key, count) in claimed.items():
+        rivals = [(other_count, other) for other, (other_key, other_count)
+                  in claimed.items()
+                  if other != case and other_key == key and
+                  other_count >= count]
+        if rivals:
+            lost[case] = max(rivals)[1]
+
+    ranked = {case: [] for case in algs}
+    for (case, alg, _), step, key in zip(readable, steps, keys):
+        if step != alg_set:
+            rejected.append((case, alg, 'is not at the {} step'.format(
+                alg_set)))
+        elif key != claimed[case][0]:
+            rejected.append((case, alg, 'solves another case'))
+        elif case in lost:
+            rejected.append((case, alg, 'solves the same case as {}'.format(
+                lost[case])))
+        else:
+            ranked[case].append(alg)
+
+    for case_algs in ranked.values():
+        case_algs.sort(key=rank_key)
+
+    return ranked, rejected
@@ -0,0 +1,317 @@
+"""
+Contains the benchmark suite of the solver, which times the basic
+operations and solves a fixed corpus of scrambles and fails when either got
+worse:
+
+    python -m cfop.benchmark            # compare to the saved baseline
+    python -m cfop.benchmark --save     # save the results as the baseline
+    python -m cfop.benchmark --record   # record the corpus' move and nodes
+
+The corpus (benchmark_corpus.json next to this file) is a versioned list of
+scrambles, each with the moves of its cross and F2L and the nodes their
+searches expanded. The searches are deterministic so these only change when
+the search does, in which case the corpus is recorded again on purpose. A
+run fails if the moves of a stage add up to more than recorded or its nodes
+to more than node_threshold more.
+
+Each microbenchmark (see MICROBENCHMARKS) is timed for a number of repeats
+and its median and percentiles are kept. The baseline (benchmark_results.json
+next to this file) holds the results of a saved run and a run fails if the
+throughput of a microbenchmark is more than threshold below it. Throughput
+depends on the machine so the baseline is never checked in: it is saved with
+--save on the machine that it is compared on and the throughput isn't
+compared until it has been.
+"""
+import json
+import os
+import sys
+from argparse import ArgumentParser
+from time import perf_counter
+
+import numpy as np
+
+from cfop.algorithms.tools import alg_to_code, code_to_alg, dict_to_list
+from cfop.cube import Cube
+from cfop.solver import Solver
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__),
+                           'benchmark_corpus.json')
+RESULTS_PATH = os.path.join(os.path.dirname(__file__),
+                            'benchmark_results.json')
+CORPUS_VERSION = 1
+# The percentiles of the time of each microbenchmark
+PERCENTILES = [10, 50, 90]
+# The recorded counts of each scramble of the corpus
+COUNTS = ['cross_moves', 'cross_nodes', 'f2l_moves', 'f2l_nodes']
+
+
+def load_corpus(path=None):
+    """
+    Returns the corpus at path (CORPUS_PATH if None). Raises an exception if
+    its version isn't CORPUS_VERSION.
+    """
+    path = path or CORPUS_PATH
+    with open(path) as corpus_file:
+        corpus = json.load(corpus_file)
+
+    if corpus.get('version') != CORPUS_VERSION:
+        raise Exception('The corpus {} has a version of {} instead of '.format(
+            path, corpus.get('version')) + '{}.'.format(CORPUS_VERSION))
+
+    return corpus
+
+
+def solve_counts(scramble):
+    """
+    Returns a dict of the moves and nodes of the cross and F2L of a scramble
+    in code syntax (see COUNTS).
+    """
+    cube = Solver()
+    cube.apply_alg(scramble)
+    cube.solve_cross()
+    cube.solve_f2l()
+
+    return {'cross_moves': len(cube.calg),
+            'cross_nodes': cube.stats['cross'].expanded,
+            'f2l_moves': sum(map(len, cube.falg)),
+            'f2l_nodes': cube.stats['f2l'].expanded}
+
+
+def record(path=None):
+    """
+    Records the counts of every scramble of the corpus at path (CORPUS_PATH
+    if None) with the current solver and writes it back.
+    """
+    path = path or CORPUS_PATH
+    corpus = load_corpus(path)
+    for entry in corpus['scrambles']:
+        entry.update(solve_counts(entry['scramble']))
+
+    with open(path, 'w') as corpus_file:
+        json.dump(corpus, corpus_file, indent=1)
+        corpus_file.write('\n')
+
+
+def _perm_after(scramble, stage=None):
+    """
+    Returns the list form of a cube after a scramble in code syntax and, if
+    stage is 'cross', after solving its cross.
+    """
+    cube = Solver()
+    cube.apply_alg(scramble)
+    if stage == 'cross':
+        cube.solve_cross()
+
+    return dict_to_list(cube.perm)
+
+
+def _turn_rotate(scrambles):
+    """
+    Times one turn of a cube in its dict form.
+    """
+    cube = Cube()
+    return lambda: cube.turn_rotate('cw', 'r')
+
+
+def _apply_alg(scrambles):
+    """
+    Times applying a scramble to a cube in its dict form.
+    """
+    cube = Cube()
+    return lambda: cube.apply_alg(scrambles[0])
+
+
+def _alg_to_code(scrambles):
+    """
+    Times reading a scramble in cubing notation.
+    """
+    alg = code_to_alg(scrambles[0])
+    return lambda: alg_to_code(alg)
+
+
+def _cross(scrambles):
+    """
+    Times solving the cross of every scramble.
+    """
+    perms = [_perm_after(scramble) for scramble in scrambles]
+    return lambda: [Solver(perm).solve_cross() for perm in perms]
+
+
+def _f2l(scrambles):
+    """
+    Times solving the F2L of every scramble after its cross.
+    """
+    perms = [_perm_after(scramble, 'cross') for scramble in scrambles]
+    return lambda: [Solver(perm).solve_f2l() for perm in perms]
+
+
+# Each microbenchmark as the function that takes the scrambles of the corpus
+# and returns the function that is timed, and the number of times it is
+# called per repeat (None for once, where each call solves every scramble)
+MICROBENCHMARKS = {'turn_rotate': (_turn_rotate, 1000),
+                   'apply_alg': (_apply_alg, 1000),
+                   'alg_to_code': (_alg_to_code, 1000),
+                   'cross': (_cross, None),
+                   'f2l': (_f2l, None)}
+
+
+def _timed(func, number, ops, repeats):
+    """
+    Returns the percentiles of the seconds per operation of repeats runs of
+    number calls of func that each do ops operations, and the throughput.
+    """
+    times = []
+    for _ in range(repeats):
+        t0 = perf_counter()
+        for _ in range(number):
+            func()
+        times.append((perf_counter() - t0) / (number * ops))
+
+    percentiles = np.percentile(times, PERCENTILES)
+    stats = {'p{}'.format(p): float(value)
+             for p, value in zip(PERCENTILES, percentiles)}
+    stats['ops_per_s'] = 1 / stats['p50']
+    return stats
+
+
+def run(corpus, repeats=5, names=None):
+    """
+    Runs the microbenchmarks and solves the corpus. Returns a dict of the
+    stats of each microbenchmark (see _timed) and the counts of each
+    scramble (see solve_counts).
+
+    Parameters:
+    corpus - The corpus as from load_corpus
+    repeats - (default 5) The number of times each microbenchmark is timed
+    names - (default None) The microbenchmarks to run, all if None
+    """
+    scrambles = [entry['scramble'] for entry in corpus['scrambles']]
+    micro = {}
+    for name in names or MICROBENCHMARKS:
+        setup, number = MICROBENCHMARKS[name]
+        micro[name] = _timed(setup(scrambles), number or 1,
+                             1 if number else len(scrambles), repeats)
+
+    return {'version': corpus['version'], 'micro': micro,
+            'counts': [solve_counts(scramble) for scramble in scrambles]}
+
+
+def compare(results, corpus, baseline=None, threshold=0.25,
+            node_threshold=0.1):
+    """
+    Returns a list of the regressions of results, each as a message. A stage
+    regresses if its moves over the corpus add up to more than recorded or
+    its nodes to more than node_threshold more. A microbenchmark regresses
+    if its throughput is more than threshold below the baseline.
+
+    Parameters:
+    results - The results as from run
+    corpus - The corpus the results were run on
+    baseline - (default None) The results of the baseline, throughput isn't
+               compared if None
+    threshold - (default 0.25) The fraction the throughput can drop by
+    node_threshold - (default 0.1) The fraction the nodes can grow by
+    """
+    regressions = []
+    for count in COUNTS:
+        expected = sum(entry[count] for entry in corpus['scrambles'])
+        actual = sum(counts[count] for counts in results['counts'])
+        allowed = expected * (1 + node_threshold) if 'nodes' in count \
+            else expected
+        if actual > allowed:
+            regressions.append('{} went from {} to {}'.format(
+                count, expected, actual))
+
+    if baseline is not None:
+        if baseline.get('version') != results['version']:
+            raise Exception('The baseline is of corpus version {} '.format(
+                baseline.get('version')) + 'instead of {}.'.format(
+                    results['version']))
+
+        for name, stats in results['micro'].items():
+            if name not in baseline['micro']:
+                continue
+            before = baseline['micro'][name]['ops_per_s']
+            if stats['ops_per_s'] < before * (1 - threshold):
+                regressions.append('{} went from {:.0f} to {:.0f} ops/s'
+                                   .format(name, before, stats['ops_per_s']))
+
+    return regressions
+
+
+def _report(results, baseline):
+    """
+    Prints the stats of each microbenchmark along with the change from the
+    baseline.
+    """
+    print('{:<12}{:>12}{:>12}{:>12}{:>12}{:>9}'.format(
+        'benchmark', 'p10 (ms)', 'p50 (ms)', 'p90 (ms)', 'ops/s', 'change'))
+    for name, stats in results['micro'].items():
+        change = ''
+        if baseline and name in baseline['micro']:
+            change = '{:+.1%}'.format(
+                stats['ops_per_s'] / baseline['micro'][name]['ops_per_s'] - 1)
+        print('{:<12}{:>12.4f}{:>12.4f}{:>12.4f}{:>12.0f}{:>9}'.format(
+            name, *[1000 * stats['p{}'.format(p)] for p in PERCENTILES],
+            stats['ops_per_s'], change))
+
+    for count in COUNTS:
+        print('{}: {}'.format(count, sum(counts[count]
+                                         for counts in results['counts'])))
+
+
+def main(argv=None):
+    """
+    Runs the benchmark suite with the arguments argv (sys.argv if None) and
+    returns 1 if anything regressed, otherwise 0.
+    """
+    parser = ArgumentParser(prog='python -m cfop.benchmark',
+                            description='Benchmarks the solver against a '
+                                        'saved baseline.')
+    parser.add_argument('--corpus', default=CORPUS_PATH)
+    parser.add_argument('--results', default=RESULTS_PATH,
+                        help='file of the baseline')
+    parser.add_argument('-r', '--repeats', type=int, default=5)
+    parser.add_argument('--only', nargs='+', choices=list(MICROBENCHMARKS),
+                        help='microbenchmarks to run (default: all)')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='fraction the throughput can drop by')
+    parser.add_argument('--node-threshold', type=float, default=0.1,
+                        help='fraction the nodes can grow by')
+    parser.add_argument('--save', action='store_true',
+                        help='save the results as the baseline')
+    parser.add_argument('--record', action='store_true',
+                        help='record the counts of the corpus first')
+    args = parser.parse_args(argv)
+
+    if args.record:
+        record(args.corpus)
+    corpus = load_corpus(args.corpus)
+    results = run(corpus, args.repeats, args.only)
+
+    baseline = None
+    if os.path.exists(args.results):
+        with open(args.results) as results_file:
+            baseline = json.load(results_file)
+    elif not args.save:
+        print('No baseline at {}, the throughput is not compared (save one '
+              'with --save).'.format(args.results))
+
+    _report(results, baseline)
+    if args.save:
+        with open(args.results, 'w') as results_file:
+            json.dump({'version': results['version'],
+                       'micro': results['micro']}, results_file, indent=1)
+            results_file.write('\n')
+        return 0
+
+    regressions = compare(results, corpus, baseline, args.threshold,
+                          args.node_threshold)
+    for regression in regressions:
+        print('Regression: {}'.format(regression))
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Contains the SolutionCache class which keeps the result of each stage of a
+solve keyed by the state of the cube so that solving a state again is a
+lookup instead of a search.
+
+A state is keyed by its facelet string (see facelets.py) read as a base 6
+number of the color indices, which packs the 54 stickers into 18 bytes. The
+stage and the options that change its result (e.g. the method) are part of
+the key so the cross and the F2L from a given cross are cached separately.
+
+There are two tiers. The memory tier is an LRU dict of the most recently
+used results. The disk tier is an optional sqlite database that every
+result is also written to and that is read when the memory tier misses, so
+it outlives the process and holds what the memory tier evicts.
+"""
+import json
+import sqlite3
+from collections import OrderedDict
+
+from cfop.facelets import dict_to_facelets
+
+# The color index of each sticker color as a base 6 digit
+_DIGITS = str.maketrans('wogrby', '012345')
+
+
+def state_key(perm):
+    """
+    Returns the 18 byte key of a permutation.
+
+    Parameters:
+    perm - The permutation of the cube in its dict form or as a facelet
+           string
+    """
+    facelets = perm if isinstance(perm, str) else dict_to_facelets(perm)
+    return int(facelets.translate(_DIGITS), 6).to_bytes(18, 'big')
+
+
+class SolutionCache:
+    """
+    This class caches the results of the stages of solves in an LRU memory
+    tier in front of an optional sqlite disk tier. A result is anything that
+    can be written as JSON.
+
+    Parameters:
+    size - (default 4096) The most results kept in memory
+    path - (default None) The path of the sqlite database of the disk tier,
+           no disk tier if None
+    """
+
+    def __init__(self, size=4096, path=None):
+        self.size = size
+        self.memory = OrderedDict()
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path)
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.execute('PRAGMA synchronous=NORMAL')
+            self.db.execute('CREATE TABLE IF NOT EXISTS results '
+                            '(stage TEXT, state BLOB, result TEXT, '
+                            'PRIMARY KEY (stage, state))')
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remember(self, key, result):
+        """
+        Puts a result in the memory tier, evicting the least recently used
+        one if it is full.
+        """
+        self.memory[key] = result
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.size:
+            self.memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, stage, perm):
+        """
+        Returns the result of stage for perm, or None if it isn't cached.
+
+        Parameters:
+        stage - The name of the stage along with any options that change its
+                result, e.g. 'cross/table'
+        perm - The permutation of the cube at the start of the stage, in its
+               dict form or as a facelet string
+        """
+        key = (stage, state_key(perm))
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.memory_hits += 1
+            return self.memory[key]
+
+        if self.db is not None:
+            row = self.db.execute(
+                'SELECT result FROM results WHERE stage = ? AND state = ?',
+                key).fetchone()
+            if row is not None:
+                result = json.loads(row[0])
+                self._remember(key, result)
+                self.disk_hits += 1
+                return result
+
+        self.misses += 1
+        return None
+
+    def put(self, stage, perm, result):
+        """
+        Caches the result of stage for perm in both tiers (see get).
+        """
+        key = (stage, state_key(perm))
+        self._remember(key, result)
+
+        if self.db is not None:
+            with self.db:
+                self.db.execute('INSERT OR REPLACE INTO results '
+                                'VALUES (?, ?, ?)',
+                                key + (json.dumps(result),))
+
+    def stats(self):
+        """
+        Returns a dict of the hits of each tier, the misses, the hit rate,
+        the evictions from the memory tier and the results in memory.
+        """
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+
+        return {'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'size': len(self.memory)}
+
+    def close(self):
+        """
+        Closes the disk tier.
+        """
+        if self.db is not None:
+            self.db.close()
+            self.db = None
@@ -2,9 +2,12 @@
 Contains the Cross class along with the CrossNode class used to find the
 cross algorithm via A* pathfinding.
 """
-from collections import deque
+from time import perf_counter
 
-from cfop.algorithms.alg_dicts import TURN_DICT, PARAM_DICT
+from cfop.facelets import FACELET_CUBIES, FACELET_INDEX
+from cfop.pruning import (CROSS_EDGES, EDGE_COORDS, EDGE_FACELETS,
+                          EDGE_MOVES, cross_table, descend, encode)
+from cfop.search import TURN_SPACE, Node, Search, SearchStats
 
 # So... looking good. Still some problems. Don't want to arbitrarilty restrict
 # it with the 9 move cutoff.
@@ -17,32 +20,57 @@ from cfop.algorithms.alg_dicts import TURN_DICT, PARAM_DICT
 # to me choosing one. Having no weight (i.e. a weight of 1) seems to work, so
 # I'll keep it for now.
 
+# The row of the edge move table of each turn
+_EDGE_TURNS = dict(zip(TURN_SPACE, EDGE_MOVES))
+# The distance from each edge state to each cross edge position
+_SLOT_DISTANCES = [[sum(abs(x - y) for x, y in zip(coord, slot))
+                    for slot in CROSS_EDGES] for coord in EDGE_COORDS]
+# If the D sticker of each edge state is wrongly flipped, which can only be
+# on the D or U face when the D sticker isn't on the D or U face
+_BAD_FLIP = [int(FACELET_CUBIES[n][0][1] != 0 and FACELET_CUBIES[n][1] != 1)
+             for n in EDGE_FACELETS]
+
 
 class Cross:
     """
     This class solves the cross on the Down face for a given permutation.
 
-    It solves it using an A* pathfinding algorithm where each new node is a
-    CrossNode object. The list containing the nodes is sorted via a
-    breadth-first binary tree where new nodes are appended and sorted up the
-    tree since only the node with the lowest metric is needed.
+    By default it looks up the exact number of turns left for the cross edges
+    in the cross pruning table (see pruning.py) and takes a turn that lowers
+    it until the cross is solved, which gives an optimal cross.
 
-    There is an artificial cutoff at 11 moves. Since over 11 moves are always
-    superfluous for a cross.
+    It can instead solve it using an A* pathfinding algorithm (see
+    search.Search) where each new node is a CrossNode object. There is an
+    artificial cutoff at 11 moves. Since over 11 moves are always
+    superfluous for a cross. If its budget runs out, the best cross found so
+    far is finished by descending the cross pruning table and optimal is set
+    to False. Either way the search.SearchStats of it are kept in stats.
 
     Parameters:
     perm - The full permutation of the cube in its dict form
+    method - (default 'table') Either 'table' to use the pruning table or
+             'astar' to use A* pathfinding
+    budget - (default None) The search.Budget of the A* pathfinding, the
+             table is always descended in full
     """
 
-    def __init__(self, perm):
+    def __init__(self, perm, method='table', budget=None):
         self.perm = perm
+        self.budget = budget
+        self.optimal = True
 
         self.d_color = ''.join(self.perm[(0, -1, 0)])
         self.init_perm = self._init_perm()
         self.solved_perm = self._solved_perm()
         self.solved_side_colors = self._solved_side_colors()
 
-        self.alg, self.open_sets, self.closed_sets = self._find_path()
+        if method == 'table':
+            self.alg, self.stats = self._table_path()
+        elif method == 'astar':
+            self.alg, self.stats = self._find_path()
+        else:
+            raise Exception("A method of '{}' was chosen ".format(method) +
+                            "which is not 'table' or 'astar'.")
 
     def _init_perm(self):
         """
@@ -93,148 +121,54 @@ class Cross:
 
         return side_colors
 
-    def _find_path(self):
+    def _edge_states(self):
         """
-        A* pathfinding algorithm to solve for the cube's cross.
+        Finds the state (see pruning.py) of each cross edge in the order of
+        the side colors: F R B L
         """
-        cn = CrossNode(self.init_perm, '', self.solved_perm,
-                       self.d_color, self.solved_side_colors)
-
-        # Every single layer face turn
-        turn_space = 'UT!LK@FE#RQ$BA%DC^'
-        self.open_set = deque([cn])
-        closed_set = []
-
-        while True:
-            # Take object with lowest f_cost
-            current = self.open_set[0]
-
-            # Find current turn_space
-            if current.alg:
-                turn = current.alg[-1]
-
-                last = turn_space.index(turn)
-                no_turn = last - (last % 3)
-                turn_space_current = (turn_space[:no_turn] +
-                                      turn_space[no_turn + 3:])
-
-                # Remove half of the mirror moves (e.g. RL = LR and so on)
-                if turn in 'UT!':
-                    turn_space_current = \
-                        turn_space_current.replace('DC^', '')
-                elif turn in 'LK@':
-                    turn_space_current = \
-                        turn_space_current.replace('RQ$', '')
-                elif turn in 'FE#':
-                    turn_space_current = \
-                        turn_space_current.replace('BA%', '')
-            else:
-                turn_space_current = turn_space
-
-            # Remove from open set
-            self.open_set.remove(current)
-            # Move last node to top of tree
-            self.open_set.rotate()
-            # Compare it downwards
-            self._move_down()
-            # Add to closed set
-            closed_set.append(current.edge_perm)
-
-            # Return if perm is equal to solved perm
-            if not current.abs_h_cost:
-                return current.alg, len(self.open_set), len(closed_set)
-
-            # Create new objects and put in open_set to
-            # check next if perm hasn't already been found
-            new_alg_len = len(current.alg) + 1
-            for turn in turn_space_current:
-                new_perm = current.apply_turn(turn)
-                new_alg = current.alg + turn
-
-                if new_perm in closed_set or new_alg_len == 11:
-                    continue
-
-                cn = CrossNode(new_perm, new_alg, self.solved_perm,
-                               self.d_color, self.solved_side_colors)
-                self._move_up(cn)
-
-    def _move_up(self, cn):
+        states = []
+        for color in self.solved_side_colors:
+            for coord, colors in self.init_perm.items():
+                if color in colors:
+                    facelet = FACELET_INDEX[(coord,
+                                             colors.index(self.d_color))]
+                    states.append(EDGE_FACELETS.index(facelet))
+
+        return states
+
+    def _table_path(self):
         """
-        Appends cn to the end of open_set and move it up the tree.
+        Solves the cross by descending the cross pruning table.
         """
-        self.open_set.append(cn)
+        t0 = perf_counter()
+        stats = SearchStats()
+        alg = descend(cross_table(), [EDGE_MOVES] * 4, self._edge_states(),
+                      stats)
+        stats.time = perf_counter() - t0
 
-        while True:
-            # Node info, compare f_cost and h_cost at the same time
-            cn_ind = self.open_set.index(cn)
-            cn_val = cn.f_cost + cn.h_cost/100
+        return alg, stats
 
-            # If index is 0, can't move up anymore
-            if not cn_ind:
-                return
+    def _find_path(self):
+        """
+        A* pathfinding algorithm to solve for the cube's cross.
+        """
+        t0 = perf_counter()
+        cn = CrossNode(tuple(self._edge_states()))
 
-            # The position above node n is int half of (n - 1)
-            cn_up_ind = (cn_ind - 1) // 2
-            cn_up = self.open_set[cn_up_ind]
-            cn_up_val = cn_up.f_cost + cn_up.h_cost/100
+        search = Search(cn, max_len=11, budget=self.budget)
+        goal = search.run()
 
-            # Compare values
-            if cn_val < cn_up_val:
-                self._swap(cn_ind, cn_up_ind)
-            else:
-                return
+        alg = goal.alg
+        if not search.optimal:
+            self.optimal = False
+            alg += descend(cross_table(), [EDGE_MOVES] * 4, goal.states,
+                           search.stats)
+        search.stats.time = perf_counter() - t0
 
-    def _move_down(self):
-        """
-        Sorts the top node down the heap.
-        """
-        set_len = len(self.open_set)
-
-        # Don't run if open_set is empty
-        if not set_len:
-            return
-
-        fn = self.open_set[0]
-        fn_val = fn.f_cost + fn.h_cost/100
-
-        while True:
-            fn_ind = self.open_set.index(fn)
-
-            left_ind = 2 * fn_ind + 1
-            right_ind = left_ind + 1
-
-            # Check if left node exists, if not we are finished
-            if set_len > left_ind:
-                left = self.open_set[left_ind]
-                left_val = left.f_cost + left.h_cost/100
-            else:
-                return
-
-            # Check if right node exists
-            if set_len > right_ind:
-                right = self.open_set[right_ind]
-                right_val = right.f_cost + right.h_cost/100
-            else:
-                right = None
-
-            # Left value must be less and either there is no right node or
-            # the left node is the lower choice
-            if (left_val < fn_val) and \
-                (right is None or left_val <= right_val):
-                self._swap(fn_ind, left_ind)
-            elif right is not None and right_val < fn_val:
-                self._swap(fn_ind, right_ind)
-            else:
-                return
-
-    def _swap(self, i, j):
-        """
-        Swaps elements at i and j in open_set
-        """
-        self.open_set[i], self.open_set[j] = self.open_set[j], self.open_set[i]
+        return alg, search.stats
 
 
-class CrossNode:
+class CrossNode(Node):
     """
     The class represents a node in the A* algorithm.
 
@@ -250,137 +184,61 @@ class CrossNode:
     the h_cost which is used everywhere else. The f_cost is the total metric
     which also sums the current length of the algorithm as a factor.
 
-    Moves are applied to the cube like usual, but only the four cross edges
-    are moved since the permuation of the other cubies is irrelevant.
+    Only the four cross edges are tracked, each by its state (see pruning.py)
+    in the order of the side colors: F R B L. A turn is then a lookup in the
+    edge move table and the metrics are sums of precomputed distances.
 
     Parameters:
-    edge_perm - The permutation of just the four cross edges in dict form
-    alg - The alg used to obtain this current edge_perm from the initial perm
-          of the cube
-    solved_perm - The color-first dict of the permutation of the edges if they
-                   were solved
-    d_color - The color of the Down face (i.e. of the cross being solved)
-    solved_side_colors - A 4-element list of the side colors of the cross in
-                         the order: F R D L to use as a reference for relative
-                         positions of the current cross edge pieces
+    states - The tuple of the states of the four cross edges
+    parent - (default None) The CrossNode this one was found from
+    turn - (default '') The turn from parent to this node
+    key - (default None) The state_key of states if already known
     """
+    __slots__ = ('states',)
 
-    def __init__(self, edge_perm, alg, solved_perm, d_color,
-                 solved_side_colors):
-        # Constant for every CrossNode object
-        self.solved_perm = solved_perm
-        self.d_color = d_color
-
-        # Constant for each CrossNode object
-        self.edge_perm = edge_perm
-        self.solved_side_colors = solved_side_colors
-        self.cross_edges = self._cross_edges()
-        self.alg = alg
+    def __init__(self, states, parent=None, turn='', key=None):
+        super().__init__(parent, turn, key or self.state_key(states))
+        self.states = states
 
         # Metrics
         # A factor of 2 because a bad flip is equivalent to a metric score
         # of 2. So each bad edge adds 2 to the metric
-        self.flip_penalty = 2 * self._flip_penalty()
-        self.g_cost = len(self.alg)
-        self.rel_h_cost, self.abs_h_cost = self._all_metrics()
-        self.abs_h_cost += self.flip_penalty
-        self.h_cost = self.rel_h_cost + self.flip_penalty
+        flip_penalty = 2 * sum(_BAD_FLIP[state] for state in states)
+        rel_h_cost, abs_h_cost = self._all_metrics()
+        self.abs_h_cost = abs_h_cost + flip_penalty
+        self.h_cost = rel_h_cost + flip_penalty
         self.f_cost = self.h_cost + self.g_cost
 
-    def _cross_edges(self):
-        """
-        Cross edge dict by (k, v) = (color, coord).
-        """
-        cross_edge_dict = {}
-        for coord, colors in self.edge_perm.items():
-            colors_copy = colors.copy()
-            colors_copy.remove(self.d_color)
-            colors_copy.remove('')
-
-            cross_edge_dict[colors_copy[0]] = coord
-
-        return cross_edge_dict
-
-    def _flip_penalty(self):
-        """
-        Counts number of edge pieces that are wrongly flipped.
-        """
-        bad_flip = 0
-
-        for coord, colors in self.edge_perm.items():
-            # Can only be wrongly flipped if on D or U face
-            if coord[1] != 0:
-                # But white sticker isn't on D or U face
-                if self.d_color in [colors[0], colors[2]]:
-                    bad_flip += 1
-
-        return bad_flip
-
     def _all_metrics(self):
         """
         Finds the metric for each relative position of the side center pieces
         and returns the value for the minimum of these along with the metric
         for the absolute position.
         """
-        # Find the absolute metric
-        abs_tot_distance = self._metric(self.solved_perm)
-
-        min_tot_distance = 100
-        # Try each of the 3 remaining relative positions
-        # (rotations of side centers)
-        for turn in range(1, 4):
-            rel_solved_perm = {}
-            # Rotate colors in side edge dict
-            for n, color in enumerate(self.solved_side_colors):
-                new_color = self.solved_side_colors[(n + turn) % 4]
-                rel_solved_perm[new_color] = self.solved_perm[color]
-
-            # Calculate metric for new dict
-            tot_distance = self._metric(rel_solved_perm)
+        # Rotating the side centers by turn moves the edge solved in slot n
+        # to slot n - turn
+        metrics = [sum(_SLOT_DISTANCES[state][(n - turn) % 4]
+                       for n, state in enumerate(self.states))
+                   for turn in range(4)]
 
-            # Keep value if is less than current minimum
-            if tot_distance < min_tot_distance:
-                min_tot_distance = tot_distance
+        return min(metrics), metrics[0]
 
-        return min(min_tot_distance, abs_tot_distance), abs_tot_distance
-
-    def _metric(self, end_pos):
+    def apply_turn(self, turn):
         """
-        Sums the difference of each coordinate dimension
+        Returns the states of the edges after applying turn.
         """
-        tot_distance = 0
-
-        for color, coord in self.cross_edges.items():
-            tot_distance += sum(map(lambda x, y: abs(x - y),
-                                    coord, end_pos[color]))
-
-        return tot_distance
+        moves = _EDGE_TURNS[turn]
+        return tuple(moves[state] for state in self.states)
 
-    def _turn_rotate(self, ttype, side):
+    @staticmethod
+    def state_key(states):
         """
-        Applies a turn to the 4 cubies analgous to the Cube class method. Here,
-        a new dict is returned (with the 4 cubies' new coordinates) instead of
-        updating current perm.
+        Encoding of states used for the closed set.
         """
-        # Get the right parameters for the cubie rotation
-        p = PARAM_DICT[ttype][side]
-        new_perm = {}
+        return encode(states)
 
-        turning_layers = [p[1]]
-
-        for coord, color in self.edge_perm.items():
-            if coord[p[0]] in turning_layers:
-                new_perm[(p[2]*coord[p[3]],
-                          p[4]*coord[p[5]],
-                          p[6]*coord[p[7]])] = \
-                          [color[p[3]], color[p[5]], color[p[7]]]
-            else:
-                new_perm[coord] = color
-
-        return new_perm
-
-    def apply_turn(self, turn):
+    def child(self, turn, states, key=None):
         """
-        Analgous to Cube class method except only works for one turn at a time.
+        Returns the CrossNode reached by applying turn which gives states.
         """
-        return self._turn_rotate(*TURN_DICT[turn])
+        return CrossNode(states, self, turn, key)
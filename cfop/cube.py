@@ -7,7 +7,10 @@ import numpy as np
 from mpl_toolkits.mplot3d import Axes3D
 
 from cfop.algorithms.tools import alg_to_code
-from cfop.algorithms.alg_dicts import PARAM_DICT, TURN_DICT
+from cfop.algorithms.alg_dicts import TURN_DICT
+from cfop.facelets import (CUBIE_FACELETS, FACE_CENTERS, FACELET_INDEX,
+                           MOVE_PERMS, TURN_PERMS, apply_perm, compile_alg,
+                           dict_to_facelets, facelets_to_dict, turned_cubies)
 
 
 class Cube:
@@ -32,14 +35,25 @@ class Cube:
     This permutation is translated into the dict by the _convert_perm method
     to make the input of custom permuations simpler.
 
+    If compact is True, the cube is instead stored as a 54 char facelet string
+    (the six strings above joined together, see facelets.py) and each turn is
+    a single gather of a precomputed sticker permutation. The dict form is
+    then only built when perm is accessed and is cached until the next turn.
+    In this case perm should be treated as read-only since changes to it are
+    not written back to the facelets.
+
     Parameters:
     perm - (default 0) The permuation of the cube as described above. If no
            perm is given, a solved cube is assumed with a white Up face and
            green Front face. Perm can also be given as a dict that does not
            need to be converted.
+    compact - (default False) If True, the compact facelet state is used
     """
 
-    def __init__(self, perm=0):
+    def __init__(self, perm=0, compact=False):
+        self.compact = compact
+        self._perm, self.facelets = None, None
+
         if isinstance(perm, dict):
             self.perm = perm
         else:
@@ -47,7 +61,26 @@ class Cube:
                 perm = ['wwwwwwwww', 'ooooooooo', 'ggggggggg',
                         'rrrrrrrrr', 'bbbbbbbbb', 'yyyyyyyyy']
 
-            self.perm = self._convert_perm(perm)
+            if compact:
+                self.facelets = ''.join(perm)
+            else:
+                self.perm = self._convert_perm(perm)
+
+    @property
+    def perm(self):
+        """
+        The permutation of the cube in its dict form. For a compact cube this
+        is built from the facelets the first time it is needed after a turn.
+        """
+        if self._perm is None:
+            self._perm = facelets_to_dict(self.facelets)
+        return self._perm
+
+    @perm.setter
+    def perm(self, perm):
+        self._perm = perm
+        if self.compact:
+            self.facelets = dict_to_facelets(perm)
 
     @staticmethod
     def _convert_perm(perm):
@@ -133,45 +166,21 @@ class Cube:
             raise Exception('An incorrect side of {} was chosen'.format(side) +
                             'It is not the middle slice or a rotation.')
 
-        # Checks if it's a rotation or turn
-        rotate = side in ['x', 'y', 'z']
-
-        # Finds equivalent face to turn
-        if side in ['x', 'y', 'z', 'm']:
-            equiv_face = {'x': 'r', 'y': 'u', 'z': 'f', 'm': 'l'}
-            face = equiv_face[side]
+        if self.compact:
+            self.facelets = apply_perm(self.facelets,
+                                       MOVE_PERMS[(ttype, side, dl)])
+            self._perm = None
         else:
-            face = side
-
-        # Get the right parameters for the cubie rotation
-        p = PARAM_DICT[ttype][face]
-        new_coords = {}
-
-        # Choose correct layers to rotate
-        if dl:
-            turning_layers = [0, p[1]]
-        elif side == 'm':
-            turning_layers = [0]
-        elif rotate:
-            turning_layers = [-1, 0, 1]
-        else:
-            turning_layers = [p[1]]
-
-        for cubie, colors in self.perm.copy().items():
-            if cubie[p[0]] in turning_layers:
-                new_coords[(p[2]*cubie[p[3]],
-                            p[4]*cubie[p[5]],
-                            p[6]*cubie[p[7]])] = \
-                            [colors[p[3]], colors[p[5]], colors[p[7]]]
-
-        # Updates the coordinates and colors
-        self.perm.update(new_coords)
+            # Updates the coordinates and colors
+            self.perm.update(turned_cubies(self.perm, ttype, side, dl))
 
     def apply_alg(self, alg, alg_input=False):
         """
         Applies the algorithm alg to the cube. The alg can
         either be written as a cubing algorithm or as the
-        code syntax.
+        code syntax. Algorithms of more than one turn are
+        compiled (and cached) into a single permutation of
+        the stickers which is applied all at once.
 
         Parameters:
         alg - Algorithm to apply to the cube
@@ -183,8 +192,21 @@ class Cube:
         if alg_input:
             alg = alg_to_code(alg)
 
-        for turn in alg:
-            self.turn_rotate(*TURN_DICT[turn])
+        if len(alg) < 2:
+            for turn in alg:
+                self.turn_rotate(*TURN_DICT[turn])
+            return
+
+        facelets = self.facelets if self.compact else \
+            dict_to_facelets(self.perm)
+        facelets = apply_perm(facelets, compile_alg(alg))
+
+        if self.compact:
+            self.facelets = facelets
+            self._perm = None
+        else:
+            # Update in place so references to perm stay valid
+            self.perm.update(facelets_to_dict(facelets))
 
     def graph_cube(self, gap_color='k', gap_width=2, bg_color='w',
                    w='ghostwhite', y='gold', g='forestgreen',
@@ -240,3 +262,192 @@ class Cube:
                                 color=perm_colors[cubie][2])
 
         plt.show()
+
+
+class CubeBatch:
+    """
+    Class which holds N cubes at once as an (N, 54) uint8 NumPy array so that
+    a turn, a different turn for each cube or a whole algorithm is applied to
+    every cube with one vectorized gather.
+
+    Each row is the facelet form of a cube (see facelets.py) where each
+    sticker is stored as the index of its color in COLORS.
+
+    Parameters:
+    perms - (default 1) Either the number of solved cubes to create, an
+            (N, 54) array of color indices or a sequence of permutations
+            where each one is a Cube, a facelet string, a 6 element list as
+            in the Cube class or a dict
+    """
+    COLORS = 'wogrby'
+
+    # Color index of each ascii character (255 for non colors)
+    _ENCODE = np.full(256, 255, np.uint8)
+    _ENCODE[np.frombuffer(COLORS.encode(), np.uint8)] = range(len(COLORS))
+    _DECODE = np.frombuffer(COLORS.encode(), np.uint8)
+
+    # Permutation of each code syntax turn as rows and the row for each char
+    _TURN_CODES = ''.join(TURN_PERMS)
+    _TURN_TABLE = np.array([TURN_PERMS[turn] for turn in _TURN_CODES],
+                           np.int32)
+    _TURN_INDEX = np.full(256, -1, np.intp)
+    _TURN_INDEX[np.frombuffer(_TURN_CODES.encode(), np.uint8)] = \
+        range(len(_TURN_CODES))
+
+    def __init__(self, perms=1):
+        if isinstance(perms, int):
+            perms = [Cube(compact=True).facelets] * perms
+        elif isinstance(perms, np.ndarray):
+            self.states = perms.astype(np.uint8).reshape(-1, 54)
+            return
+
+        facelets = ''.join(map(self._to_facelets, perms))
+        codes = self._ENCODE[np.frombuffer(facelets.encode(), np.uint8)]
+        if len(codes) % 54:
+            raise Exception('Every perm must have 54 stickers.')
+        if (codes == 255).any():
+            raise Exception('Found a color that is not one of ' +
+                            "'{}' in the passed perms.".format(self.COLORS))
+
+        self.states = codes.reshape(-1, 54)
+
+    @staticmethod
+    def _to_facelets(perm):
+        """
+        Converts any of the accepted forms of a permutation to facelets.
+        """
+        if isinstance(perm, Cube):
+            return perm.facelets if perm.compact else \
+                dict_to_facelets(perm.perm)
+        if isinstance(perm, dict):
+            return dict_to_facelets(perm)
+        if isinstance(perm, str):
+            return perm
+        return ''.join(perm)
+
+    def __len__(self):
+        return len(self.states)
+
+    def turn(self, turn):
+        """
+        Applies one turn or rotation, given in code syntax, to every cube.
+        """
+        self.states = self.states[:, TURN_PERMS[turn]]
+
+    def apply_turns(self, turns):
+        """
+        Applies a different turn to each cube, i.e. turns[i] is applied to
+        the ith cube.
+
+        Parameters:
+        turns - A string of N code syntax characters
+        """
+        if len(turns) != len(self):
+            raise Exception('Got {} turns for {} cubes.'.format(
+                len(turns), len(self)))
+
+        rows = self._TURN_INDEX[np.frombuffer(turns.encode(), np.uint8)]
+        if (rows < 0).any():
+            raise Exception("Incorrect syntax; found a turn that isn't " +
+                            'code syntax in: {}'.format(turns))
+
+        self.apply_perms(self._TURN_TABLE[rows])
+
+    def apply_perms(self, perms):
+        """
+        Applies a different permutation to each cube, i.e. perms[i] is
+        applied to the ith cube.
+
+        Parameters:
+        perms - An (N, 54) array or a sequence of N permutations as given by
+                facelets.compile_alg
+        """
+        if len(perms) != len(self):
+            raise Exception('Got {} perms for {} cubes.'.format(
+                len(perms), len(self)))
+
+        # Gather from the flattened states with each row offset by 54
+        index = np.array(perms, np.int32).reshape(-1, 54)
+        index += np.arange(0, 54 * len(self), 54, dtype=np.int32)[:, None]
+        self.states = self.states.reshape(-1)[index]
+
+    def apply_algs(self, algs, alg_input=False):
+        """
+        Applies a different algorithm to each cube, i.e. algs[i] is applied
+        to the ith cube.
+
+        Parameters:
+        algs - A sequence of N algorithms
+        alg_input - (default False) If True, will assume the algs are written
+                    in cubing notation. If False, will assume they are written
+                    as the code syntax
+        """
+        self.apply_perms([compile_alg(alg, alg_input) for alg in algs])
+
+    def apply_alg(self, alg, alg_input=False):
+        """
+        Applies the algorithm alg to every cube with a single gather of its
+        compiled permutation.
+
+        Parameters:
+        alg - Algorithm to apply to the cubes
+        alg_input - (default False) If True, will assume alg is written in
+                    cubing notation. If False, will assume alg is written as
+                    the code syntax
+        """
+        self.states = self.states[:, compile_alg(alg, alg_input)]
+
+    def _correct(self):
+        """
+        Returns an (N, 54) bool array of which stickers match the center of
+        their face, i.e. are where they would be on the solved cube.
+        """
+        return self.states == self.states[:, FACE_CENTERS]
+
+    # Facelets of the cubies checked for each step as in Solver.find_step:
+    # the cross edges, the other F2L cubies, the U stickers of the U cubies
+    # and all stickers of the U cubies
+    _STEP_FACELETS = [
+        [n for cubie, facelets in CUBIE_FACELETS.items() for n in facelets
+         if cubie[1] == -1 and cubie.count(0) == 1],
+        [n for cubie, facelets in CUBIE_FACELETS.items() for n in facelets
+         if cubie[1] != 1 and cubie.count(0) == 0 or
+         cubie[1] == 0 and cubie.count(0) == 1],
+        [FACELET_INDEX[(cubie, 1)] for cubie in CUBIE_FACELETS
+         if cubie[1] == 1 and cubie.count(0) != 2],
+        [n for cubie, facelets in CUBIE_FACELETS.items() for n in facelets
+         if cubie[1] == 1 and cubie.count(0) != 2]]
+
+    def find_steps(self):
+        """
+        The batched equivalent of Solver.find_step. Returns an array of the
+        step each cube is at, one of: 'cross', 'f2l', 'oll', 'pll', 'solved'.
+        """
+        correct = self._correct()
+        cross, f2l, oll, pll = [correct[:, facelets].all(axis=1)
+                                for facelets in self._STEP_FACELETS]
+
+        return np.select([cross & f2l & oll & pll, cross & f2l & oll,
+                          cross & f2l, cross],
+                         ['solved', 'pll', 'oll', 'f2l'], 'cross')
+
+    def is_solved(self):
+        """
+        Returns a bool array of which cubes are solved.
+        """
+        return self._correct().all(axis=1)
+
+    def facelets(self):
+        """
+        Returns the facelet string of every cube as a list.
+        """
+        chars = self._DECODE[self.states].tobytes().decode()
+        return [chars[n:n + 54] for n in range(0, len(chars), 54)]
+
+    def to_lists(self):
+        """
+        The batched equivalent of tools.dict_to_list. Returns the 6 element
+        list of 9 char strings of every cube as a list.
+        """
+        return [[facelets[n:n + 9] for n in range(0, 54, 9)]
+                for facelets in self.facelets()]
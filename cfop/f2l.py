@@ -2,18 +2,40 @@
 Contains the F2L class along with the F2LNode class used to find the
 F2L algorithm via A* pathfinding.
 """
-from collections import deque
+from copy import copy
 from operator import add
 from itertools import permutations
+from time import perf_counter
 
 from cfop.algorithms.alg_dicts import TURN_DICT, PARAM_DICT
+from cfop.facelets import FACELET_INDEX
+from cfop.pruning import (CORNER_COORDS, CORNER_FACELETS, CORNER_MOVES,
+                          CROSS_EDGES, CROSS_GOAL, EDGE_COORDS, EDGE_FACELETS,
+                          EDGE_MOVES, cross_table, encode, slot_goal,
+                          slot_table)
+from cfop.search import (GREEDY_TURNS, NEXT_TURNS, TURN_SPACE, Node, Search,
+                         SearchStats)
 
-# DEBUGGING
-import time
-from datetime import datetime as dt
-from pprint import pprint
-from cfop.algorithms.tools import code_to_alg, alg_to_code
-################################################
+
+def _distances(coords):
+    """
+    Returns the table of the sum of the difference of each coordinate
+    dimension between every two states.
+    """
+    return [[sum(abs(x - y) for x, y in zip(start, end)) for end in coords]
+            for start in coords]
+
+
+EDGE_DISTANCES = _distances(EDGE_COORDS)
+CORNER_DISTANCES = _distances(CORNER_COORDS)
+
+# The turns that move each slot keyed by the coordinate of its edge. Each
+# group of four is no turn and the quarter, half and inverse quarter turn of
+# one of the two faces of the slot
+SLOT_TURNS = {(-1, 0,  1): ['', 'L', '@', 'K', '', 'F', '#', 'E'],
+              ( 1, 0,  1): ['', 'R', '$', 'Q', '', 'F', '#', 'E'],
+              (-1, 0, -1): ['', 'L', '@', 'K', '', 'B', '%', 'A'],
+              ( 1, 0, -1): ['', 'R', '$', 'Q', '', 'B', '%', 'A']}
 
 
 class F2L:
@@ -21,10 +43,22 @@ class F2L:
     The class solves the F2L by solving the four pairs one after each other.
     The order used is determined by f2l_pairs.
 
-    It solves it using an A* pathfinding algorithm where each new node is an
-    F2LNode object. The list containing the nodes is sorted via a heap where
-    new nodes are appended and sorted up the tree since only the node with the
-    lowest metric is needed.
+    By default each pair is solved optimally by an iterative deepening A*
+    search whose heuristic is the most turns needed by any of the cross
+    pruning table and the F2L slot pruning tables of the pairs solved so far
+    and of the current pair (see pruning.py). These are the exact number of
+    turns needed for their pieces alone so the cross and the solved slots are
+    kept as the search can only stop once every one of them is 0.
+
+    It can instead solve it using an A* pathfinding algorithm (see
+    search.Search) where each new node is an F2LNode object.
+
+    Every pair is searched within the one budget. Once it runs out, each
+    pair uses the closest alg found so far taken greedily closer to solved,
+    which may not solve the pair, and optimal is set to False.
+
+    The search.SearchStats of the search of each pair are kept in pair_stats
+    and their sum is stats.
 
     Parameters:
     perm - The full permutation of the cube in dict form
@@ -32,15 +66,27 @@ class F2L:
                 ['go', 'gr', 'bo', 'br'] which will solve in the order:
                 green-orange, green-red, blue-orange, blue-red. The order
                 of the characters in the string does not matter.
+    method - (default 'table') Either 'table' to use the pruning tables or
+             'astar' to use A* pathfinding
+    budget - (default None) The search.Budget shared by the search of every
+             pair, no limit if None
     """
 
-    def __init__(self, perm, f2l_pairs):
+    def __init__(self, perm, f2l_pairs, method='table', budget=None):
+        if method not in ['table', 'astar']:
+            raise Exception("A method of '{}' was chosen ".format(method) +
+                            "which is not 'table' or 'astar'.")
+        self.method = method
+        self.budget = budget
+        self.optimal = True
+
         # New form to store cube, probs will use for every part but for now
         # it's just here in F2L class
         self.perm = {self._cubie_key(color): (list(coord), color)
                      for coord, color in perm.items()}
 
-        self.algs, self.open_setss, self.closed_setss = [], [], []
+        self.f2l_pairs = []
+        self.algs, self.pair_stats = [], []
 
         # Down and Up face colors
         self.d_color = ''.join(perm[(0, -1, 0)])
@@ -57,19 +103,60 @@ class F2L:
         self.goal_perm = self.cross.copy()
 
         for f2l_pair in f2l_pairs:
-            # Add current/solved position to init_perm/goal_perm, respectively
-            self._add_pair(f2l_pair)
+            self.solve_pair(f2l_pair)
+
+    @property
+    def stats(self):
+        """
+        The search.SearchStats of the searches of the pairs solved so far.
+        """
+        return sum(self.pair_stats, SearchStats())
+
+    @property
+    def moves(self):
+        """
+        The total number of turns used for the pairs solved so far.
+        """
+        return sum(map(len, self.algs))
 
-            # Find alg to solve for F2L pair
-            alg, open_sets, closed_sets = self._find_path(f2l_pair)
-            self.algs.append(alg)
-            self.open_setss.append(open_sets)
-            self.closed_setss.append(closed_sets)
+    def solve_pair(self, f2l_pair):
+        """
+        Solves the next F2L pair, keeping the cross and any pairs already
+        solved.
+
+        Parameters:
+        f2l_pair - F2L pair to solve in the form of a 2 char string
+                   (e.g. 'br' for the blue-red F2L pair)
+        """
+        # Add current/solved position to init_perm/goal_perm, respectively
+        self._add_pair(f2l_pair)
+
+        # Find alg to solve for F2L pair
+        if self.method == 'table':
+            alg, stats = self._table_path(f2l_pair)
+        else:
+            alg, stats = self._find_path(f2l_pair)
+        self.f2l_pairs.append(f2l_pair)
+        self.algs.append(alg)
+        self.pair_stats.append(stats)
+
+        # Update init_perm as goal_perm
+        self.init_perm = self.goal_perm.copy()
+        # Update perm with alg used to solve first F2L pair
+        self._apply_alg(alg)
+
+    def copy(self):
+        """
+        Returns a copy that can go on to solve different pairs than this one.
+        The dict values are never changed in place so shallow copies are
+        enough.
+        """
+        f2l = copy(self)
+        for attr in ['perm', 'init_perm', 'goal_perm', 'f2l_pairs', 'algs',
+                     'pair_stats']:
+            setattr(f2l, attr, getattr(self, attr).copy())
 
-            # Update init_perm as goal_perm
-            self.init_perm = self.goal_perm.copy()
-            # Update perm with alg used to solve first F2L pair
-            self._apply_alg(alg)
+        return f2l
 
     @staticmethod
     def _cubie_key(color):
@@ -169,186 +256,269 @@ class F2L:
         for turn in alg:
             self._turn_rotate(*TURN_DICT[turn])
 
-    def _find_path(self, f2l_pair):
+    def _piece_state(self, key, color):
         """
-        Completes A* pathfinding for the current F2L pair.
+        Returns the state (see pruning.py) of the cubie with key by where its
+        sticker of color is.
+        """
+        coord, colors = self.perm[key]
+        facelet = FACELET_INDEX[(tuple(coord), colors.index(color))]
+
+        if key in self.cross or len(key) == 2:
+            return EDGE_FACELETS.index(facelet)
+        return CORNER_FACELETS.index(facelet)
+
+    def _pieces(self, f2l_pair):
+        """
+        Returns the states (see pruning.py) of the cross edges and the pieces
+        of the solved pairs and f2l_pair along with their solved states,
+        their move tables and the slot of each pair.
+        """
+        center_colors = {tuple(coord): colors[coord.index(1) if 1 in coord
+                                              else coord.index(-1)]
+                         for coord, colors in self.centers.values()}
+
+        # The cross edges in the order of the cross table
+        states, goal, piece_moves, slots = [], list(CROSS_GOAL), [], []
+        for coord in CROSS_EDGES:
+            color = center_colors[(coord[0], 0, coord[2])]
+            states.append(self._piece_state(
+                self._cubie_key(color + self.d_color), self.d_color))
+            piece_moves.append(EDGE_MOVES)
+
+        for pair in self.f2l_pairs + [f2l_pair]:
+            slot = tuple(self.goal_perm[self._cubie_key(pair)][0])
+            # The edge is tracked by its sticker on the x axis
+            x_color = center_colors[(slot[0], 0, 0)]
+
+            states += [self._piece_state(self._cubie_key(pair + self.d_color),
+                                         self.d_color),
+                       self._piece_state(self._cubie_key(pair), x_color)]
+            goal += slot_goal(slot)[:2]
+            piece_moves += [CORNER_MOVES, EDGE_MOVES]
+            slots.append(slot)
+
+        return states, goal, piece_moves, slots
+
+    def _table_path(self, f2l_pair):
+        """
+        Iterative deepening A* for the current F2L pair using the pruning
+        tables as the heuristic. Every child is evaluated so the evaluations
+        are the children generated plus the start.
 
         Parameters:
         f2l_pair - The two colors of the F2L pair as a string
                    (e.g. 'br' for the blue-red F2L pair)
         """
-        f2l_key = [self._cubie_key(f2l_pair),
-                   self._cubie_key(f2l_pair + self.d_color)]
-        slot_coord = tuple(self.goal_perm[f2l_key[0]][0])
-        f2lnode = F2LNode(self.init_perm, self.goal_perm, f2l_key, '',
-                          self.d_color, '', slot_coord)
-
-        # Every single layer face turn
-        turn_space = 'UT!LK@FE#RQ$BA%DC^'
-        self.open_set = deque([f2lnode])
-        closed_set = []
-
-        # DEBUGGING
-        #print('F2L Pair: {}'.format(f2l_pair))
-        debug_dict = {'go': "?NA", #alg_to_code(""),
-                      'gr': alg_to_code("R' U' R2 U R'"),
-                      'bo': "?NA", #alg_to_code(""),
-                      'br': "?NA"} #alg_to_code("")}
-        i = 0
-        #t0 = dt.now()
-        ################################################
-        while True:
-            i += 1
-
-            # Take object with lowest f_cost
-            current = self.open_set.popleft()
-
-            # DEBUGGING
-            if False:#debug_dict[f2l_pair].startswith(current.alg) and current.alg:
-                template = '{:>5} ==> F Cost - {:>2} | Abs H Cost - {:>2} |' + \
-                           ' H Cost - {:>2} | PM - {:>2} | FP - {:>2} |' + \
-                           ' SA - {:>2} | Alg - {}'
-                c = current
-                print(template.format(i, c.f_cost, c.abs_h_cost, c.h_cost,
-                                      c.pair_metric, c.flip_penalty,
-                                      c.slot_turn,
-                                      code_to_alg(c.alg)))
-                # print('Goal Perm:')
-                # pprint(c.d1)
-                # print('\nNew Goal Perm:')
-                # pprint(c.d2)
-                # print('\n')
-                # time.sleep(0.3)
-            ################################################
-
-            # Find current turn_space
-            if current.alg:
-                turn = current.alg[-1]
-
-                last = turn_space.index(turn)
-                no_turn = last - (last % 3)
-                turn_space_current = (turn_space[:no_turn] +
-                                      turn_space[no_turn + 3:])
-
-                # Remove half of the mirror moves (e.g. RL = LR and so on)
-                if turn in 'UT!':
-                    turn_space_current = \
-                        turn_space_current.replace('DC^', '')
-                elif turn in 'LK@':
-                    turn_space_current = \
-                        turn_space_current.replace('RQ$', '')
-                elif turn in 'FE#':
-                    turn_space_current = \
-                        turn_space_current.replace('BA%', '')
-            else:
-                turn_space_current = turn_space
-
-            # Move last node to top of tree
-            self.open_set.rotate(1)
-            # Compare it downwards
-            self._move_down()
-            # Add to closed set
-            closed_set.append(current.cur_perm)
-
-            # Return if perm is equal to goal perm
-            if not current.abs_h_cost:
-                # DEBUGGING
-                # t1 = dt.now()
-                # delta_time = (t1 - t0).total_seconds() - 0.3 * len(current.alg)
-                # print('Total time: {:.3f} s\n'.format(delta_time))
-                ################################################
-                return current.alg, len(self.open_set), len(closed_set)
-
-            # Create new objects and put in open_set to check next if
-            # perm hasn't already been found
-            for turn in turn_space_current:
-                new_perm = current.apply_turn(turn)
-                new_alg = current.alg + turn
-
-                if new_perm in closed_set:
+        t0 = perf_counter()
+        states, _, piece_moves, slots = self._pieces(f2l_pair)
+        # Each pruning table with the indices of the pieces it is looked up
+        # with. Indexing a memoryview is much faster than indexing the array
+        heuristics = [(memoryview(cross_table()), 0, 1, 2, 3)]
+        for n, slot in enumerate(slots):
+            heuristics.append((memoryview(slot_table(slot)), 4 + 2 * n,
+                               5 + 2 * n, CROSS_EDGES.index((0, -1, slot[2])),
+                               CROSS_EDGES.index((slot[0], -1, 0))))
+        turn_moves = {turn: [moves[n] for moves in piece_moves]
+                      for n, turn in enumerate(TURN_SPACE)}
+        budget = self.budget
+        stats = SearchStats()
+
+        def h_cost(states):
+            return max(table[((states[a] * 24 + states[b]) * 24 +
+                              states[c]) * 24 + states[d]]
+                       for table, a, b, c, d in heuristics)
+
+        def kept(states):
+            """
+            If the cross and the pairs solved before this one are solved.
+            """
+            return not any(table[((states[a] * 24 + states[b]) * 24 +
+                                  states[c]) * 24 + states[d]]
+                           for table, a, b, c, d in heuristics[:-1])
+
+        def move(states, turn):
+            return [moves[state] for moves, state
+                    in zip(turn_moves[turn], states)]
+
+        def depth_first(states, alg, h, bound):
+            """
+            Returns the alg if the goal is found within bound turns otherwise
+            the lowest f_cost over bound or None if the budget ran out.
+            """
+            stats.expanded += 1
+            if len(alg) > stats.depth:
+                stats.depth = len(alg)
+            if not h:
+                return alg
+            if h < best[0] and kept(states):
+                best[:] = h, states, alg
+            if budget is not None and budget.spend():
+                return None
+
+            lowest = 100
+            for turn in NEXT_TURNS[alg[-1:]]:
+                new_states = move(states, turn)
+                new_h = h_cost(new_states)
+                stats.generated += 1
+                f_cost = len(alg) + 1 + new_h
+
+                if f_cost > bound:
+                    lowest = min(lowest, f_cost)
                     continue
 
-                f2lnode = F2LNode(new_perm, self.goal_perm, f2l_key, new_alg,
-                                  self.d_color, current.slot_turn, slot_coord)
-                self._move_up(f2lnode)
+                result = depth_first(new_states, alg + turn, new_h, bound)
+                if result is None or isinstance(result, str):
+                    return result
+                lowest = min(lowest, result)
+
+            return lowest
+
+        def greedy(h, states, alg):
+            """
+            Takes the turn to the unseen states with the lowest h_cost until
+            h_cost is 0 or GREEDY_TURNS turns are taken. Returns the alg up
+            to the lowest h_cost on the way that keeps the cross and the
+            pairs before, which is the alg passed in if none beat it.
+            """
+            seen = {tuple(states)}
+            lowest = h, alg
+            for _ in range(GREEDY_TURNS):
+                if not h:
+                    break
+
+                options = []
+                for turn in NEXT_TURNS[alg[-1:]]:
+                    new_states = move(states, turn)
+                    if tuple(new_states) in seen:
+                        stats.duplicates += 1
+                    else:
+                        options.append((h_cost(new_states), turn, new_states))
+                stats.generated += len(options)
+                if not options:
+                    break
+
+                h, turn, states = min(options, key=lambda option: option[0])
+                seen.add(tuple(states))
+                alg += turn
+                if h < lowest[0] and kept(states):
+                    lowest = h, alg
+
+            return lowest[1]
+
+        h = bound = h_cost(states)
+        # The lowest h_cost found so far that keeps the cross and the pairs
+        # before, with its states and alg. The start keeps them so the alg
+        # is '' unless a state strictly beats it
+        best = [h, states, '']
+        while True:
+            result = depth_first(states, '', h, bound)
+            if result is None:
+                self.optimal = False
+                result = greedy(*best)
+            if isinstance(result, str):
+                stats.evaluations = stats.generated + 1
+                stats.time = perf_counter() - t0
+                return result, stats
+            bound = result
 
-    def _move_up(self, f2lnode):
+    def _find_path(self, f2l_pair):
         """
-        Appends f2lnode to the end of open_set and move it up the heap.
+        Completes A* pathfinding for the current F2L pair.
+
+        Parameters:
+        f2l_pair - The two colors of the F2L pair as a string
+                   (e.g. 'br' for the blue-red F2L pair)
         """
-        self.open_set.append(f2lnode)
+        states, goal, piece_moves, slots = self._pieces(f2l_pair)
+        f2lnode = F2LNode(tuple(states),
+                          F2LGoal(goal, piece_moves, slots[-1]))
 
-        while True:
-            # Node info, compare f_cost and h_cost at the same time
-            f2lnode_ind = self.open_set.index(f2lnode)
-            f2lnode_val = f2lnode.f_cost + f2lnode.h_cost/100
+        search = Search(f2lnode, budget=self.budget)
+        node = search.run()
+        self.optimal = self.optimal and search.optimal
+
+        # The best node found when the budget ran out can have undone the
+        # cross or the pairs before, which the last two pieces aren't part of
+        if not search.optimal and node.states[:-2] != tuple(goal[:-2]):
+            return '', search.stats
 
-            # If index is 0, can't move up anymore
-            if not f2lnode_ind:
-                return
+        return node.alg, search.stats
 
-            # The position above node n is int half of (n - 1)
-            f2lnode_up_ind = (f2lnode_ind - 1) // 2
-            f2lnode_up = self.open_set[f2lnode_up_ind]
-            f2lnode_up_val = f2lnode_up.f_cost + f2lnode_up.h_cost/100
 
-            # Compare values
-            if f2lnode_val < f2lnode_up_val:
-                self._swap(f2lnode_ind, f2lnode_up_ind)
-            else:
-                return
+class F2LGoal:
+    """
+    What every F2LNode of one search shares: the solved states of the pieces,
+    how each turn moves them and where the slot is.
 
-    def _move_down(self):
+    Parameters:
+    goal - The list of the solved state of each piece
+    piece_moves - A list of the move table (EDGE_MOVES or CORNER_MOVES) of
+                  each piece
+    slot_coord - The coordinate of the edge of the slot
+    """
+
+    def __init__(self, goal, piece_moves, slot_coord):
+        self.states = tuple(goal)
+        self.turn_moves = {turn: [moves[n] for moves in piece_moves]
+                           for n, turn in enumerate(TURN_SPACE)}
+        self.distances = [EDGE_DISTANCES if moves is EDGE_MOVES
+                          else CORNER_DISTANCES for moves in piece_moves]
+        self.valid_moves = SLOT_TURNS[slot_coord]
+
+        # The solved states moved by each turn that can move the slot
+        self.rel_states = {turn: self.apply_turn(turn, self.states)
+                           for turn in self.valid_moves if turn}
+        self.rel_states[''] = self.states
+
+    def apply_turn(self, turn, states):
         """
-        Sorts the top node down the heap.
+        Returns states after applying turn.
         """
-        set_len = len(self.open_set)
+        return tuple(moves[state] for moves, state
+                     in zip(self.turn_moves[turn], states))
 
-        # Don't run if open_set is empty
-        if not set_len:
-            return
-
-        f2lnode = self.open_set[0]
-        f2lnode_val = f2lnode.f_cost + f2lnode.h_cost/100
+    def slot_turn(self, slot_turn, turn):
+        """
+        Returns the turn that moved the slot out of position after turn is
+        applied when slot_turn had.
+        """
+        valid_moves = self.valid_moves
 
-        while True:
-            f2lnode_ind = self.open_set.index(f2lnode)
+        # If it is a move that effects the position
+        if turn not in valid_moves:
+            return slot_turn
 
-            left_ind = 2 * f2lnode_ind + 1
-            right_ind = left_ind + 1
+        # If it doesn't match the move set
+        if slot_turn and valid_moves.index(slot_turn) // 4 != \
+                valid_moves.index(turn) // 4:
+            return slot_turn
 
-            # Check if left node exists, if not we are finished
-            if set_len > left_ind:
-                left = self.open_set[left_ind]
-                left_val = left.f_cost + left.h_cost/100
-            else:
-                return
+        turn_val = valid_moves.index(turn) % 4
+        slot_val = valid_moves.index(slot_turn) % 4
+        new_val = (turn_val + slot_val) % 4
 
-            # Check if right node exists
-            if set_len > right_ind:
-                right = self.open_set[right_ind]
-                right_val = right.f_cost + right.h_cost/100
-            else:
-                right = None
+        return valid_moves[4 * (valid_moves.index(slot_turn) // 4) + new_val]
 
-            # Left value must be less and either there is no right node or
-            # the left node is the lower choice
-            if (left_val < f2lnode_val) and \
-               (right is None or left_val <= right_val):
-                self._swap(f2lnode_ind, left_ind)
-            elif right is not None and right_val < f2lnode_val:
-                self._swap(f2lnode_ind, right_ind)
-            else:
-                return
+    def metric(self, states, goal):
+        """
+        Sums the difference of each coordinate dimension of each piece
+        between states and goal.
+        """
+        return sum(distances[state][end] for distances, state, end
+                   in zip(self.distances, states, goal))
 
-    def _swap(self, i, j):
+    def bad_flips(self, states, goal):
         """
-        Swaps elements at i and j in open_set
+        Counts the pieces in states that are in the same position as in goal
+        but are flipped incorrectly.
         """
-        self.open_set[i], self.open_set[j] = self.open_set[j], self.open_set[i]
+        return sum(1 for distances, state, end
+                   in zip(self.distances, states, goal)
+                   if not distances[state][end] and state != end)
 
 
-class F2LNode:
+class F2LNode(Node):
     """
     This class represents a node in the A* algorithm.
 
@@ -359,157 +529,59 @@ class F2LNode:
     position.
 
     Its relative final position is where the slot currently is as determined by
-    the _slot method. The absolute final position (abs_h_cost) is used to
+    F2LGoal.slot_turn. The absolute final position (abs_h_cost) is used to
     determined if the F2L pair has been solved. The relative final position
     (rel_h_cost) is used with the flip_penatly for the h_cost which is used
     everywhere else. The f_cost is the total metric which also sums the
     current length of the algorithm as a factor.
 
-    Moves are applied to the cube like usual, but only the relevant cubies
-    (the four cross edges, any previously solved pairs and the current pair)
-    are moved since the permutation of the other cubies is irrelevant.
+    Only the relevant pieces (the four cross edges, any previously solved
+    pairs and the current pair) are tracked, each by its state (see
+    pruning.py), since the permutation of the other cubies is irrelevant.
 
     Parameters:
-    cur_perm - The current permutation of the cube
-    goal_perm - The permutation that the pathfinder is trying to reach
-    slot_perm - The permutation of just the slot (i.e. where the F2L pair
-                is to be inserted)
-    slot_turn - The turn that moved the slot out of position (or empty string
-                if slot is not out of position)
-    f2l_key - The keys of two cubies of the F2L pair (used to pull the pair
-              from a perm)
-    alg - Current alg used to obtain cur_perm from its initial state
-    d_color - The color of the Down face
+    states - The tuple of the states of the pieces
+    goal - The F2LGoal of the search
+    parent - (default None) The F2LNode this one was found from
+    turn - (default '') The turn from parent to this node
+    key - (default None) The state_key of states if already known
     """
-
-    def __init__(self, cur_perm, goal_perm, f2l_key, alg, d_color,
-                 slot_turn, slot_coord):
-        self.d_color = d_color
-        self.alg = alg
-        self.f2l_key = f2l_key
-
-        self.goal_perm = goal_perm
-        self.cur_perm = cur_perm
-        self.slot_turn = self._slot(slot_turn, slot_coord)
-        self.rel_goal_perm = self._rel_goal_perm()
+    __slots__ = ('states', 'goal', 'slot_turn')
+
+    def __init__(self, states, goal, parent=None, turn='', key=None):
+        super().__init__(parent, turn, key or self.state_key(states))
+        self.states = states
+        self.goal = goal
+        # The turn that moved the slot out of position (or empty string if
+        # slot is not out of position)
+        self.slot_turn = goal.slot_turn(parent.slot_turn, turn) if parent \
+            else ''
+        rel_goal = goal.rel_states[self.slot_turn]
 
         # Metrics
-        self.flip_penalty = 2 * self._flip_penalty()
-        self.rel_h_cost = self._slot_metric()
-        self.g_cost = len(self.alg)
-
-        self.h_cost = self.rel_h_cost + self.flip_penalty
-        self.abs_h_cost = self._metric() + self.flip_penalty
+        self.h_cost = goal.metric(states, rel_goal) + \
+            2 * goal.bad_flips(states, rel_goal)
+        # Flips are checked against the solved states here as well so a
+        # wrongly flipped piece in its solved position isn't taken as solved
+        self.abs_h_cost = goal.metric(states, goal.states) + \
+            2 * goal.bad_flips(states, goal.states)
         self.f_cost = self.h_cost + self.g_cost
 
-    def _slot(self, slot_turn, slot_coord):
-        if not len(self.alg):
-            return ''
-
-        turn_dict = {(-1, 0,  1): ['', 'L', '@', 'K', '', 'F', '#', 'E'],
-                     ( 1, 0,  1): ['', 'R', '$', 'Q', '', 'F', '#', 'E'],
-                     (-1, 0, -1): ['', 'L', '@', 'K', '', 'B', '%', 'A'],
-                     ( 1, 0, -1): ['', 'R', '$', 'Q', '', 'B', '%', 'A']}
-        valid_moves = turn_dict[slot_coord]
-
-        # If it is a move that effects the position
-        if self.alg[-1] in valid_moves:
-            # If it doesn't match the move set
-            if slot_turn and valid_moves.index(slot_turn) // 4 != \
-                            valid_moves.index(self.alg[-1]) // 4:
-                return slot_turn
-
-            turn_val = valid_moves.index(self.alg[-1]) % 4
-            slot_val = valid_moves.index(slot_turn) % 4
-            new_val = (turn_val + slot_val) % 4
-
-            new_turn = valid_moves[4 * (valid_moves.index(slot_turn) // 4) + new_val]
-
-            return new_turn
-
-        return slot_turn
-
-    def _flip_penalty(self):
+    def apply_turn(self, turn):
         """
-        Counts number of cubies that are in the correct position but are
-        flipped incorrectly.
+        Returns the states of the pieces after applying turn.
         """
-        bad_flip = 0
-
-        for stickers, cordlor in self.cur_perm.items():
-            # The 0th element is coords and 1st element is color
-            # So incorrect color but correct coords means it's flipped
-            if (self.rel_goal_perm[stickers][0] == cordlor[0] and
-                    self.rel_goal_perm[stickers][1] != cordlor[1]):
-                bad_flip += 1
-
-        return bad_flip
-
-    def _slot_metric(self):
-        """
-        The metric but reletive to the slot as determined by self._slot
-        """
-        if not len(self.alg) or not self.slot_turn:
-            return self._metric()
-
-        # Create a copy of goal_perm and update it with where the slot is
-        new_goal_perm = self.goal_perm.copy()
-        new_goal_perm.update(self.rel_goal_perm)
-
-        return self._metric(new_goal_perm)
-
-    def _rel_goal_perm(self):
-        if not self.slot_turn:
-            return self.goal_perm.copy()
-
-        return self.apply_turn(self.slot_turn, self.goal_perm)
-
-    def _metric(self, goal_perm=None):
-        """
-        Sums the difference of each coordinate dimension
-
-        Parameters:
-        goal_perm - (default None) The permutation to compare self.cur_perm
-                    against. Defaults to self.goal_perm.
-        """
-        goal_perm = goal_perm or self.goal_perm
-        tot_distance = 0
-
-        for stickers, cordlor in self.cur_perm.items():
-            ## Regular metric
-            distance = 0
-            for n in range(3):
-                diff = abs(cordlor[0][n] - goal_perm[stickers][0][n])
-                distance += diff
-            tot_distance += distance
-
-        return tot_distance
+        return self.goal.apply_turn(turn, self.states)
 
     @staticmethod
-    def _turn_rotate(ttype, side, perm):
+    def state_key(states):
         """
-        Applies a turn to analgous to the Cube class method. Here, a new dict
-        is returned instead of updating current perm.
+        Encoding of states used for the closed set.
         """
-        # Get the right parameters for the cubie rotation
-        p = PARAM_DICT[ttype][side]
-        new_perm = {}
-
-        for stickers, cordlor in perm.items():
-            coord, color = cordlor[0], cordlor[1]
-            if coord[p[0]] == p[1]:
-                new_perm[stickers] = ([p[2] * coord[p[3]],
-                                       p[4] * coord[p[5]],
-                                       p[6] * coord[p[7]]],
-                                      [color[p[3]], color[p[5]], color[p[7]]])
-            else:
-                new_perm[stickers] = cordlor
-
-        return new_perm
+        return encode(states)
 
-    def apply_turn(self, turn, perm=None):
+    def child(self, turn, states, key=None):
         """
-        Analgous to Cube class method except only works for one turn at a time.
+        Returns the F2LNode reached by applying turn which gives states.
         """
-        perm = perm or self.cur_perm
-        return self._turn_rotate(*TURN_DICT[turn], perm)
+        return F2LNode(states, self.goal, self, turn, key)
@@ -0,0 +1,123 @@
+"""
+Contains the search over the 24 orders the four F2L pairs can be solved in
+to find the order with the fewest turns.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Value
+
+from cfop.f2l import F2L
+
+# Larger than the move count of any F2L
+MAX_MOVES = 1000
+# The best total move count found so far, shared by the worker processes
+_BEST = None
+
+
+class _Bound:
+    """
+    Stand in for a multiprocessing.Value when everything is in one process.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+    def get_lock(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+def _set_bound(best):
+    """
+    Initializer for each worker process that stores the shared best.
+    """
+    global _BEST
+    _BEST = best
+
+
+def _search(f2l, remaining, bound):
+    """
+    Depth-first search over the orders of the remaining pairs. The F2L object
+    after each prefix of an order is shared by every order starting with it
+    and an order is dropped as soon as its turns so far exceed the best total
+    in bound. Returns the best F2L object found or None.
+    """
+    if f2l.moves > bound.value:
+        return None
+
+    if not remaining:
+        with bound.get_lock():
+            if f2l.moves < bound.value:
+                bound.value = f2l.moves
+        return f2l
+
+    best = None
+    for f2l_pair in remaining:
+        child = f2l.copy()
+        child.solve_pair(f2l_pair)
+
+        result = _search(child, [pair for pair in remaining
+                                 if pair != f2l_pair], bound)
+        if result is not None and (best is None or result.moves < best.moves):
+            best = result
+
+    return best
+
+
+def _search_first(perm, first_pair, remaining, method, budget, bound=None):
+    """
+    Solves first_pair and then searches every order of the remaining pairs.
+    Used by each worker process, which uses the shared best if it has one.
+    """
+    bound = bound or _BEST or _Bound(MAX_MOVES)
+    return _search(F2L(perm, [first_pair], method, budget), remaining, bound)
+
+
+def best_order(perm, f2l_pairs, workers=None, executor=None, method='table',
+               budget=None):
+    """
+    Solves the F2L in each order of the pairs and returns the F2L object with
+    the fewest total turns (the earliest order in f2l_pairs wins a tie).
+
+    The orders are split up by their first pair. These are searched one
+    after another unless an executor is given or workers is more than 1, in
+    which case each first pair is searched by a worker process. The best
+    total so far is shared between the searches so every one of them can
+    drop orders that can't beat it. Starting a pool takes longer than the
+    search itself, so pass a long-lived executor when solving many cubes.
+
+    Parameters:
+    perm - The full permutation of the cube in dict form
+    f2l_pairs - The four F2L pairs as in the F2L class
+    workers - (default None) The number of processes of a new pool, no pool
+              is started if None, 0 or 1
+    executor - (default None) An existing concurrent.futures executor to use
+               instead of starting a new pool of processes. The best total is
+               then only shared within each first pair
+    method - (default 'table') The method used by the F2L class
+    budget - (default None) The search.Budget of the F2L class. Each worker
+             process gets its own copy of it
+    """
+    args = [(perm, pair, [p for p in f2l_pairs if p != pair], method, budget)
+            for pair in f2l_pairs]
+
+    if executor is None and (workers or 0) <= 1:
+        bound = _Bound(MAX_MOVES)
+        results = [_search_first(*arg, bound) for arg in args]
+    else:
+        pool = executor or ProcessPoolExecutor(
+            workers, initializer=_set_bound,
+            initargs=(Value('i', MAX_MOVES),))
+        try:
+            futures = [pool.submit(_search_first, *arg) for arg in args]
+            results = [future.result() for future in futures]
+        finally:
+            if executor is None:
+                pool.shutdown()
+
+    return min((f2l for f2l in results if f2l is not None),
+               key=lambda f2l: f2l.moves)
@@ -0,0 +1,201 @@
+"""
+Contains the compact facelet representation of the cube along with the
+precomputed sticker permutations for every turn and rotation.
+
+A facelet state is a 54 char string made of the six 9 char strings of the
+list form of a permutation (see cube.Cube and tools.dict_to_list) joined
+together in the order: Up, Left, Front, Right, Back, Down. Every turn is then
+a fixed permutation of these 54 indices so applying it is a single gather
+instead of rebuilding the 26 entry dict. Whole algorithms are compiled into
+one composed permutation by compile_alg so they also cost a single gather.
+"""
+from functools import lru_cache
+from itertools import product
+from operator import itemgetter
+
+from cfop.algorithms.alg_dicts import PARAM_DICT, TURN_DICT
+from cfop.algorithms.tools import alg_to_code
+
+
+def _facelet(cubie, axis):
+    """
+    Returns the index (0 to 53) of the sticker on axis 'axis' of the cubie at
+    coordinate 'cubie'. Follows the same layout as tools.dict_to_list.
+    """
+    x, y, z = cubie
+    if axis == 0:
+        if x == 1:
+            return 27 + 3 * abs(y - 1) + abs(z - 1)
+        return 9 + 3 * abs(y - 1) + z + 1
+    if axis == 1:
+        if y == 1:
+            return 3 * (z + 1) + x + 1
+        return 45 + 3 * abs(z - 1) + x + 1
+    if z == 1:
+        return 18 + 3 * abs(y - 1) + x + 1
+    return 36 + 3 * abs(y - 1) + abs(x - 1)
+
+
+# The 26 cubie coordinates in the same order as the keys of a Cube's perm
+CUBIES = [coord for coord in product(range(-1, 2), repeat=3)
+          if coord != (0, 0, 0)]
+
+# The (cubie, axis) pair of each of the 54 facelets
+FACELET_CUBIES = sorted(((cubie, axis) for cubie in CUBIES
+                         for axis in range(3) if cubie[axis]),
+                        key=lambda ca: _facelet(*ca))
+
+
+def turned_cubies(perm, ttype, side, dl=False):
+    """
+    Returns a dict of the cubies of the dict form perm that are moved by the
+    turn or rotation with their new coordinates and colors. The cubies that
+    are not moved are not included. See Cube.turn_rotate for the parameters.
+    """
+    # Finds equivalent face to turn
+    face = {'x': 'r', 'y': 'u', 'z': 'f', 'm': 'l'}.get(side, side)
+
+    # Get the right parameters for the cubie rotation
+    p = PARAM_DICT[ttype][face]
+
+    # Choose correct layers to rotate
+    if dl:
+        turning_layers = [0, p[1]]
+    elif side == 'm':
+        turning_layers = [0]
+    elif side in ['x', 'y', 'z']:
+        turning_layers = [-1, 0, 1]
+    else:
+        turning_layers = [p[1]]
+
+    new_coords = {}
+    for cubie, colors in perm.items():
+        if cubie[p[0]] in turning_layers:
+            new_coords[(p[2]*cubie[p[3]],
+                        p[4]*cubie[p[5]],
+                        p[6]*cubie[p[7]])] = \
+                        [colors[p[3]], colors[p[5]], colors[p[7]]]
+
+    return new_coords
+
+
+def dict_to_facelets(perm):
+    """
+    Converts the dict form of a permutation into its facelet string.
+
+    Parameters:
+    perm - The permutation of the cube in the dict form of cube.Cube
+    """
+    return ''.join([perm[cubie][axis] for cubie, axis in FACELET_CUBIES])
+
+
+def facelets_to_dict(facelets):
+    """
+    Converts a facelet string into the dict form of a permutation.
+
+    Parameters:
+    facelets - The 54 char facelet string of the cube
+    """
+    perm = {cubie: ['', '', ''] for cubie in CUBIES}
+    for (cubie, axis), sticker in zip(FACELET_CUBIES, facelets):
+        perm[cubie][axis] = sticker
+
+    return perm
+
+
+def apply_perm(facelets, perm):
+    """
+    Returns the facelet string after applying the sticker permutation perm,
+    i.e. the new sticker at index i is the old sticker at index perm[i].
+
+    Parameters:
+    facelets - The 54 char facelet string of the cube
+    perm - A 54-tuple of facelet indices (e.g. from TURN_PERMS)
+    """
+    return ''.join(itemgetter(*perm)(facelets))
+
+
+def _move_perm(ttype, side, dl):
+    """
+    Finds the sticker permutation of one turn or rotation by turning a cube
+    whose stickers are labeled with their own facelet index.
+    """
+    labels = {cubie: ['', '', ''] for cubie in CUBIES}
+    for n, (cubie, axis) in enumerate(FACELET_CUBIES):
+        labels[cubie][axis] = n
+    labels.update(turned_cubies(labels, ttype, side, dl))
+
+    return tuple(labels[cubie][axis] for cubie, axis in FACELET_CUBIES)
+
+
+# Sticker permutation of each move keyed by its turn_rotate arguments
+MOVE_PERMS = {(turn[0], turn[1], len(turn) == 3):
+              _move_perm(turn[0], turn[1], len(turn) == 3)
+              for turn in TURN_DICT.values()}
+
+# Sticker permutation of each move keyed by its code syntax character
+TURN_PERMS = {code: MOVE_PERMS[(turn[0], turn[1], len(turn) == 3)]
+              for code, turn in TURN_DICT.items()}
+
+# The permutation that leaves every sticker where it is
+IDENTITY = tuple(range(54))
+
+
+def compose(first, second):
+    """
+    Returns the single permutation equivalent to applying the permutation
+    first followed by the permutation second.
+    """
+    return itemgetter(*second)(first)
+
+
+def invert(perm):
+    """
+    Returns the permutation that undoes perm.
+    """
+    inverse = [0] * len(perm)
+    for n, index in enumerate(perm):
+        inverse[index] = n
+
+    return tuple(inverse)
+
+
+@lru_cache(maxsize=4096)
+def compile_alg(alg, alg_input=False):
+    """
+    Compiles an algorithm into the one sticker permutation that is equivalent
+    to applying each of its turns in order. The results are kept in a bounded
+    LRU cache keyed on the algorithm so replaying a known algorithm does not
+    compose it again.
+
+    Parameters:
+    alg - Algorithm to compile
+    alg_input - (default False) If True, will assume alg is written in cubing
+                notation. If False, will assume alg is written as the code
+                syntax
+    """
+    if alg_input:
+        alg = alg_to_code(alg)
+
+    perm = IDENTITY
+    for turn in alg:
+        perm = compose(perm, TURN_PERMS[turn])
+
+    return perm
+
+
+# The facelet indices of each cubie keyed by the cubie coordinate
+CUBIE_FACELETS = {cubie: [n for n, (coord, _) in enumerate(FACELET_CUBIES)
+                          if coord == cubie] for cubie in CUBIES}
+
+# The facelet index of each (cubie, axis) pair
+FACELET_INDEX = {cubie_axis: n for n, cubie_axis in enumerate(FACELET_CUBIES)}
+
+# The facelet index of the center on the same face as each facelet
+FACE_CENTERS = tuple(9 * (n // 9) + 4 for n in range(54))
+
+# The sticker of each center in the order of the faces
+CENTERS = list(range(4, 54, 9))
+
+# The facelet string of the solved cube
+SOLVED = 'w' * 9 + 'o' * 9 + 'g' * 9 + 'r' * 9 + 'b' * 9 + 'y' * 9
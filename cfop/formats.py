@@ -0,0 +1,60 @@
+"""
+Contains how scrambles are read from and results are written to lines of
+text, which the command line solver (see __main__.py) and the solve server
+(see server.py) both use.
+"""
+import json
+from ast import literal_eval
+
+from cfop.algorithms.tools import code_to_alg, move_count
+from cfop.solver import STAGES
+
+# The colors of the stickers of a permutation
+COLORS = set('wogrby')
+
+
+def parse_scramble(line):
+    """
+    Returns the scramble written on a line for solve_scramble, i.e. the
+    permutation as a list if the line is one (as the list from
+    tools.dict_to_list or its 54 stickers) and otherwise the line as an
+    algorithm.
+    """
+    line = line.strip()
+    if line.startswith('['):
+        try:
+            return [str(face) for face in literal_eval(line)]
+        except (ValueError, SyntaxError):
+            return line
+
+    stickers = ''.join(line.split())
+    if len(stickers) == 54 and set(stickers) <= COLORS:
+        return [stickers[n:n + 9] for n in range(0, 54, 9)]
+
+    return line
+
+
+def to_json(result):
+    """
+    Returns a result of solve_many as a JSON line with the algs in
+    cubing notation, the HTM move count of each stage and the search stats
+    as dicts.
+    """
+    algs = {stage: result['algs'][stage] for stage in STAGES
+            if stage in result['algs']}
+    if 'f2l' in algs:
+        algs['f2l'] = ''.join(algs['f2l'])
+    moves = {stage: move_count(alg) for stage, alg in algs.items()}
+    moves['total'] = sum(moves.values())
+
+    return json.dumps({'index': result['index'],
+                       'scramble': result['scramble'],
+                       'algs': {stage: code_to_alg(alg)
+                                for stage, alg in algs.items()},
+                       'moves': moves,
+                       'times': result['times'],
+                       'optimal': result['optimal'],
+                       'stats': {stage: stats.to_dict() for stage, stats
+                                 in result['stats'].items()},
+                       'step': result['step'],
+                       'error': result['error']})
@@ -0,0 +1,112 @@
+"""
+Contains the inspection step used for color neutral solving where the cross
+is solved on each of the six faces and the best one is picked.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from cfop.cross import Cross
+from cfop.cube import Cube
+
+# The rotation that brings the center at each coordinate to the Down face
+ROTATIONS = {(0, 0, -1): 'x', (0, 0, 1): 'X', (0, -1, 0): '',
+             (0, 1, 0): '8', (-1, 0, 0): 'Z', (1, 0, 0): 'z'}
+
+
+def _unsolved_f2l(perm):
+    """
+    Counts the F2L cubies (the four D corners and four middle layer edges)
+    that aren't solved relative to the centers.
+    """
+    centers = {coord: ''.join(colors) for coord, colors in perm.items()
+               if coord.count(0) == 2}
+
+    unsolved = 0
+    for coord, colors in perm.items():
+        if coord[1] == -1 and coord.count(0) == 0 or \
+           coord[1] == 0 and coord.count(0) == 1:
+            # The center on the same face as each sticker
+            unsolved += any(colors[n] != centers[tuple(coord[m] * (m == n)
+                                                       for m in range(3))]
+                            for n in range(3) if coord[n])
+
+    return unsolved
+
+
+# Functions that score a face from its result, the lowest score is picked
+POLICIES = {
+    # Shortest cross
+    'cross': lambda result: len(result['cross']),
+    # Shortest cross plus an estimate of F2L of two turns per unsolved cubie
+    'cross_f2l': lambda result: (len(result['cross']) +
+                                 2 * result['unsolved_f2l']),
+}
+
+
+def _solve_face(perm, rotation, method, budget):
+    """
+    Solves the cross after applying rotation to the cube. Used by each
+    worker process.
+    """
+    t0 = perf_counter()
+
+    cube = Cube(perm, compact=True)
+    cube.apply_alg(rotation)
+    cross = Cross(cube.perm, method, budget)
+    cube.apply_alg(cross.alg)
+
+    return {'rotation': rotation, 'cross': cross.alg,
+            'stats': cross.stats, 'optimal': cross.optimal,
+            'unsolved_f2l': _unsolved_f2l(cube.perm),
+            'time': perf_counter() - t0}
+
+
+def inspect(perm, policy='cross', method='table', workers=None,
+            executor=None, budget=None):
+    """
+    Solves the cross on all six faces and returns the result of the best face
+    according to policy along with a dict of the results of every face keyed
+    by the color of the face. Each result is a dict with the rotation, the
+    cross alg, the search.SearchStats of it, whether the cross search finished
+    within its budget, the number of unsolved F2L cubies and the time taken
+    in seconds.
+
+    The faces are solved one after another unless an executor is given or
+    workers is more than 1, in which case they are solved at the same time
+    in a pool of worker processes. Starting a pool takes much longer than
+    solving a cross, so pass a long-lived executor when inspecting many
+    cubes.
+
+    Parameters:
+    perm - The permutation of the cube in its dict form
+    policy - (default 'cross') Either a key of POLICIES or a function that
+             scores a result where the lowest score is picked
+    method - (default 'table') The method used by the Cross class
+    workers - (default None) The number of processes of a new pool, no pool
+              is started if None, 0 or 1
+    executor - (default None) An existing concurrent.futures executor to
+               use instead of starting a new pool of processes
+    budget - (default None) The search.Budget of the Cross class. Each face
+             gets its own copy of it when solved in a worker process
+    """
+    score = POLICIES[policy] if isinstance(policy, str) else policy
+    faces = {''.join(perm[coord]): rotation
+             for coord, rotation in ROTATIONS.items()}
+    perm = {coord: colors.copy() for coord, colors in perm.items()}
+
+    if executor is None and (workers or 0) <= 1:
+        results = [_solve_face(perm, rotation, method, budget)
+                   for rotation in faces.values()]
+    else:
+        pool = executor or ProcessPoolExecutor(workers)
+        try:
+            futures = [pool.submit(_solve_face, perm, rotation, method,
+                                   budget) for rotation in faces.values()]
+            results = [future.result() for future in futures]
+        finally:
+            if executor is None:
+                pool.shutdown()
+
+    results = dict(zip(faces, results))
+
+    return min(results.values(), key=score), results
@@ -0,0 +1,128 @@
+"""
+Contains the OLL class which orients the last layer by looking up its case in
+an index of the OLL algorithms instead of searching for an algorithm.
+
+The index is built once by applying the inverse of each algorithm to a solved
+cube, which gives the case that the algorithm solves. The orientation pattern
+of the Up layer of that case, under each of the four turns of the Up face done
+before the algorithm (the pre-AUF), is then a key of the index.
+"""
+from operator import itemgetter
+
+from cfop.algorithms.tools import move_count, wiki_to_code
+from cfop.facelets import (CENTERS, FACELET_CUBIES, FACELET_INDEX, SOLVED,
+                           TURN_PERMS, apply_perm, compile_alg,
+                           dict_to_facelets, invert)
+
+# The sticker of the Up center
+U_CENTER = FACELET_INDEX[((0, 1, 0), 1)]
+# The stickers of the 8 Up layer cubies that aren't the center
+LAYER_FACELETS = [n for n, (cubie, _) in enumerate(FACELET_CUBIES)
+                  if cubie[1] == 1 and cubie.count(0) != 2]
+_LAYER_STICKERS = itemgetter(*LAYER_FACELETS)
+# The stickers of every other cubie
+F2L_FACELETS = [n for n, (cubie, _) in enumerate(FACELET_CUBIES)
+                if cubie[1] != 1]
+# Every rotation of the whole cube
+ROTATIONS = [first + second for first in ['', 'x', 'X', '8', 'z', 'Z']
+             for second in ['', 'y', 'Y', '9']]
+# The turn that undoes each number of Up turns done before an alg
+AUFS = ['', 'T', '!', 'U']
+
+_INDEX = {}
+
+
+def pattern(facelets):
+    """
+    Returns the orientation pattern of the Up layer of facelets, i.e. which
+    stickers of the Up layer are the color of the Up center.
+    """
+    return tuple(map(facelets[U_CENTER].__eq__, _LAYER_STICKERS(facelets)))
+
+
+def center_preserving(code):
+    """
+    Returns code with the rotation added to its end that puts the centers
+    back to where they started.
+    """
+    for rotation in ROTATIONS:
+        perm = compile_alg(code + rotation)
+        if all(perm[n] == n for n in CENTERS):
+            return code + rotation
+
+    raise Exception('The alg {} moves the centers.'.format(code))
+
+
+def build_index(algs, metric='htm'):
+    """
+    Builds the index of every OLL case. Returns a dict keyed by the pattern
+    (see the pattern function) of the case with a value of the name of the
+    case and the alg, in code syntax, that solves it. If more than one alg
+    solves a case then the one with the fewest moves is kept. Algs that
+    can't be read or that don't keep the F2L solved are skipped.
+
+    Parameters:
+    algs - A dict of the algs of each case as is returned by
+           oll_algs.get_algs
+    metric - (default 'htm') The metric the moves are counted in, see
+             tools.move_count
+    """
+    index = {pattern(SOLVED): ('OLL skip', '')}
+
+    for case, case_algs in algs.items():
+        for alg in case_algs:
+            try:
+                code = center_preserving(wiki_to_code(alg))
+            except Exception:
+                continue
+
+            # The case is what the alg solves to a solved cube
+            state = apply_perm(SOLVED, invert(compile_alg(code)))
+            if any(state[n] != SOLVED[n] for n in F2L_FACELETS):
+                continue
+
+            for auf in AUFS:
+                key = pattern(state)
+                if key not in index or move_count(auf + code, metric) < \
+                        move_count(index[key][1], metric):
+                    index[key] = (case, auf + code)
+                state = apply_perm(state, TURN_PERMS['U'])
+
+    return index
+
+
+def oll_index(metric='htm'):
+    """
+    Returns the index built from the algs of oll_algs.get_algs, building it
+    the first time it is needed for metric.
+    """
+    if metric not in _INDEX:
+        from cfop.algorithms.oll_algs import get_algs
+        _INDEX[metric] = build_index(get_algs(), metric)
+
+    return _INDEX[metric]
+
+
+class OLL:
+    """
+    This class orients the last layer (the Up face) of a cube with a solved
+    F2L by finding its case in an index, which is one pattern computation
+    and one dict lookup.
+
+    Parameters:
+    perm - The full permutation of the cube in its dict form or as a facelet
+           string (see facelets.py)
+    index - (default None) The index to use (see build_index), the one from
+            oll_index for metric if None
+    metric - (default 'htm') The metric of the index used if index is None
+    """
+
+    def __init__(self, perm, index=None, metric='htm'):
+        facelets = perm if isinstance(perm, str) else dict_to_facelets(perm)
+        index = oll_index(metric) if index is None else index
+
+        key = pattern(facelets)
+        if key not in index:
+            raise Exception('The last layer is not a known OLL case.')
+
+        self.case, self.alg = index[key]
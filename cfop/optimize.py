@@ -0,0 +1,124 @@
+"""
+Contains the optimizer that shortens a whole solve, made by joining the
+algorithms of each stage, without changing what it does to the cube.
+
+First every rotation is taken out by turning the faces of the moves after it
+instead, so a rotation in the middle (e.g. from inspection or an OLL alg)
+costs nothing and doesn't stop the moves around it from cancelling. Then the
+moves are merged: moves on the same axis (e.g. R, L, M, r and x) commute, so
+a run of them can be reordered and the quarter turns of each layer added up.
+A layer that adds up to no turn is dropped, which can make the runs around
+it meet and merge too, e.g. R U U' L R' becomes L.
+"""
+from functools import lru_cache
+
+from cfop.algorithms.tools import (INVERSE_TURNS, ROTATION_CODES,
+                                   alg_to_code, move_count)
+from cfop.facelets import IDENTITY, TURN_PERMS, compile_alg, compose
+from cfop.oll import ROTATIONS
+from cfop.symmetry import turn_map
+
+# The layer and the number of clockwise quarter turns of each turn in code
+# syntax, e.g. U is ('U', 1), U' is ('U', 3) and U2 is ('U', 2)
+LAYERS = {}
+for _layer in 'ULFRBDulfrbdMxyz':
+    LAYERS[_layer] = (_layer, 1)
+    LAYERS[alg_to_code(_layer + '2')] = (_layer, 2)
+    LAYERS[INVERSE_TURNS[_layer]] = (_layer, 3)
+# The turn of each layer and number of quarter turns
+TURNS = {layer_turns: code for code, layer_turns in LAYERS.items()}
+# The axis each layer turns about
+AXES = {layer: axis for axis, layers in [('x', 'LRlrMx'), ('y', 'UDudy'),
+                                         ('z', 'FBfbz')]
+        for layer in layers}
+
+# The rotation in code syntax of each sticker permutation of a rotation
+_ROTATION_CODES = {}
+for _rotation in ROTATIONS:
+    _ROTATION_CODES.setdefault(compile_alg(_rotation), _rotation)
+
+
+@lru_cache(maxsize=None)
+def _rotation_map(perm):
+    """
+    The turn_map of a rotation, kept for each of the 24.
+    """
+    return turn_map(perm)
+
+
+def absorb_rotations(code):
+    """
+    Returns code without its rotations, with the moves after each rotation
+    turned to where they are after it, and the rotation that the cube ends
+    at (in code syntax) compared to doing code.
+
+    Parameters:
+    code - The algorithm in code syntax
+    """
+    rotation, moves = IDENTITY, ''
+    for turn in code:
+        if turn in ROTATION_CODES:
+            rotation = compose(rotation, TURN_PERMS[turn])
+        else:
+            moves += turn.translate(_rotation_map(rotation))
+
+    return moves, _ROTATION_CODES[rotation]
+
+
+def merge_moves(code):
+    """
+    Returns code with the moves on the same axis next to each other merged
+    and the ones that cancel out removed (see the module docstring).
+
+    Parameters:
+    code - The algorithm in code syntax
+    """
+    # Each run of moves on one axis as its axis and the quarter turns of
+    # each of its layers in the order they first appear
+    runs = []
+    for turn in code:
+        layer, quarters = LAYERS[turn]
+        if runs and runs[-1][0] == AXES[layer]:
+            layers = runs[-1][1]
+            layers[layer] = (layers.get(layer, 0) + quarters) % 4
+            if not layers[layer]:
+                del layers[layer]
+                if not layers:
+                    runs.pop()
+        else:
+            runs.append((AXES[layer], {layer: quarters}))
+
+    return ''.join(TURNS[layer_turns] for _, layers in runs
+                   for layer_turns in layers.items())
+
+
+def optimize(code, keep_rotation=False):
+    """
+    Returns the shortest form of code that this finds (see the module
+    docstring). The cube then ends at a different rotation than with code
+    unless keep_rotation is True, in which case the rotation is put at the
+    end.
+
+    Parameters:
+    code - The algorithm in code syntax
+    keep_rotation - (default False) If True, the optimized algorithm ends
+                    with the cube held the same way as code does
+    """
+    moves, rotation = absorb_rotations(code)
+    moves = merge_moves(moves)
+
+    return moves + rotation if keep_rotation else moves
+
+
+def savings(code, optimized, metric='htm'):
+    """
+    Returns a dict of the moves of code and of its optimized form in metric
+    (see tools.move_count), the moves saved and the rotations removed.
+    """
+    before = move_count(code, metric)
+    after = move_count(optimized, metric)
+    rotations = sum(turn in ROTATION_CODES for turn in code) - \
+        sum(turn in ROTATION_CODES for turn in optimized)
+
+    return {'before': before, 'after': after, 'saved': before - after,
+            'rotations_removed': rotations}
@@ -0,0 +1,131 @@
+"""
+Contains the PLL class which permutes the last layer by looking up its case
+in a table of the PLL algorithms instead of searching for an algorithm.
+
+The table is built by simulating every algorithm at once on a CubeBatch. Each
+algorithm is undone from a solved cube turned by each post-AUF and the result
+is turned by each pre-AUF, which gives all 16 ways the case can be found. The
+permutation signature of the last layer of each of these is then a key of
+the table.
+"""
+from operator import itemgetter
+
+import numpy as np
+
+from cfop.algorithms.tools import move_count, wiki_to_code
+from cfop.cube import CubeBatch
+from cfop.facelets import (CENTERS, IDENTITY, TURN_PERMS, compile_alg,
+                           dict_to_facelets, invert)
+from cfop.oll import AUFS, LAYER_FACELETS, center_preserving
+
+_LAYER_STICKERS = itemgetter(*LAYER_FACELETS)
+_CENTER_STICKERS = itemgetter(*CENTERS)
+# The permutation of each number of Up turns
+U_PERMS = [IDENTITY, TURN_PERMS['U'], TURN_PERMS['!'], TURN_PERMS['T']]
+
+_INDEX = {}
+
+
+def signature(facelets):
+    """
+    Returns the permutation signature of the Up layer of facelets, i.e. the
+    face (as its index in the order U L F R B D) whose center is the color of
+    each sticker of the Up layer.
+    """
+    faces = str.maketrans(''.join(_CENTER_STICKERS(facelets)), '012345')
+    return ''.join(_LAYER_STICKERS(facelets)).translate(faces)
+
+
+def build_index(algs, metric='htm'):
+    """
+    Builds the table of every PLL case. Returns a dict keyed by the
+    signature (see the signature function) of the case with a value of the
+    name of the case and the alg, in code syntax, that solves it including
+    the pre-AUF and post-AUF. If more than one alg solves a case then the one
+    with the fewest moves is kept. Algs that can't be read or whose case
+    isn't at the PLL step are skipped.
+
+    Parameters:
+    algs - A dict of the algs of each case as is returned by
+           pll_algs.get_algs
+    metric - (default 'htm') The metric the moves are counted in, see
+             tools.move_count
+    """
+    variants = []
+    for case, case_algs in algs.items():
+        for alg in case_algs:
+            try:
+                variants.append((case, center_preserving(wiki_to_code(alg))))
+            except Exception:
+                continue
+
+    # Every variant with each post-AUF and then each pre-AUF
+    combos = [(case, code, post, pre) for case, code in variants
+              for post in range(4) for pre in range(4)]
+    inverses = {code: invert(compile_alg(code)) for _, code in variants}
+
+    batch = CubeBatch(len(combos))
+    batch.apply_perms([U_PERMS[post] for _, _, post, _ in combos])
+    batch.apply_perms([inverses[code] for _, code, _, _ in combos])
+    batch.apply_perms([U_PERMS[pre] for _, _, _, pre in combos])
+
+    # The color indices of a batch are the face indices of the solved cube
+    valid = np.isin(batch.find_steps(), ['pll', 'solved'])
+    layers = batch.states[:, LAYER_FACELETS] + ord('0')
+
+    # A solved last layer only needs its post-AUF
+    index = {}
+    solved = CubeBatch(1)
+    for post in range(4):
+        index[signature(solved.facelets()[0])] = ('PLL skip', AUFS[post])
+        solved.turn('U')
+
+    for (case, code, post, pre), is_valid, layer in zip(combos, valid,
+                                                         layers):
+        if not is_valid:
+            continue
+
+        key = layer.tobytes().decode()
+        alg = AUFS[pre] + code + AUFS[post]
+        if key not in index or \
+                move_count(alg, metric) < move_count(index[key][1], metric):
+            index[key] = (case, alg)
+
+    return index
+
+
+def pll_index(metric='htm'):
+    """
+    Returns the table built from the algs of pll_algs.get_algs, building it
+    the first time it is needed for metric.
+    """
+    if metric not in _INDEX:
+        from cfop.algorithms.pll_algs import get_algs
+        _INDEX[metric] = build_index(get_algs(), metric)
+
+    return _INDEX[metric]
+
+
+class PLL:
+    """
+    This class permutes the last layer of a cube with a solved F2L and an
+    oriented last layer by finding its case in a table, which is one
+    signature computation and one dict lookup.
+
+    Parameters:
+    perm - The full permutation of the cube in its dict form or as a facelet
+           string (see facelets.py)
+    index - (default None) The table to use (see build_index), the one from
+            pll_index for metric if None
+    metric - (default 'htm') The metric of the table used if index is None
+    """
+
+    def __init__(self, perm, index=None, metric='htm'):
+        facelets = perm if isinstance(perm, str) else dict_to_facelets(perm)
+        index = pll_index(metric) if index is None else index
+
+        key = signature(facelets)
+        if key not in index:
+            raise Exception('The last layer is not a known PLL case.')
+
+        self.case, self.alg = index[key]
@@ -0,0 +1,255 @@
+"""
+Contains the pruning tables, i.e. tables of the exact number of face turns
+needed to solve a set of pieces, along with the one-time generator that
+builds them and writes them to disk.
+
+A piece is tracked by the facelet (see facelets.py) that one chosen sticker
+of it is on. This gives both the position and the orientation of the piece
+so an edge has 24 states and a corner has 24 states. A set of pieces is
+encoded as one integer by using the state of each piece as a digit in base
+24.
+
+The tables are saved as .npy files in the tables directory next to this
+file (or the directory in the CFOP_TABLE_DIR environment variable) and are
+memory-mapped when loaded. Run this module to generate all of them.
+"""
+import os
+import tempfile
+
+import numpy as np
+
+from cfop.facelets import FACELET_CUBIES, FACELET_INDEX, TURN_PERMS, invert
+from cfop.search import TURN_SPACE
+
+TABLE_DIR = os.environ.get('CFOP_TABLE_DIR',
+                           os.path.join(os.path.dirname(__file__), 'tables'))
+# Depth used for states that can't be reached
+UNREACHED = 255
+
+# The facelets an edge or corner sticker can be on
+EDGE_FACELETS = [n for n, (cubie, _) in enumerate(FACELET_CUBIES)
+                 if cubie.count(0) == 1]
+CORNER_FACELETS = [n for n, (cubie, _) in enumerate(FACELET_CUBIES)
+                   if cubie.count(0) == 0]
+# The coordinate of the cubie of each edge or corner state
+EDGE_COORDS = [FACELET_CUBIES[n][0] for n in EDGE_FACELETS]
+CORNER_COORDS = [FACELET_CUBIES[n][0] for n in CORNER_FACELETS]
+
+
+def _move_table(facelets):
+    """
+    Returns an 18x24 list where row n has the new state of each of the 24
+    states after the nth turn of TURN_SPACE.
+    """
+    table = []
+    for turn in TURN_SPACE:
+        # Where the sticker on each facelet is moved to
+        moved_to = invert(TURN_PERMS[turn])
+        table.append([facelets.index(moved_to[n]) for n in facelets])
+
+    return table
+
+
+EDGE_MOVES = _move_table(EDGE_FACELETS)
+CORNER_MOVES = _move_table(CORNER_FACELETS)
+
+# The cross edges in the order: F R B L
+CROSS_EDGES = [(0, -1, 1), (1, -1, 0), (0, -1, -1), (-1, -1, 0)]
+# The D sticker of each cross edge when solved
+CROSS_GOAL = [EDGE_FACELETS.index(FACELET_INDEX[(cubie, 1)])
+              for cubie in CROSS_EDGES]
+
+# The F2L slots by the coordinate of their edge
+SLOTS = [(1, 0, 1), (-1, 0, 1), (1, 0, -1), (-1, 0, -1)]
+
+
+def slot_goal(slot):
+    """
+    Returns the solved states of the pieces of an F2L slot table: the
+    corner (by its D sticker), the edge (by its sticker on the x axis) and
+    the two cross edges next to the slot (as in CROSS_EDGES).
+    """
+    x, _, z = slot
+    return [CORNER_FACELETS.index(FACELET_INDEX[((x, -1, z), 1)]),
+            EDGE_FACELETS.index(FACELET_INDEX[(slot, 0)]),
+            CROSS_GOAL[CROSS_EDGES.index((0, -1, z))],
+            CROSS_GOAL[CROSS_EDGES.index((x, -1, 0))]]
+
+
+def encode(states):
+    """
+    Encodes a list of piece states (each from 0 to 23) as one integer.
+    """
+    index = 0
+    for state in states:
+        index = 24 * index + state
+
+    return index
+
+
+def build_table(piece_moves, goal):
+    """
+    Builds the table of depths for a set of pieces by a breadth-first search
+    outward from the goal that applies every face turn to the whole frontier
+    at once.
+
+    Parameters:
+    piece_moves - A list of the move table (EDGE_MOVES or CORNER_MOVES) of
+                  each piece
+    goal - The list of the solved state of each piece
+    """
+    piece_moves = [np.array(moves) for moves in piece_moves]
+    num_pieces = len(piece_moves)
+    powers = 24 ** np.arange(num_pieces - 1, -1, -1)
+    table = np.full(24 ** num_pieces, UNREACHED, np.uint8)
+
+    frontier = np.array([encode(goal)])
+    table[frontier] = depth = 0
+
+    while frontier.size:
+        depth += 1
+        digits = frontier[:, None] // powers % 24
+        new_frontier = []
+        for n in range(len(TURN_SPACE)):
+            new = sum(moves[n][digits[:, m]].astype(np.int64) * powers[m]
+                      for m, moves in enumerate(piece_moves))
+            new = new[table[new] == UNREACHED]
+            table[new] = depth
+            new_frontier.append(new)
+
+        frontier = np.unique(np.concatenate(new_frontier))
+
+    return table
+
+
+def load_table(name, builder, table_dir=None):
+    """
+    Memory-maps the table saved as name, building and saving it with
+    builder() first if it doesn't exist yet. If another process saves the
+    table while it is being built, that one is loaded instead.
+
+    Parameters:
+    name - The file name of the table without the extension
+    builder - A function with no arguments that returns the table
+    table_dir - (default None) The directory of the tables if not TABLE_DIR
+    """
+    path = _table_path(name, table_dir)
+
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        table = builder()
+        # Write to a temporary file of this process so a partial table is
+        # never loaded and processes building it at once don't clash
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path),
+                                        suffix='.npy')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                np.save(tmp_file, table)
+            if not os.path.exists(path):
+                os.replace(tmp_path, path)
+        except OSError:
+            if not os.path.exists(path):
+                raise
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    return np.load(path, mmap_mode='r')
+
+
+def _table_path(name, table_dir=None):
+    """
+    Returns the path of the table saved as name in table_dir (TABLE_DIR if
+    None).
+    """
+    return os.path.join(table_dir or TABLE_DIR, name + '.npy')
+
+
+# The loaded tables keyed by their path
+_TABLES = {}
+
+
+def _cached_table(name, builder, table_dir=None):
+    """
+    Returns the table saved as name in table_dir, loading it (see
+    load_table) the first time it is needed.
+    """
+    path = _table_path(name, table_dir)
+    if path not in _TABLES:
+        _TABLES[path] = load_table(name, builder, table_dir)
+
+    return _TABLES[path]
+
+
+def cross_table(table_dir=None):
+    """
+    Returns the table of the number of turns needed to solve the cross for
+    the 24^4 states of the four cross edges (in the order F R B L), loading
+    it the first time it is needed.
+    """
+    return _cached_table(
+        'cross', lambda: build_table([EDGE_MOVES] * 4, CROSS_GOAL),
+        table_dir)
+
+
+def slot_table(slot, table_dir=None):
+    """
+    Returns the table of the number of turns needed to solve an F2L pair
+    into slot together with the two cross edges next to it for the 24^4
+    states of those pieces (in the order of slot_goal), loading it the first
+    time it is needed.
+
+    Parameters:
+    slot - The coordinate of the edge of the slot (one of SLOTS)
+    """
+    name = 'f2l_{}{}'.format('r' if slot[0] == 1 else 'l',
+                             'f' if slot[2] == 1 else 'b')
+    moves = [CORNER_MOVES, EDGE_MOVES, EDGE_MOVES, EDGE_MOVES]
+    return _cached_table(
+        name, lambda: build_table(moves, slot_goal(slot)), table_dir)
+
+
+def descend(table, piece_moves, states, stats=None):
+    """
+    Finds an optimal algorithm by repeatedly taking a turn that lowers the
+    depth in the table by one until the depth is 0.
+
+    Parameters:
+    table - The table of depths (e.g. from cross_table)
+    piece_moves - A list of the move table of each piece
+    states - The list of the current state of each piece
+    stats - (default None) A search.SearchStats that the states looked up
+            are counted in
+    """
+    depth = int(table[encode(states)])
+    if depth == UNREACHED:
+        raise Exception('The states {} are not in the table.'.format(states))
+
+    alg = ''
+    generated = 0
+    while depth:
+        for n, turn in enumerate(TURN_SPACE):
+            new_states = [moves[n][state]
+                          for moves, state in zip(piece_moves, states)]
+            generated += 1
+
+            if table[encode(new_states)] == depth - 1:
+                alg += turn
+                states, depth = new_states, depth - 1
+                break
+
+    if stats is not None:
+        stats.generated += generated
+        stats.evaluations += generated + 1
+        stats.expanded += len(alg)
+        stats.depth = max(stats.depth, len(alg))
+
+    return alg
+
+
+if __name__ == '__main__':
+    print('Cross table: {} states'.format(
+        np.count_nonzero(cross_table() != UNREACHED)))
+    for slot in SLOTS:
+        print('F2L slot {} table: {} states'.format(
+            slot, np.count_nonzero(slot_table(slot) != UNREACHED)))
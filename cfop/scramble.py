@@ -0,0 +1,232 @@
+"""
+Contains the bulk scramble generators, which make a whole corpus of
+scrambles at once as NumPy arrays from a seed so that the same seed always
+gives the same corpus.
+
+A move scramble follows the same rules as tools.random_scramble: a face is
+never turned twice in a row and never turned again right after its opposite
+face, e.g. L R L. Each scramble is a row of indices into TURN_SPACE, which
+is made one column at a time for every row at once.
+
+A random state is a uniformly random state of all the ones that can be
+reached from the solved cube. It is made as the cubies: a random permutation
+of the corners and of the edges and a random twist of each corner and flip
+of each edge. A state can only be reached if the permutations have the same
+parity, the twists add up to a multiple of 3 and the flips to a multiple of
+2, so the last twist and flip are picked to make it so and the last two
+edges are swapped when the parities differ. Each of these maps the states
+that can't be reached onto the ones that can one to one, so it is the same
+as drawing until a state can be reached. The cubies are then put in the
+facelet form of a cube.CubeBatch. is_solvable does these checks for any
+batch of states.
+"""
+import numpy as np
+
+from cfop.cube import CubeBatch
+from cfop.facelets import CUBIE_FACELETS, FACELET_CUBIES
+
+# Each face's three turns in code syntax (clockwise, counterclockwise and
+# double) in the order U L F D R B, so the opposite face is 3 faces along
+TURN_SPACE = 'UT!LK@FE#DC^RQ$BA%'
+_TURN_BYTES = np.frombuffer(TURN_SPACE.encode(), np.uint8)
+
+
+def _cubie_facelets(cubie):
+    """
+    Returns the facelets of a cubie starting with its Up or Down sticker, or
+    its Front or Back sticker for an edge of the middle layer. The stickers
+    of a corner then go the same way round on every corner, so that a twist
+    of a corner is a cyclic shift of them.
+    """
+    facelets = {axis: n for n, (coord, axis) in enumerate(FACELET_CUBIES)
+                if coord == cubie}
+    first = 2 if cubie[1] == 0 else 1
+    axes = sorted(facelets, key=lambda axis: (axis != first, axis))
+    if len(axes) == 3 and cubie[0] * cubie[1] * cubie[2] > 0:
+        axes[1:] = axes[:0:-1]
+
+    return [facelets[axis] for axis in axes]
+
+
+_CORNERS = [cubie for cubie in CUBIE_FACELETS if cubie.count(0) == 0]
+_EDGES = [cubie for cubie in CUBIE_FACELETS if cubie.count(0) == 1]
+# The facelets of each corner and edge as rows, see _cubie_facelets
+CORNER_FACELETS = np.array([_cubie_facelets(c) for c in _CORNERS], np.intp)
+EDGE_FACELETS = np.array([_cubie_facelets(e) for e in _EDGES], np.intp)
+CENTER_FACELETS = np.arange(4, 54, 9)
+
+# The colors of each cubie in the order of its facelets when it is solved,
+# i.e. the color of a facelet of the solved cube is its face
+CORNER_COLORS = (CORNER_FACELETS // 9).astype(np.uint8)
+EDGE_COLORS = (EDGE_FACELETS // 9).astype(np.uint8)
+
+
+def _piece_lookup(colors):
+    """
+    Returns the table of the cubie with each set of colors as a bit mask
+    (-1 for sets that aren't a cubie).
+    """
+    lookup = np.full(64, -1, np.intp)
+    lookup[(1 << colors.astype(np.intp)).sum(axis=1)] = range(len(colors))
+    return lookup
+
+
+_CORNER_LOOKUP = _piece_lookup(CORNER_COLORS)
+_EDGE_LOOKUP = _piece_lookup(EDGE_COLORS)
+
+
+def _rng(seed):
+    """
+    Returns the NumPy Generator of seed, which is passed through if it
+    already is one.
+    """
+    return np.random.default_rng(seed)
+
+
+def random_moves(count, length=20, seed=None):
+    """
+    Returns a (count, length) uint8 array of random move scrambles where
+    each move is its index in TURN_SPACE (see the module docstring).
+
+    Parameters:
+    count - The number of scrambles
+    length - (default 20) The number of moves of each scramble
+    seed - (default None) The seed or numpy.random.Generator to draw from,
+           a fresh seed from the OS if None
+    """
+    rng = _rng(seed)
+    faces = np.empty((count, length), np.uint8)
+    # The faces before the first move, 6 and 7 aren't faces so can't clash
+    last, before = np.full(count, 6), np.full(count, 7)
+    for n in range(length):
+        # The faces that can't be turned: the last one and the one before it
+        # if the last one was its opposite. The face is drawn from the others
+        # by skipping over them in order
+        sandwich = (last + 3) % 6 == before
+        low = np.where(sandwich, np.minimum(last, before), last)
+        high = np.where(sandwich, np.maximum(last, before), 6)
+        face = rng.integers(0, 6 - (last < 6) - sandwich)
+        face += face >= low
+        face += face >= high
+
+        faces[:, n] = face
+        last, before = face, last
+
+    turns = rng.integers(0, 3, (count, length), np.uint8)
+    return 3 * faces + turns
+
+
+def moves_to_codes(moves):
+    """
+    Returns the scramble of each row of moves (see random_moves) as a code
+    syntax string.
+    """
+    chars = _TURN_BYTES[moves].tobytes().decode()
+    length = moves.shape[1]
+    return [chars[n:n + length] for n in range(0, len(chars), length)]
+
+
+def apply_moves(moves, batch=None):
+    """
+    Applies each row of moves (see random_moves) to its cube of batch, one
+    column at a time, and returns the batch.
+
+    Parameters:
+    moves - An (N, length) array of moves as from random_moves
+    batch - (default None) The cube.CubeBatch of N cubes to apply them to,
+            N solved cubes if None
+    """
+    if batch is None:
+        batch = CubeBatch(len(moves))
+
+    for column in _TURN_BYTES[moves].T:
+        batch.apply_turns(column.tobytes().decode())
+
+    return batch
+
+
+def _parity(perms):
+    """
+    Returns the parity (0 for even, 1 for odd) of each row of perms as the
+    number of pairs of it that are out of order.
+    """
+    size = perms.shape[1]
+    above = np.triu(np.ones((size, size), bool), 1)
+    inversions = (perms[:, :, None] > perms[:, None, :]) & above
+    return inversions.sum(axis=(1, 2)) % 2
+
+
+def random_states(count, seed=None):
+    """
+    Returns a cube.CubeBatch of count uniformly random states that can be
+    reached from the solved cube (see the module docstring).
+
+    Parameters:
+    count - The number of states
+    seed - (default None) The seed or numpy.random.Generator to draw from,
+           a fresh seed from the OS if None
+    """
+    rng = _rng(seed)
+    corners = rng.permuted(np.tile(np.arange(8), (count, 1)), axis=1)
+    edges = rng.permuted(np.tile(np.arange(12), (count, 1)), axis=1)
+    swap = _parity(corners) != _parity(edges)
+    edges[swap, 10:] = edges[swap, :9:-1]
+
+    twists = rng.integers(0, 3, (count, 8))
+    twists[:, -1] = -twists[:, :-1].sum(axis=1) % 3
+    flips = rng.integers(0, 2, (count, 12))
+    flips[:, -1] = flips[:, :-1].sum(axis=1) % 2
+
+    states = np.empty((count, 54), np.uint8)
+    states[:, CENTER_FACELETS] = range(6)
+    # The sticker of a cubie on facelet k of its place is its (k - twist)th
+    states[:, CORNER_FACELETS] = CORNER_COLORS[
+        corners[:, :, None], (np.arange(3) - twists[:, :, None]) % 3]
+    states[:, EDGE_FACELETS] = EDGE_COLORS[
+        edges[:, :, None], (np.arange(2) - flips[:, :, None]) % 2]
+
+    return CubeBatch(states)
+
+
+def _read_cubies(states, facelets, colors, lookup):
+    """
+    Returns the cubie at each place of each state, its twist (or flip) and
+    whether its stickers are of that cubie in the right order.
+    """
+    stickers = states[:, facelets].astype(np.intp)
+    pieces = lookup[(1 << stickers).sum(axis=2)]
+    # The twist is where the cubie's first sticker is, which is its Up or
+    # Down sticker (or Front or Back sticker) when solved
+    twists = (stickers == colors[pieces, :1]).argmax(axis=2)
+    size = facelets.shape[1]
+    rolled = colors[pieces[:, :, None],
+                    (np.arange(size) - twists[:, :, None]) % size]
+    valid = (pieces >= 0) & (rolled == stickers).all(axis=2)
+
+    return pieces, twists, valid.all(axis=1)
+
+
+def is_solvable(states):
+    """
+    Returns a bool array of which states can be reached from the solved cube
+    with face turns, i.e. which states can be solved. Every center has to be
+    on its own face.
+
+    Parameters:
+    states - A cube.CubeBatch or an (N, 54) array of color indices (e.g.
+             CubeBatch.states)
+    """
+    if isinstance(states, CubeBatch):
+        states = states.states
+
+    corners, twists, corners_valid = _read_cubies(
+        states, CORNER_FACELETS, CORNER_COLORS, _CORNER_LOOKUP)
+    edges, flips, edges_valid = _read_cubies(
+        states, EDGE_FACELETS, EDGE_COLORS, _EDGE_LOOKUP)
+
+    return ((states[:, CENTER_FACELETS] == range(6)).all(axis=1) &
+            corners_valid & edges_valid &
+            (np.sort(corners, axis=1) == range(8)).all(axis=1) &
+            (np.sort(edges, axis=1) == range(12)).all(axis=1) &
+            (_parity(corners) == _parity(edges)) &
+            (twists.sum(axis=1) % 3 == 0) & (flips.sum(axis=1) % 2 == 0))
@@ -0,0 +1,320 @@
+"""
+Contains the Search class, the A* pathfinding shared by the Cross and F2L
+classes, and the SearchStats record that every search of the solver returns.
+"""
+from heapq import heappop, heappush
+from itertools import count
+from time import monotonic, perf_counter
+
+# Every single layer face turn
+TURN_SPACE = 'UT!LK@FE#RQ$BA%DC^'
+
+
+def _next_turns(turn):
+    """
+    Returns the turns worth trying after turn. Turns of the same face are
+    removed along with half of the mirror moves (e.g. RL = LR and so on).
+    """
+    if not turn:
+        return TURN_SPACE
+
+    last = TURN_SPACE.index(turn)
+    no_turn = last - (last % 3)
+    turn_space = TURN_SPACE[:no_turn] + TURN_SPACE[no_turn + 3:]
+
+    if turn in 'UT!':
+        turn_space = turn_space.replace('DC^', '')
+    elif turn in 'LK@':
+        turn_space = turn_space.replace('RQ$', '')
+    elif turn in 'FE#':
+        turn_space = turn_space.replace('BA%', '')
+
+    return turn_space
+
+
+# The turns to try next keyed by the last turn of the alg
+NEXT_TURNS = {turn: _next_turns(turn) for turn in [''] + list(TURN_SPACE)}
+# The most turns added to the best node found when a budget runs out
+GREEDY_TURNS = 20
+
+
+class Budget:
+    """
+    A limit on the nodes a search can expand and on the time it can take.
+    One budget can be shared by several searches (e.g. each F2L pair) so
+    that it limits all of them together. The clock starts when the budget
+    is created.
+
+    Parameters:
+    max_nodes - (default None) The most nodes that can be expanded, no limit
+                if None
+    time_limit - (default None) The most seconds that can be taken, no limit
+                 if None
+    """
+
+    def __init__(self, max_nodes=None, time_limit=None):
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.nodes = 0
+        self.deadline = None if time_limit is None else \
+            monotonic() + time_limit
+
+    def spend(self, nodes=1):
+        """
+        Counts nodes as expanded and returns True if the budget has run out.
+        """
+        self.nodes += nodes
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            return True
+
+        return self.deadline is not None and monotonic() >= self.deadline
+
+
+class SearchStats:
+    """
+    The counts of one search, or of several added together with + (e.g. the
+    four F2L pairs or every solve of a batch), where the peaks are the most
+    of any of them and the rest are summed.
+
+    A search without an open set (iterative deepening or descending a
+    pruning table) has a peak_open and heap_ops of 0, and iterative
+    deepening counts a node again for each bound it is expanded under.
+
+    Parameters:
+    generated - (default 0) The nodes made from an expanded node
+    expanded - (default 0) The nodes whose children were looked at
+    duplicates - (default 0) The nodes rejected as already expanded or seen
+    peak_open - (default 0) The most nodes in the open set at once
+    heap_ops - (default 0) The pushes and pops of the open set
+    depth - (default 0) The most turns of an expanded node
+    evaluations - (default 0) The number of times the heuristic was worked
+                  out
+    time - (default 0) The seconds the search took
+    """
+    __slots__ = ('generated', 'expanded', 'duplicates', 'peak_open',
+                 'heap_ops', 'depth', 'evaluations', 'time')
+    FIELDS = __slots__
+    # The fields that are the most of the searches added instead of the sum
+    PEAKS = ('peak_open', 'depth')
+
+    def __init__(self, generated=0, expanded=0, duplicates=0, peak_open=0,
+                 heap_ops=0, depth=0, evaluations=0, time=0):
+        self.generated = generated
+        self.expanded = expanded
+        self.duplicates = duplicates
+        self.peak_open = peak_open
+        self.heap_ops = heap_ops
+        self.depth = depth
+        self.evaluations = evaluations
+        self.time = time
+
+    def __add__(self, other):
+        if not isinstance(other, SearchStats):
+            return NotImplemented
+
+        return SearchStats(**{
+            field: (max if field in self.PEAKS else sum)(
+                (getattr(self, field), getattr(other, field)))
+            for field in self.FIELDS})
+
+    def __radd__(self, other):
+        # So that sum() can start from 0
+        return self if other == 0 else NotImplemented
+
+    def __eq__(self, other):
+        return isinstance(other, SearchStats) and \
+            self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return 'SearchStats({})'.format(', '.join(
+            '{}={}'.format(field, getattr(self, field))
+            for field in self.FIELDS))
+
+    @property
+    def branching_factor(self):
+        """
+        The average number of nodes generated per node expanded.
+        """
+        return self.generated / self.expanded if self.expanded else 0.0
+
+    def to_dict(self):
+        """
+        Returns the counts as a dict, e.g. to write as JSON.
+        """
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+class Node:
+    """
+    The base of the nodes of the search. A node only keeps its parent and the
+    turn from it so the alg is only built when it is needed, i.e. once for
+    the goal node. The __slots__ keep each node small since a search can
+    hold hundreds of thousands of them.
+
+    Parameters:
+    parent - The node this one was found from or None for the start node
+    turn - The turn from parent to this node or '' for the start node
+    key - The state_key of the state of this node
+    """
+    __slots__ = ('parent', 'turn', 'key', 'g_cost', 'h_cost', 'abs_h_cost',
+                 'f_cost')
+
+    def __init__(self, parent, turn, key):
+        self.parent = parent
+        self.turn = turn
+        self.key = key
+        self.g_cost = parent.g_cost + 1 if parent is not None else 0
+
+    @property
+    def alg(self):
+        """
+        The alg from the start node to this node.
+        """
+        turns = []
+        node = self
+        while node.parent is not None:
+            turns.append(node.turn)
+            node = node.parent
+
+        return ''.join(reversed(turns))
+
+
+class Search:
+    """
+    A* pathfinding from a start node to the first node with an abs_h_cost
+    of 0.
+
+    The open set is a binary heap (via heapq) ordered on the f_cost of each
+    node with the h_cost/100 added to break ties and then the order in which
+    the nodes were added. The closed set is a set of the keys of the states
+    already expanded so checking a new state is a hash lookup.
+
+    The nodes can be of any subclass of Node with the methods:
+        state_key(state) - A hashable, immutable encoding of state
+        apply_turn(turn) - The state after applying turn to the node
+        child(turn, state, key) - The node for state found by turn
+
+    If the budget runs out before a goal is found then the node with the
+    lowest abs_h_cost found so far is taken greedily closer to a goal (see
+    greedy) and returned instead with optimal set to False.
+
+    Parameters:
+    start - The node to start the search from
+    max_len - (default None) If given, nodes whose alg would be this long
+              are not added to the open set
+    budget - (default None) The Budget of the search, no limit if None
+    """
+
+    def __init__(self, start, max_len=None, budget=None):
+        self.max_len = max_len
+        self.budget = budget
+        self.open_set = []
+        self.closed_set = set()
+        self._order = count()
+        self.best = start
+        self.optimal = True
+        self.stats = SearchStats()
+
+        self._push(start)
+
+    def _push(self, node):
+        """
+        Adds node, whose heuristic has been worked out, to the open set.
+        """
+        heappush(self.open_set, (node.f_cost + node.h_cost/100,
+                                 next(self._order), node))
+        stats = self.stats
+        stats.heap_ops += 1
+        stats.evaluations += 1
+        stats.peak_open = max(stats.peak_open, len(self.open_set))
+
+    def run(self):
+        """
+        Runs the search and returns the goal node, or the best node found if
+        the budget runs out. The time taken is added to self.stats.
+        """
+        t0 = perf_counter()
+        try:
+            return self._run()
+        finally:
+            self.stats.time += perf_counter() - t0
+
+    def _run(self):
+        """
+        The search itself, see run.
+        """
+        stats = self.stats
+        while self.open_set:
+            # Take object with lowest f_cost
+            current = heappop(self.open_set)[2]
+            stats.heap_ops += 1
+
+            # A state can be in the open set more than once
+            if current.key in self.closed_set:
+                stats.duplicates += 1
+                continue
+
+            if self.budget is not None and self.budget.spend():
+                self.optimal = False
+                return self.greedy(self.best)
+            self.closed_set.add(current.key)
+            stats.expanded += 1
+            stats.depth = max(stats.depth, current.g_cost)
+
+            # Return if perm is equal to the goal perm
+            if not current.abs_h_cost:
+                return current
+
+            if current.abs_h_cost < self.best.abs_h_cost:
+                self.best = current
+
+            if self.max_len and current.g_cost + 1 >= self.max_len:
+                continue
+
+            # Create new nodes and put in open_set to check next if
+            # the state hasn't already been found
+            for turn in NEXT_TURNS[current.turn]:
+                new_state = current.apply_turn(turn)
+                key = current.state_key(new_state)
+
+                if key in self.closed_set:
+                    stats.duplicates += 1
+                    continue
+
+                stats.generated += 1
+                self._push(current.child(turn, new_state, key))
+
+        raise Exception('The search ran out of nodes before finding a goal.')
+
+    def greedy(self, node):
+        """
+        Takes the child with the lowest abs_h_cost (then h_cost) of node
+        that hasn't been seen yet until a goal is found, there are no such
+        children or GREEDY_TURNS turns have been taken. Returns the node on
+        the way with the lowest abs_h_cost.
+        """
+        seen = {node.key}
+        best = node
+        for _ in range(GREEDY_TURNS):
+            if not node.abs_h_cost:
+                break
+
+            children = []
+            for turn in NEXT_TURNS[node.turn]:
+                new_state = node.apply_turn(turn)
+                key = node.state_key(new_state)
+                if key in seen:
+                    self.stats.duplicates += 1
+                else:
+                    children.append(node.child(turn, new_state, key))
+            self.stats.generated += len(children)
+            self.stats.evaluations += len(children)
+            if not children:
+                break
+
+            node = min(children, key=lambda n: (n.abs_h_cost, n.h_cost))
+            seen.add(node.key)
+            if node.abs_h_cost < best.abs_h_cost:
+                best = node
+
+        return best
@@ -0,0 +1,343 @@
+"""
+Contains the SolveServer class, a local asyncio HTTP server that solves
+scrambles for other programs so that each of them doesn't have to load the
+tables and search on its own:
+
+    python -m cfop.server --port 8000
+    curl --data-binary @scrambles.txt localhost:8000/solve
+
+The body of a POST to /solve has one scramble per line as for the command
+line solver (see __main__.py, add ?code=1 for the code syntax). The result of
+each is streamed back as a JSON line (see formats.to_json) in the order of the
+lines as soon as it and the ones before it are solved. A GET of /stats
+returns the queue depth, the latency percentiles and the search stats of
+every solve so far added together as JSON.
+
+A request whose body is larger than max_body bytes or that has more than
+max_scrambles scrambles is refused with a 413.
+
+The scrambles of every request are put on one queue. Whatever is on it is
+taken as one batch, waiting at most max_wait seconds for the batch to fill
+up, and solved in a pool of worker processes that loaded the tables when
+they started. At most one batch per worker is solved at once so the rest
+wait on the queue.
+"""
+import asyncio
+import json
+from argparse import ArgumentParser
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+from time import perf_counter
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from cfop.search import SearchStats
+from cfop.formats import parse_scramble, to_json
+from cfop.solver import solve_scramble
+
+# The percentiles of the latency in /stats
+PERCENTILES = [50, 90, 99]
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 413: 'Payload Too Large'}
+
+
+def _warm():
+    """
+    Loads the pruning tables and the OLL and PLL tables in a worker process
+    when it starts.
+    """
+    from cfop.oll import oll_index
+    from cfop.pll import pll_index
+    from cfop.pruning import SLOTS, cross_table, slot_table
+
+    cross_table()
+    for slot in SLOTS:
+        slot_table(slot)
+    oll_index()
+    pll_index()
+
+
+def _solve_batch(batch, max_nodes, time_limit):
+    """
+    Solves a batch of (scramble, alg_input) in a worker process and returns
+    the result of each (see solver.solve_scramble).
+    """
+    return [solve_scramble(scramble, alg_input, max_nodes, time_limit)
+            for scramble, alg_input in batch]
+
+
+class SolveServer:
+    """
+    This class solves scrambles in micro-batches on a warm pool of worker
+    processes and serves them over HTTP on a TCP port or a Unix socket.
+
+    Parameters:
+    workers - (default None) The number of worker processes, one per CPU if
+              None
+    max_batch - (default 16) The most scrambles solved in one batch
+    max_wait - (default 0.005) The most seconds a batch waits to fill up
+    max_nodes - (default None) The most nodes each search can expand
+    time_limit - (default None) The most seconds each search can take
+    history - (default 10000) The number of latencies kept for /stats
+    max_body - (default 1048576) The most bytes the body of a request can
+               have
+    max_scrambles - (default 10000) The most scrambles one request can
+                    queue
+    """
+
+    def __init__(self, workers=None, max_batch=16, max_wait=0.005,
+                 max_nodes=None, time_limit=None, history=10000,
+                 max_body=1 << 20, max_scrambles=10000):
+        self.workers = workers or cpu_count()
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.budget = (max_nodes, time_limit)
+        self.max_body = max_body
+        self.max_scrambles = max_scrambles
+
+        self.pool, self.server, self._batcher = None, None, None
+        self.queue = None
+        self.in_flight = 0
+        self.solved = 0
+        self.batches = 0
+        self.search = SearchStats()
+        self.latencies = deque(maxlen=history)
+
+    async def start(self, host='127.0.0.1', port=0, path=None):
+        """
+        Starts the worker processes, waits for them to load the tables and
+        starts serving on host and port, or on the Unix socket at path if
+        given. A port of 0 picks a free port, see self.address.
+        """
+        loop = asyncio.get_running_loop()
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_warm)
+        # Every worker is started and warm before the first request
+        await asyncio.gather(*[loop.run_in_executor(self.pool, abs, 0)
+                               for _ in range(self.workers)])
+
+        self.queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._batch_loop())
+        if path is None:
+            self.server = await asyncio.start_server(self._handle, host, port)
+        else:
+            self.server = await asyncio.start_unix_server(self._handle, path)
+
+    @property
+    def address(self):
+        """
+        The address served on, (host, port) or the path of the Unix socket.
+        """
+        return self.server.sockets[0].getsockname()
+
+    async def close(self):
+        """
+        Stops serving and shuts down the worker processes.
+        """
+        self.server.close()
+        await self.server.wait_closed()
+        self._batcher.cancel()
+        self.pool.shutdown(cancel_futures=True)
+
+    async def solve(self, scramble, alg_input=True):
+        """
+        Solves one scramble (see solver.solve_scramble) as part of the next
+        batch and returns its result.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((scramble, alg_input, future, perf_counter()))
+        return await future
+
+    async def _batch_loop(self):
+        """
+        Takes batches off the queue and sends each to the pool, keeping at
+        most one batch per worker in flight.
+        """
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.workers)
+        while True:
+            await slots.acquire()
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(await asyncio.wait_for(
+                        self.queue.get(), deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+
+            self.in_flight += len(batch)
+            task = loop.run_in_executor(
+                self.pool, _solve_batch,
+                [(scramble, alg_input) for scramble, alg_input, _, _ in batch],
+                *self.budget)
+            task.add_done_callback(
+                lambda task, batch=batch: self._finish(task, batch, slots))
+
+    def _finish(self, task, batch, slots):
+        """
+        Sets the result of each request of a finished batch.
+        """
+        slots.release()
+        self.in_flight -= len(batch)
+        self.batches += 1
+        now = perf_counter()
+
+        for n, (_, _, future, t0) in enumerate(batch):
+            if future.done():
+                continue
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                result = task.result()[n]
+                future.set_result(result)
+                self.solved += 1
+                self.search += sum(result['stats'].values(), SearchStats())
+                self.latencies.append(now - t0)
+
+    def stats(self):
+        """
+        Returns a dict of the scrambles waiting on the queue, the scrambles
+        being solved, the number solved and batches run so far, the
+        latency percentiles in seconds and the search stats of the solves
+        (see search.SearchStats).
+        """
+        latencies = np.array(self.latencies)
+        percentiles = np.percentile(latencies, PERCENTILES) \
+            if latencies.size else [None] * len(PERCENTILES)
+
+        return {'queued': self.queue.qsize(),
+                'in_flight': self.in_flight,
+                'solved': self.solved,
+                'batches': self.batches,
+                'latency': {'p{}'.format(p): None if value is None
+                            else float(value)
+                            for p, value in zip(PERCENTILES, percentiles)},
+                'search': self.search.to_dict()}
+
+    async def _handle(self, reader, writer):
+        """
+        Handles one HTTP request of a connection.
+        """
+        try:
+            method, target, _ = (await reader.readline()).decode().split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode().strip()
+                if not line:
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get('content-length', 0))
+            if length > self.max_body:
+                await self._respond(writer, 413, 'The body is larger than '
+                                    '{} bytes.'.format(self.max_body))
+                return
+            body = (await reader.readexactly(length)).decode()
+        except (ValueError, UnicodeDecodeError, asyncio.IncompleteReadError):
+            await self._respond(writer, 400, 'Could not read the request.')
+            return
+
+        url = urlsplit(target)
+        if url.path == '/stats':
+            await self._respond(writer, 200, json.dumps(self.stats()))
+        elif url.path != '/solve':
+            await self._respond(writer, 404, 'No such path.')
+        elif method != 'POST':
+            await self._respond(writer, 405, 'Scrambles have to be POSTed.')
+        else:
+            code = parse_qs(url.query).get('code', ['0'])[0] not in ['', '0']
+            lines = [line for line in body.splitlines() if line.strip()]
+            if len(lines) > self.max_scrambles:
+                await self._respond(writer, 413, 'There are more than {} '
+                                    'scrambles.'.format(self.max_scrambles))
+            else:
+                await self._stream(writer, lines, not code)
+
+    async def _stream(self, writer, lines, alg_input):
+        """
+        Queues the scramble of every line and writes the result of each as a
+        chunk as soon as it and the ones before it are solved.
+        """
+        scrambles = [parse_scramble(line) for line in lines]
+        tasks = [asyncio.create_task(self.solve(scramble, alg_input))
+                 for scramble in scrambles]
+
+        writer.write(b'HTTP/1.1 200 OK\r\n'
+                     b'Content-Type: application/x-ndjson\r\n'
+                     b'Transfer-Encoding: chunked\r\n'
+                     b'Connection: close\r\n\r\n')
+        try:
+            for index, task in enumerate(tasks):
+                result = dict(await task, index=index)
+                line = (to_json(result) + '\n').encode()
+                writer.write(b'%x\r\n%s\r\n' % (len(line), line))
+                await writer.drain()
+            writer.write(b'0\r\n\r\n')
+            await writer.drain()
+        except ConnectionError:
+            for task in tasks:
+                task.cancel()
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, text):
+        """
+        Writes a whole response and closes the connection.
+        """
+        body = text.encode()
+        content_type = 'application/json' if status == 200 else 'text/plain'
+        writer.write('HTTP/1.1 {} {}\r\n'.format(status, REASONS[status])
+                     .encode() +
+                     'Content-Type: {}\r\n'.format(content_type).encode() +
+                     'Content-Length: {}\r\n'.format(len(body)).encode() +
+                     b'Connection: close\r\n\r\n' + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+
+async def serve(host='127.0.0.1', port=8000, path=None, **kwargs):
+    """
+    Runs a SolveServer (with the keyword arguments kwargs) until cancelled.
+    """
+    server = SolveServer(**kwargs)
+    await server.start(host, port, path)
+    print('Serving on {}'.format(server.address), flush=True)
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='python -m cfop.server',
+                            description='Serves the CFOP solver over HTTP.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--unix', default=None,
+                        help='path of a Unix socket to serve on instead')
+    parser.add_argument('-w', '--workers', type=int, default=None)
+    parser.add_argument('--max-batch', type=int, default=16)
+    parser.add_argument('--max-wait', type=float, default=0.005)
+    parser.add_argument('--max-nodes', type=int, default=None)
+    parser.add_argument('--time-limit', type=float, default=None)
+    parser.add_argument('--max-body', type=int, default=1 << 20)
+    parser.add_argument('--max-scrambles', type=int, default=10000)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix,
+                          workers=args.workers, max_batch=args.max_batch,
+                          max_wait=args.max_wait, max_nodes=args.max_nodes,
+                          time_limit=args.time_limit,
+                          max_body=args.max_body,
+                          max_scrambles=args.max_scrambles))
+    except KeyboardInterrupt:
+        pass
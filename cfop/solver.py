@@ -1,12 +1,77 @@
 '''
-Contains the Solver class.
+Contains the Solver class and solve_many, which solves many cubes at once in a
+pool of worker processes.
 '''
-from itertools import permutations
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+from itertools import count, islice
+from os import cpu_count
+from time import perf_counter
 
 from cfop.cube import Cube
 from cfop.cross import Cross
 from cfop.f2l import F2L
-from cfop.algorithms.tools import code_to_alg
+from cfop.f2l_order import best_order
+from cfop.inspection import inspect
+from cfop.oll import OLL
+from cfop.optimize import optimize, savings
+from cfop.pll import PLL
+from cfop.facelets import (CUBIES, FACELET_CUBIES, MOVE_PERMS, compile_alg,
+                           dict_to_facelets)
+from cfop.search import Budget, SearchStats
+from cfop.symmetry import (canonical, colors_to_canonical,
+                           colors_to_original, to_canonical, to_original)
+from cfop.algorithms.tools import alg_to_code, code_to_alg, move_count
+
+
+# The step each non-center cubie is counted for by Solver.find_step: the
+# cross edges, the rest of the F2L (the Down corners and the middle layer
+# edges) and the last layer
+CUBIE_STEPS = {cubie: 'cross' if cubie[1] == -1 and cubie.count(0) == 1 else
+               'f2l' if cubie[1] != 1 else 'll'
+               for cubie in CUBIES if cubie.count(0) != 2}
+# Each axis of a cubie with a sticker and the center on the same face
+CUBIE_CENTERS = {cubie: [(axis, tuple(cubie[n] * (n == axis)
+                                      for n in range(3)))
+                         for axis in range(3) if cubie[axis]]
+                 for cubie in CUBIE_STEPS}
+
+
+def _perm_cubies(perm):
+    """
+    Returns the non-center cubies that the sticker permutation perm changes,
+    which is all of them if it moves a center since that changes what every
+    cubie is compared to.
+    """
+    moved = {FACELET_CUBIES[n][0] for n in range(54) if perm[n] != n}
+    if any(cubie.count(0) == 2 for cubie in moved):
+        return tuple(CUBIE_STEPS)
+
+    return tuple(moved)
+
+
+@lru_cache(maxsize=4096)
+def moved_cubies(alg):
+    """
+    Returns the non-center cubies that the alg (in code syntax) changes (see
+    _perm_cubies).
+    """
+    return _perm_cubies(compile_alg(alg))
+
+
+# The cubies each move changes keyed by its turn_rotate arguments
+MOVE_CUBIES = {move: _perm_cubies(perm) for move, perm in MOVE_PERMS.items()}
+
+
+# What Solver.solve_iter yields after each stage: the name of the stage, its
+# alg in code syntax, the HTM move count of the alg, the number of nodes the
+# searches expanded, the seconds the stage took and if its searches finished
+# within their budget
+StageEvent = namedtuple('StageEvent', ['stage', 'alg', 'moves', 'nodes',
+                                       'time', 'optimal'])
+# The attribute of the alg of each stage
+STAGE_ALGS = {'cross': 'calg', 'f2l': 'falg', 'oll': 'oalg', 'pll': 'palg'}
 
 
 class Solver(Cube):
@@ -20,12 +85,29 @@ class Solver(Cube):
     perm - (default 0) The permutation of the cube. If no
            permutation is given then the solved cube is given
            following the rules laid out in the Cube class
+    cache - (default None) A cache.SolutionCache that the cross and the
+            F2L are looked up in before searching and put in after. They are
+            kept for the representative of the cube under the symmetries
+            that keep the Down face (see symmetry.py) so a state and its
+            rotations about the Down face and mirror share one entry
     """
 
-    def __init__(self, perm=0):
+    def __init__(self, perm=0, cache=None):
         super().__init__(perm)
         self.solving_alg = ''
         self.step = 'scrambled'
+        self.cache = cache
+        # If the search of each stage finished within its budget
+        self.optimal = {}
+        # The search.SearchStats of each stage that searched and of each F2L
+        # pair
+        self.stats = {}
+        self.pair_stats = []
+
+        # The number of correct cubies of each step, see _track
+        self.counts = {'cross': 0, 'f2l': 0, 'oll': 0, 'pll': 0}
+        self._tracked = {}
+        self._track(CUBIE_STEPS)
 
     @property
     def inspect_alg(self):
@@ -47,6 +129,17 @@ class Solver(Cube):
     def pll_alg(self):
         return code_to_alg(self.palg)
 
+    @property
+    def optimized_alg(self):
+        return code_to_alg(self.opt_alg)
+
+    @property
+    def search_stats(self):
+        """
+        The search.SearchStats of every stage added together.
+        """
+        return sum(self.stats.values(), SearchStats())
+
     @property
     def alg(self):
         return {'Inspection': self.inspect_alg,
@@ -75,52 +168,35 @@ class Solver(Cube):
         super().apply_alg(alg, alg_input)
         self.solving_alg += alg
 
-    def find_step(self):
+        if alg_input:
+            alg = alg_to_code(alg)
+        # A single turn was already tracked by turn_rotate
+        if len(alg) > 1:
+            self._track(moved_cubies(alg))
+
+    def turn_rotate(self, ttype, side, dl=False):
         """
-        Finds the correct step that the Solver is at based
-        on it's relation to a solved cube.
-        """
-        up_face_color = ''.join(self.perm[(0, 1, 0)])
-        front_face_color = ''.join(self.perm[(0, 0, 1)])
-        solved_cube = Cube()
-
-        # Rotate correct top face
-        rotation_xz = {'b': 'X', 'g': 'x',
-                       'o': 'z', 'r': 'Z',
-                       'w': '', 'y': '8'}[up_face_color]
-        solved_cube.apply_alg(rotation_xz)
-
-        # Rotate correct front face
-        for _ in range(3):
-            ffc = ''.join(solved_cube.perm[(0, 0, 1)])
-            if ffc == front_face_color:
-                break
-            solved_cube.apply_alg('y')
+        Will turn or rotate the cube by 'ttype' on face 'side' (see
+        Cube.turn_rotate) and update the counts of correct cubies for the
+        cubies it moved so that find_step stays right.
 
-        cross_edges = 0
-        f2l_edges_and_corners = 0
-        oll_correct = 0
-        pll_correct = 0
+        Parameters:
+        ttype - The type of rotation, 'cw', 'ccw' or 'dt'
+        side - The side of the face to turn or the rotation to do
+        dl - (default False) Will do a double layer turn of 'side'
+        """
+        super().turn_rotate(ttype, side, dl)
+        self._track(MOVE_CUBIES[(ttype, side, dl)])
 
-        for coord, color in self.perm.items():
-            # Counts number of cross edges that are correct
-            if (coord[1] == -1 and
-                    coord.count(0) == 1 and
-                    color == solved_cube.perm[coord]):
-                cross_edges += 1
-            # Counts number of f2l pairs inserted
-            elif (coord[1] != 1 and
-                  coord.count(0) != 2 and
-                  color == solved_cube.perm[coord]):
-                f2l_edges_and_corners += 1
-            # Counts number of correctly orientated and
-            # correctly permutated U cubies
-            elif coord[1] == 1 and coord.count(0) != 2:
-                pll_correct += color == solved_cube.perm[coord]
-                oll_correct += color[1] == solved_cube.perm[coord][1]
-
-        correct = [cross_edges == 4, f2l_edges_and_corners == 8,
-                   oll_correct == 8, pll_correct == 8]
+    def find_step(self):
+        """
+        Finds the correct step that the Solver is at based
+        on it's relation to a solved cube. This only reads the
+        counts of correct cubies that apply_alg keeps up to date.
+        """
+        counts = self.counts
+        correct = [counts['cross'] == 4, counts['f2l'] == 8,
+                   counts['oll'] == 8, counts['pll'] == 8]
         if all(correct):
             self.step = 'solved'
         elif all(correct[0:3]):
@@ -132,22 +208,143 @@ class Solver(Cube):
         else:
             self.step = 'cross'
 
-    def solve_cross(self):
+    def _track(self, cubies):
         """
-        Solves for the cross on the Down face.
+        Updates the counts of correct cubies used by find_step for the
+        cubies that were moved. A cubie is correct when each of its stickers
+        is the color of the center on the same face, so a solved cube in
+        the same orientation never has to be built. For the last layer
+        cubies, the ones whose Up sticker is the Up color are counted for
+        the OLL as well.
+
+        Parameters:
+        cubies - The coordinates of the cubies to check again
         """
-        cross = Cross(self.perm)
+        perm = self.perm
+        for cubie in cubies:
+            colors = perm[cubie]
+            correct = all(colors[axis] == perm[center][axis]
+                          for axis, center in CUBIE_CENTERS[cubie])
+            oriented = colors[1] == perm[(0, 1, 0)][1]
 
-        self.calg = cross.alg
-        self.open_sets = cross.open_sets
-        self.closed_sets = cross.closed_sets
+            old_correct, old_oriented = self._tracked.get(cubie, (0, 0))
+            self._tracked[cubie] = (correct, oriented)
+            step = CUBIE_STEPS[cubie]
+            if step == 'll':
+                self.counts['pll'] += correct - old_correct
+                self.counts['oll'] += oriented - old_oriented
+            else:
+                self.counts[step] += correct - old_correct
 
-        # TODO Add inspection (pick best cross)
-        self.ialg = ''
+    def _cache_get(self, stage):
+        """
+        Returns the result of stage cached for the representative of the cube
+        (None if it isn't cached), the representative and the
+        symmetry.Transform of the cube to it. All are None if there is no
+        cache.
+        """
+        if not self.cache:
+            return None, None, None
 
-        self.apply_alg(self.calg)
+        rep, trans = canonical(dict_to_facelets(self.perm), 'down')
+        return self.cache.get(stage, rep), rep, trans
 
-    def solve_f2l(self):
+    @staticmethod
+    def _budget(max_nodes, time_limit):
+        """
+        Returns the budget of a stage or None if it has no limits.
+        """
+        if max_nodes is None and time_limit is None:
+            return None
+        return Budget(max_nodes, time_limit)
+
+    def solve_cross(self, method='table', inspection=False, policy='cross',
+                    workers=None, executor=None, max_nodes=None,
+                    time_limit=None):
+        """
+        Solves for the cross on the Down face. With inspection, the cross is
+        solved on all six faces at once (see inspection.py) and the cube is
+        first rotated so that the best face is the Down face. The results for
+        every face are kept in self.inspection.
+
+        The search can be given a budget (see search.Budget), after which
+        the best cross found so far is used and self.optimal['cross'] is
+        False. Without inspection, the cross is looked up in self.cache
+        first if there is one.
+
+        Parameters:
+        method - (default 'table') The method used by the Cross class, either
+                 'table' or 'astar'
+        inspection - (default False) If True, picks the best cross of the six
+                     faces instead of solving it on the Down face
+        policy - (default 'cross') How the best cross is picked, see
+                 inspection.inspect
+        workers - (default None) The number of processes used to solve the
+                  six faces, they are solved in this process if None, see
+                  inspection.inspect
+        executor - (default None) An existing concurrent.futures executor to
+                   solve the six faces in, see inspection.inspect
+        max_nodes - (default None) The most nodes the search can expand
+        time_limit - (default None) The most seconds the search can take
+        """
+        budget = self._budget(max_nodes, time_limit)
+        if inspection:
+            best, self.inspection = inspect(self.perm, policy, method,
+                                            workers, executor, budget)
+
+            self.ialg = best['rotation']
+            self.calg = best['cross']
+            # The cross was searched on every face
+            self.stats['cross'] = sum(result['stats'] for result
+                                      in self.inspection.values())
+            self.optimal['cross'] = best['optimal']
+        else:
+            stage = 'cross/{}'.format(method)
+            cached, rep, trans = self._cache_get(stage)
+            if cached:
+                self.calg = to_original(cached['alg'], trans)
+                self.stats['cross'] = SearchStats()
+                self.optimal['cross'] = True
+            else:
+                cross = Cross(self.perm, method, budget)
+
+                self.calg = cross.alg
+                self.stats['cross'] = cross.stats
+                self.optimal['cross'] = cross.optimal
+                # Results cut short by the budget aren't cached
+                if self.cache and cross.optimal:
+                    self.cache.put(stage, rep,
+                                   {'alg': to_canonical(cross.alg, trans)})
+
+            self.ialg = ''
+
+        self.apply_alg(self.ialg + self.calg)
+
+    def solve_f2l(self, order_search=False, workers=None, executor=None,
+                  method='table', max_nodes=None, time_limit=None):
+        """
+        Solves the four F2L pairs. With order_search, every order of the
+        pairs is tried (see f2l_order.py) and the one with the fewest turns
+        is used.
+
+        The searches of all the pairs can be given one budget (see
+        search.Budget), after which each pair uses the best alg found so far
+        and self.optimal['f2l'] is False. The F2L might then not be solved.
+        The F2L is looked up in self.cache first if there is one.
+
+        Parameters:
+        order_search - (default False) If True, uses the best of the 24 orders
+                       of the pairs instead of the first one
+        workers - (default None) The number of processes used for the order
+                  search, it is done in this process if None, see
+                  f2l_order.best_order
+        executor - (default None) An existing concurrent.futures executor to
+                   do the order search in, see f2l_order.best_order
+        method - (default 'table') The method used by the F2L class, either
+                 'table' or 'astar'
+        max_nodes - (default None) The most nodes the searches can expand
+        time_limit - (default None) The most seconds the searches can take
+        """
         side_centers, side_edges = [], []
         # Get the centers not on the U or D face
         for coord, color in self.perm.items():
@@ -161,29 +358,91 @@ class Solver(Cube):
                 if list(map(abs, i[0])).index(1) != \
                    list(map(abs, j[0])).index(1):
                     side_edges.append(''.join(i[1]) + ''.join(j[1]))
-        # Get all 24 orders for solving F2L
-        f2l_orders = list(permutations(side_edges))
-        for f2l_order in f2l_orders:
-            # Solve for each one and continue with the lowest move count one
-            # No point in mocking it up now
-            pass
 
-        self.f2l_pairs = ['go', 'gr', 'bo', 'br']
-        f2l = F2L(self.perm, self.f2l_pairs)
+        stage = 'f2l/{}'.format(method) + ('/order' if order_search else '')
+        cached, rep, trans = self._cache_get(stage)
+        if cached:
+            self.f2l_pairs = [colors_to_original(pair, trans)
+                              for pair in cached['f2l_pairs']]
+            self.falg = [to_original(alg, trans) for alg in cached['algs']]
+            self.pair_stats = [SearchStats() for _ in self.falg]
+            self.stats['f2l'] = SearchStats()
+            self.optimal['f2l'] = True
+        else:
+            budget = self._budget(max_nodes, time_limit)
+            if order_search:
+                f2l = best_order(self.perm, side_edges, workers, executor,
+                                 method, budget)
+            else:
+                f2l = F2L(self.perm, side_edges, method, budget)
 
-        self.falg = f2l.algs
-        self.open_setss = f2l.open_setss
-        self.closed_setss = f2l.closed_setss
+            self.f2l_pairs = f2l.f2l_pairs
+            self.falg = f2l.algs
+            self.pair_stats = f2l.pair_stats
+            self.stats['f2l'] = f2l.stats
+            self.optimal['f2l'] = f2l.optimal
+            if self.cache and f2l.optimal:
+                self.cache.put(stage, rep, {
+                    'f2l_pairs': [colors_to_canonical(pair, trans)
+                                  for pair in f2l.f2l_pairs],
+                    'algs': [to_canonical(alg, trans) for alg in f2l.algs]})
 
         self.apply_alg(''.join(self.falg))
 
-    def solve_oll(self):
-        # TODO
-        self.oalg = ''
+    def solve_oll(self, index=None, metric='htm'):
+        """
+        Orients the last layer by looking up its case (see oll.py). The name
+        of the case is kept in self.oll_case.
 
-    def solve_pll(self):
-        # TODO
-        self.palg = ''
+        Parameters:
+        index - (default None) The OLL index to use, see oll.OLL
+        metric - (default 'htm') The metric the alg of each case is picked
+                 by, see tools.move_count
+        """
+        oll = OLL(self.perm, index, metric)
+
+        self.oll_case = oll.case
+        self.oalg = oll.alg
+
+        self.apply_alg(self.oalg)
+
+    def solve_pll(self, index=None, metric='htm'):
+        """
+        Permutes the last layer, including the AUF before and after the alg,
+        by looking up its case (see pll.py). The name of the case is kept in
+        self.pll_case.
+
+        Parameters:
+        index - (default None) The PLL table to use, see pll.PLL
+        metric - (default 'htm') The metric the alg of each case is picked
+                 by, see tools.move_count
+        """
+        pll = PLL(self.perm, index, metric)
+
+        self.pll_case = pll.case
+        self.palg = pll.alg
+
+        self.apply_alg(self.palg)
+
+    def optimize(self, keep_rotation=False, metric='htm'):
+        """
+        Joins the algs of every stage solved so far and shortens them by
+        taking out the rotations and merging the moves across the stages
+        (see optimize.py). The result is kept in self.opt_alg and the
+        savings (see optimize.savings) are returned. The cube itself isn't
+        changed.
+
+        Parameters:
+        keep_rotation - (default False) If True, the optimized alg ends with
+                        the cube held the same way as the stage algs do
+        metric - (default 'htm') The metric the savings are counted in
+        """
+        code = ''.join([getattr(self, 'ialg', ''), getattr(self, 'calg', ''),
+                        ''.join(getattr(self, 'falg', [])),
+                        getattr(self, 'oalg', ''), getattr(self, 'palg', '')])
+        self.opt_alg = optimize(code, keep_rotation)
+
+        return savings(code, self.opt_alg, metric)
 
     def solve_it(self):
         """
@@ -198,7 +457,182 @@ class Solver(Cube):
             self.solve_oll()
         elif self.step == 'pll':
             self.solve_pll()
-        elif self.step == 'finished':
+        elif self.step == 'solved':
             pass
         else:
             raise Exception('STEP NOT FOUND!')
+
+    def solve_iter(self, method='table', max_nodes=None, time_limit=None):
+        """
+        A generator that solves the cube from the step it is at to the end
+        and yields a StageEvent after each stage. Closing the generator
+        stops before the next stage. It also stops after a stage that was
+        cut short by its budget and didn't finish, so not every stage might
+        be yielded.
+
+        Parameters:
+        method - (default 'table') The method of the cross and F2L searches
+        max_nodes - (default None) The most nodes each search can expand
+        time_limit - (default None) The most seconds each search can take
+        """
+        budget = {'method': method, 'max_nodes': max_nodes,
+                  'time_limit': time_limit}
+        solves = {'cross': (self.solve_cross, budget),
+                  'f2l': (self.solve_f2l, budget),
+                  'oll': (self.solve_oll, {}),
+                  'pll': (self.solve_pll, {})}
+
+        self.find_step()
+        while self.step != 'solved':
+            stage = self.step
+            solve, kwargs = solves[stage]
+            t0 = perf_counter()
+            solve(**kwargs)
+            duration = perf_counter() - t0
+
+            alg = getattr(self, STAGE_ALGS[stage])
+            if stage == 'cross':
+                alg = self.ialg + alg
+            elif stage == 'f2l':
+                alg = ''.join(alg)
+            nodes = self.stats[stage].expanded if stage in self.stats else 0
+
+            yield StageEvent(stage, alg, move_count(alg), nodes, duration,
+                             self.optimal.get(stage, True))
+
+            self.find_step()
+            if self.step == stage:
+                return
+
+
+# The stages of a solve in order
+STAGES = ['cross', 'f2l', 'oll', 'pll']
+
+
+def solve_scramble(scramble, alg_input=False, max_nodes=None,
+                   time_limit=None):
+    """
+    Solves the cube given by scramble from the step it is at to the end (see
+    Solver.solve_iter) and returns a dict of the scramble, the alg of each
+    stage solved in code syntax (the F2L as a list of the alg of each pair),
+    the seconds each stage took, whether each search finished within its
+    budget, the search.SearchStats of the cross and F2L, the step the cube
+    ended at and the error message if the solve failed (otherwise None). The
+    solve stops after a stage that its budget cut short and didn't finish.
+
+    Parameters:
+    scramble - The algorithm that scrambles a solved cube or the
+               permutation of the scrambled cube as a 6 element list of 9
+               char strings (see the Cube class)
+    alg_input - (default False) If True, scramble is in cubing notation
+                instead of the code syntax
+    max_nodes - (default None) The most nodes each search can expand
+    time_limit - (default None) The most seconds each search can take
+    """
+    result = {'scramble': scramble, 'algs': {}, 'times': {}, 'optimal': {},
+              'stats': {}, 'step': None, 'error': None}
+
+    # Only set once the cube is scrambled so a bad scramble has no step
+    cube = None
+    try:
+        if isinstance(scramble, list):
+            scrambled = Solver(scramble)
+        else:
+            scrambled = Solver()
+            scrambled.apply_alg(scramble, alg_input)
+        cube = scrambled
+
+        for event in cube.solve_iter(max_nodes=max_nodes,
+                                     time_limit=time_limit):
+            result['times'][event.stage] = event.time
+            result['algs'][event.stage] = getattr(cube,
+                                                  STAGE_ALGS[event.stage])
+            if event.stage in cube.stats:
+                result['stats'][event.stage] = cube.stats[event.stage]
+    except Exception as error:
+        result['error'] = str(error)
+
+    if cube is not None:
+        result['optimal'] = cube.optimal
+        cube.find_step()
+        result['step'] = cube.step
+
+    return result
+
+
+def _solve_chunk(start, scrambles, *args):
+    """
+    Solves a chunk of scrambles where start is the index of the first one
+    in the whole input. Returns the result of each (see solve_scramble) with
+    its index added.
+    """
+    results = []
+    for index, scramble in enumerate(scrambles, start):
+        result = solve_scramble(scramble, *args)
+        result['index'] = index
+        results.append(result)
+
+    return results
+
+
+def solve_many(scrambles, workers=None, chunksize=16, ordered=True,
+               alg_input=False, max_nodes=None, time_limit=None):
+    """
+    A generator that solves every scramble and yields the result of each
+    (see solve_scramble) with its index in scrambles added as 'index'.
+
+    The scrambles are split into chunks that are solved in a pool of worker
+    processes. Only a few chunks per worker are read from scrambles and
+    waited on at once, so scrambles can be any iterable (e.g. the lines of a
+    file) and memory stays the same however many there are.
+
+    Parameters:
+    scrambles - An iterable of the scrambles as in solve_scramble
+    workers - (default None) The number of processes to use, one per CPU if
+              None. If 0 or 1 then the cubes are solved in this process
+    chunksize - (default 16) The number of scrambles sent to a worker at once
+    ordered - (default True) If True, the results are yielded in the order
+              of scrambles, otherwise in the order they finish
+    alg_input - (default False) If True, the scrambles are in cubing
+                notation instead of the code syntax
+    max_nodes - (default None) The most nodes each search can expand
+    time_limit - (default None) The most seconds each search can take
+    """
+    args = (alg_input, max_nodes, time_limit)
+    scrambles = iter(scrambles)
+    starts = count(0, chunksize)
+
+    if workers in [0, 1]:
+        for start, scramble in enumerate(scrambles):
+            yield from _solve_chunk(start, [scramble], *args)
+        return
+
+    def submit():
+        chunk = list(islice(scrambles, chunksize))
+        if chunk:
+            pending.append(pool.submit(_solve_chunk, next(starts), chunk,
+                                       *args))
+        return bool(chunk)
+
+    workers = workers or cpu_count()
+    pool, pending = ProcessPoolExecutor(workers), deque()
+    try:
+        # Keep every worker busy with one chunk queued up behind it
+        for _ in range(2 * workers):
+            if not submit():
+                break
+
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done = wait(pending, return_when=FIRST_COMPLETED).done
+                for future in done:
+                    pending.remove(future)
+
+            for future in done:
+                submit()
+                yield from future.result()
+    finally:
+        # Stops the chunks still waiting if the generator is closed early
+        pool.shutdown(cancel_futures=True)
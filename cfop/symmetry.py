@@ -0,0 +1,186 @@
+"""
+Contains the canonicalization of a cube state under its symmetries.
+
+A symmetry is one of the 24 rotations of the whole cube, optionally followed
+by the mirror that swaps the Left and Right faces, which gives 48 in all. It
+is applied to a facelet string (see facelets.py) as a gather of the stickers
+after which the colors are relabeled so that every center is its solved
+color again. A state and every state it is mapped to are solved by the same
+algorithm with its turns mapped by the symmetry, so a solution only has to
+be found (or cached) for one state of each class, its representative. The
+representative is the state of the class whose facelet string comes first.
+
+The 'down' group has the 8 symmetries that keep the Down face where it is.
+These also map a cross or F2L on the Down face to one on the Down face so
+they are the ones that can be used for the cross and F2L stages. The 'all'
+group has all 48 and is for whole solves.
+"""
+from collections import namedtuple
+from itertools import product
+from operator import itemgetter
+
+import numpy as np
+
+from cfop.facelets import (CENTERS, FACELET_CUBIES, FACELET_INDEX, SOLVED,
+                           TURN_PERMS, compile_alg, compose, invert)
+from cfop.oll import ROTATIONS
+
+# The sticker permutation of the mirror that swaps the Left and Right faces
+MIRROR = tuple(FACELET_INDEX[((-cubie[0], cubie[1], cubie[2]), axis)]
+               for cubie, axis in FACELET_CUBIES)
+
+# The name and sticker permutation of every symmetry
+SYMMETRIES = [(rotation + mirror, compose(compile_alg(rotation), perm))
+              for mirror, perm in [('', tuple(range(54))), ('m', MIRROR)]
+              for rotation in ROTATIONS]
+GROUPS = {'all': list(range(len(SYMMETRIES))),
+          'down': [n for n, (_, perm) in enumerate(SYMMETRIES)
+                   if perm[CENTERS[5]] == CENTERS[5]]}
+
+_GATHERS = [itemgetter(*perm) for _, perm in SYMMETRIES]
+
+
+# Every turn and then every pair of turns of the code syntax by their
+# sticker permutation, where the first one found is kept
+_CODES = {}
+for _code in list(TURN_PERMS) + list(map(''.join, product(TURN_PERMS,
+                                                          repeat=2))):
+    _CODES.setdefault(compile_alg(_code), _code)
+
+
+def turn_map(perm):
+    """
+    Returns the table for str.translate that maps each turn of the code
+    syntax to the turn it becomes under the symmetry with sticker
+    permutation perm. A slice turn can become an E or S slice, which aren't
+    in the code syntax, so it becomes the two turns that make it instead.
+    """
+    inverse = invert(perm)
+    return str.maketrans({
+        code: _CODES[compose(compose(perm, turn_perm), inverse)]
+        for code, turn_perm in TURN_PERMS.items()})
+
+
+# The maps of the turns from a representative to the state it came from and
+# back, for each symmetry
+_TO_ORIGINAL = [turn_map(perm) for _, perm in SYMMETRIES]
+_TO_CANONICAL = [turn_map(invert(perm)) for _, perm in SYMMETRIES]
+
+# How a state was mapped to its representative: the index of the symmetry in
+# SYMMETRIES and the str.translate table of the colors of the state to the
+# colors of the representative
+Transform = namedtuple('Transform', ['symmetry', 'colors'])
+
+
+def _relabel(gathered):
+    """
+    Returns the str.translate table that makes every center of the
+    gathered facelets its solved color.
+    """
+    return str.maketrans(''.join(gathered[n] for n in CENTERS),
+                         ''.join(SOLVED[n] for n in CENTERS))
+
+
+def transform(facelets, symmetry):
+    """
+    Returns the facelets mapped by a symmetry with the colors relabeled, and
+    the Transform of it.
+
+    Parameters:
+    facelets - The 54 char facelet string of the cube
+    symmetry - The index of the symmetry in SYMMETRIES
+    """
+    gathered = _GATHERS[symmetry](facelets)
+    colors = _relabel(gathered)
+    return ''.join(gathered).translate(colors), Transform(symmetry, colors)
+
+
+def canonical(facelets, group='all'):
+    """
+    Returns the representative of the class of a state under the symmetries
+    of group and the Transform that maps the state to it.
+
+    Parameters:
+    facelets - The 54 char facelet string of the cube
+    group - (default 'all') Either 'all' or 'down', see GROUPS
+    """
+    return min((transform(facelets, symmetry) for symmetry in GROUPS[group]),
+               key=itemgetter(0))
+
+
+def to_original(code, trans):
+    """
+    Maps an algorithm in code syntax that solves (a stage of) a
+    representative to the one that solves the state it came from.
+
+    Parameters:
+    code - The algorithm in code syntax
+    trans - The Transform returned with the representative
+    """
+    return code.translate(_TO_ORIGINAL[trans.symmetry])
+
+
+def to_canonical(code, trans):
+    """
+    Maps an algorithm in code syntax that solves (a stage of) a state to the
+    one that solves its representative, i.e. undoes to_original.
+    """
+    return code.translate(_TO_CANONICAL[trans.symmetry])
+
+
+def colors_to_original(colors, trans):
+    """
+    Maps colors (e.g. an F2L pair) of a representative to those of the state
+    it came from.
+    """
+    back = {new: old for old, new in trans.colors.items()}
+    return colors.translate(back)
+
+
+def colors_to_canonical(colors, trans):
+    """
+    Maps colors of a state to those of its representative, i.e. undoes
+    colors_to_original.
+    """
+    return colors.translate(trans.colors)
+
+
+# The perm of every symmetry as rows and the rank of each color index (see
+# cube.CubeBatch) in the order of the color chars, so that the bulk
+# representative is the same as the one from canonical
+_PERMS = np.array([perm for _, perm in SYMMETRIES], np.intp)
+_RANKS = np.argsort(np.argsort(list('wogrby'))).astype(np.uint64)
+# The place value of each of the 18 base 6 digits of one part of a key
+_PLACES = 6 ** np.arange(17, -1, -1, dtype=np.uint64)
+
+
+def canonical_many(states, group='all'):
+    """
+    The bulk equivalent of canonical for the color index states of a
+    cube.CubeBatch. Returns the array of the representatives and the array
+    of the index in SYMMETRIES of the symmetry that maps each state to its
+    representative.
+
+    Parameters:
+    states - An (N, 54) array of color indices (e.g. CubeBatch.states)
+    group - (default 'all') Either 'all' or 'down', see GROUPS
+    """
+    symmetries = np.array(GROUPS[group])
+    # Every state under every symmetry as (N, symmetries, 54)
+    gathered = states[:, _PERMS[symmetries]]
+    # The color of each face index is its index in a solved CubeBatch, so
+    # the inverse of the colors of the centers relabels each one
+    relabel = np.argsort(gathered[:, :, CENTERS], axis=2)
+    candidates = np.take_along_axis(relabel, gathered.astype(np.intp),
+                                    axis=2).astype(np.uint8)
+
+    # Compare the candidates by three 18 digit parts of their ranks
+    ranks = _RANKS[candidates].reshape(*candidates.shape[:2], 3, 18)
+    keys = (ranks * _PLACES).sum(axis=3)
+    smallest = np.ones(keys.shape[:2], bool)
+    for part in range(3):
+        key = np.where(smallest, keys[:, :, part], np.iinfo(np.uint64).max)
+        smallest &= key == key.min(axis=1, keepdims=True)
+
+    best = smallest.argmax(axis=1)
+    return candidates[np.arange(len(states)), best], symmetries[best]
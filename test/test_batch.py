@@ -0,0 +1,73 @@
+"""
+Tests the CubeBatch class against applying the same turns to Cube objects.
+"""
+from random import choice
+
+import numpy as np
+
+from cfop.cube import Cube, CubeBatch
+from cfop.solver import Solver
+import cfop.algorithms.tools as tl
+
+ALL_TURNS = 'ULFRBDulfrbdTKEQACtkeqac!@#$%^123456Mm7xyzXYZ890'
+
+
+def _scrambled_cubes(num_cubes):
+    """
+    Returns a list of randomly scrambled cubes.
+    """
+    cubes = []
+    for _ in range(num_cubes):
+        cube = Cube()
+        cube.apply_alg(tl.random_scramble(20))
+        cubes.append(cube)
+
+    return cubes
+
+
+def test_apply():
+    """
+    Test a turn, a turn per cube and an algorithm on a batch of cubes.
+    """
+    cubes = _scrambled_cubes(20)
+    batch = CubeBatch(cubes)
+    assert batch.to_lists() == [tl.dict_to_list(c.perm) for c in cubes]
+
+    batch.turn('R')
+    turns = ''.join(choice(ALL_TURNS) for _ in cubes)
+    batch.apply_turns(turns)
+    batch.apply_alg("R U R' U' M2 y'", True)
+    for cube, turn in zip(cubes, turns):
+        cube.apply_alg('R' + turn)
+        cube.apply_alg("R U R' U' M2 y'", True)
+
+    assert batch.to_lists() == [tl.dict_to_list(c.perm) for c in cubes]
+
+
+def test_find_steps():
+    """
+    Test that the batched step matches Solver.find_step.
+    """
+    algs = ['', "R U R' U'", "F R U R' U' F'", "R U R' U R U2 R'",
+            "R U R' U' R' F R2 U' R' U' R U R' F'", 'M2 U']
+    cubes = []
+    for alg in algs:
+        cube = Solver()
+        cube.apply_alg(alg, True)
+        cube.find_step()
+        cubes.append(cube)
+
+    steps = CubeBatch(cubes).find_steps()
+
+    assert list(steps) == [cube.step for cube in cubes]
+    assert list(CubeBatch(cubes).is_solved()) == [True] + [False] * 5
+
+
+def test_round_trip():
+    """
+    Test creating a batch from its own array and facelets.
+    """
+    batch = CubeBatch(_scrambled_cubes(5))
+
+    assert np.array_equal(CubeBatch(batch.states).states, batch.states)
+    assert np.array_equal(CubeBatch(batch.facelets()).states, batch.states)
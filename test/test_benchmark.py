@@ -0,0 +1,111 @@
+"""
+Tests the benchmark suite and that the solver still matches the moves and
+nodes recorded in its corpus.
+"""
+import json
+
+import pytest
+
+from cfop.benchmark import (COUNTS, CORPUS_VERSION, compare, load_corpus,
+                            main, run, solve_counts)
+
+CORPUS = load_corpus()
+
+
+def _small_corpus(tmp_path, size=2):
+    """
+    Writes the first size scrambles of the corpus to a file and returns its
+    path.
+    """
+    path = tmp_path / 'corpus.json'
+    path.write_text(json.dumps(dict(CORPUS,
+                                    scrambles=CORPUS['scrambles'][:size])))
+    return str(path)
+
+
+def test_corpus():
+    """
+    Test that the corpus is of the current version and that each scramble is
+    different and has every count.
+    """
+    scrambles = [entry['scramble'] for entry in CORPUS['scrambles']]
+
+    assert CORPUS['version'] == CORPUS_VERSION
+    assert len(set(scrambles)) == len(scrambles)
+    assert all(count in entry for entry in CORPUS['scrambles']
+               for count in COUNTS)
+
+
+@pytest.mark.parametrize('entry', CORPUS['scrambles'][:8],
+                         ids=lambda entry: entry['scramble'])
+def test_counts(entry):
+    """
+    Test that the cross and F2L of a scramble of the corpus take the
+    recorded moves and nodes.
+    """
+    counts = solve_counts(entry['scramble'])
+    assert counts == {count: entry[count] for count in COUNTS}, \
+        'The counts of {} changed'.format(entry['scramble'])
+
+
+def test_compare():
+    """
+    Test that more moves, more nodes beyond the threshold and a drop in
+    throughput beyond the threshold are regressions and nothing else is.
+    """
+    corpus = {'version': 1, 'scrambles': [
+        {'cross_moves': 6, 'cross_nodes': 6, 'f2l_moves': 25,
+         'f2l_nodes': 100}]}
+    baseline = {'version': 1, 'micro': {'cross': {'ops_per_s': 1000}}}
+    results = {'version': 1, 'micro': {'cross': {'ops_per_s': 800}},
+               'counts': [dict(corpus['scrambles'][0], f2l_nodes=105)]}
+
+    assert compare(results, corpus, baseline) == []
+
+    results['micro']['cross']['ops_per_s'] = 700
+    results['counts'][0].update(f2l_nodes=111, cross_moves=7)
+    regressions = compare(results, corpus, baseline)
+    assert len(regressions) == 3
+    assert compare(results, corpus) == regressions[:2]
+
+    with pytest.raises(Exception):
+        compare(results, corpus, dict(baseline, version=0))
+
+
+def test_run():
+    """
+    Test that each microbenchmark has ordered percentiles and a throughput.
+    """
+    corpus = dict(CORPUS, scrambles=CORPUS['scrambles'][:2])
+    results = run(corpus, repeats=3, names=['turn_rotate', 'cross'])
+
+    assert list(results['micro']) == ['turn_rotate', 'cross']
+    for stats in results['micro'].values():
+        assert 0 < stats['p10'] <= stats['p50'] <= stats['p90']
+        assert stats['ops_per_s'] == 1 / stats['p50']
+    assert len(results['counts']) == 2
+
+
+def test_main(tmp_path, capsys):
+    """
+    Test that the throughput isn't compared without a baseline, that a saved
+    baseline passes and that a baseline it can't reach fails.
+    """
+    corpus = _small_corpus(tmp_path)
+    results = str(tmp_path / 'results.json')
+    args = ['--corpus', corpus, '--results', results, '-r', '2', '--only',
+            'turn_rotate', 'alg_to_code']
+
+    assert main(args) == 0
+    assert 'No baseline' in capsys.readouterr().out
+    assert main(args + ['--save']) == 0
+    assert main(args + ['--threshold', '1']) == 0
+
+    with open(results) as results_file:
+        baseline = json.load(results_file)
+    baseline['micro']['turn_rotate']['ops_per_s'] *= 1000
+    with open(results, 'w') as results_file:
+        json.dump(baseline, results_file)
+
+    assert main(args) == 1
+    assert 'Regression: turn_rotate' in capsys.readouterr().out
@@ -0,0 +1,106 @@
+"""
+Tests the solution cache and its use by the Solver class.
+"""
+from cfop.algorithms.tools import alg_to_code
+from cfop.cache import SolutionCache, state_key
+from cfop.cube import Cube
+from cfop.solver import Solver
+from cfop.symmetry import SYMMETRIES, Transform, to_original
+
+SCRAMBLE = "F2 B2 L R' D U2 F' L2 D B"
+
+
+def _solve(cache):
+    """
+    Solves the cross and F2L of SCRAMBLE with cache.
+    """
+    cube = Solver(cache=cache)
+    cube.apply_alg(SCRAMBLE, True)
+    cube.solve_cross()
+    cube.solve_f2l()
+    cube.find_step()
+
+    return cube
+
+
+def test_state_key():
+    """
+    Test that the key of a state is 18 bytes and the same for its dict form
+    and its facelets.
+    """
+    cube = Cube(compact=True)
+    cube.apply_alg(SCRAMBLE, True)
+
+    assert len(state_key(cube.facelets)) == 18
+    assert state_key(cube.facelets) == state_key(cube.perm)
+    assert state_key(cube.facelets) != state_key(Cube(compact=True).facelets)
+
+
+def test_lru():
+    """
+    Test that the least recently used result is evicted.
+    """
+    cache = SolutionCache(size=2)
+    states = []
+    for alg in ['R', 'U', 'F']:
+        cube = Cube(compact=True)
+        cube.apply_alg(alg)
+        states.append(cube.facelets)
+
+    cache.put('cross', states[0], 'a')
+    cache.put('cross', states[1], 'b')
+    assert cache.get('cross', states[0]) == 'a'
+    cache.put('cross', states[2], 'c')
+
+    assert cache.get('cross', states[1]) is None
+    assert cache.get('f2l', states[0]) is None
+    assert cache.get('cross', states[0]) == 'a'
+    assert cache.stats() == {'memory_hits': 2, 'disk_hits': 0, 'misses': 2,
+                             'hit_rate': 0.5, 'evictions': 1, 'size': 2}
+
+
+def test_solver(tmp_path):
+    """
+    Test that a repeat solve is taken from the cache, from memory and then
+    from disk in a new cache, and gives the same algs.
+    """
+    path = str(tmp_path / 'cache.db')
+    cache = SolutionCache(path=path)
+    first = _solve(cache)
+    repeat = _solve(cache)
+    cache.close()
+
+    assert repeat.step in ['oll', 'pll', 'solved']
+    assert (repeat.calg, repeat.falg) == (first.calg, first.falg)
+    assert repeat.search_stats.expanded == 0
+    assert cache.stats()['memory_hits'] == 2
+
+    cache = SolutionCache(path=path)
+    from_disk = _solve(cache)
+
+    assert (from_disk.calg, from_disk.falg) == (first.calg, first.falg)
+    assert cache.stats()['disk_hits'] == 2
+
+
+def test_symmetry():
+    """
+    Test that the same state rotated about the Down face and mirrored is
+    solved from the cache entries of the original.
+    """
+    cache = SolutionCache()
+    _solve(cache)
+    mirror = Transform([name for name, _ in SYMMETRIES].index('m'), None)
+    scramble = alg_to_code(SCRAMBLE)
+
+    for alg in ['y' + scramble, to_original(scramble, mirror)]:
+        cube = Solver(cache=cache)
+        cube.apply_alg(alg)
+        cube.solve_cross()
+        cube.solve_f2l()
+        cube.find_step()
+
+        assert cube.step in ['oll', 'pll', 'solved'], \
+            'The cached F2L did not solve {}.'.format(alg)
+
+    assert cache.stats()['memory_hits'] == 4
+    assert cache.stats()['misses'] == 2
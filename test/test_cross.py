@@ -1,8 +1,13 @@
 """
 Tests the cross solving class.
 """
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pytest
 
+from cfop.cross import Cross
+from cfop.pruning import cross_table, load_table
 from cfop.solver import Solver
 import cfop.algorithms.tools as tl
 
@@ -26,3 +31,81 @@ def test_cross(num_repeat):
         ' The perm \n{}\n\n was solved to:'.format(start_perm) + \
         '\n{}\n\nand failed to create a cross.'.format(final_perm) + \
         ' Or Solver.find_step could be wrong...'
+
+
+@pytest.mark.parametrize('num_repeat', range(10))
+def test_cross_table(num_repeat):
+    """
+    Test that the cross from the pruning table is never longer than the one
+    found by A* pathfinding.
+    """
+    scramble = tl.random_scramble(20)
+    cube = Solver()
+    cube.apply_alg(scramble)
+
+    table_alg = Cross(cube.perm, 'table').alg
+    astar_alg = Cross(cube.perm, 'astar').alg
+
+    assert len(table_alg) <= len(astar_alg), \
+        'The cross for {} from the table '.format(tl.code_to_alg(scramble)) + \
+        'is {} but A* found {}.'.format(tl.code_to_alg(table_alg),
+                                        tl.code_to_alg(astar_alg))
+
+
+@pytest.mark.parametrize('workers', [None, 2, 'executor'])
+def test_inspection(workers):
+    """
+    Test that the cross picked by inspection solves a cross and is never
+    longer than the cross on the Down face, whether the faces are solved in
+    this process, a new pool or an existing executor.
+    """
+    scramble = tl.random_scramble(20)
+    cube = Solver()
+    cube.apply_alg(scramble)
+    d_cross = Cross(cube.perm).alg
+
+    if workers == 'executor':
+        with ProcessPoolExecutor(2) as executor:
+            cube.solve_cross(inspection=True, executor=executor)
+    else:
+        cube.solve_cross(inspection=True, workers=workers)
+    cube.find_step()
+
+    assert cube.step == 'f2l'
+    assert len(cube.inspection) == 6
+    assert len(cube.calg) <= len(d_cross)
+    assert cube.inspection[''.join(cube.perm[(0, -1, 0)])]['cross'] == \
+        cube.calg
+
+
+def test_cross_budget():
+    """
+    Test that A* pathfinding out of budget still solves the cross.
+    """
+    scramble = tl.random_scramble(20)
+    cube = Solver()
+    cube.apply_alg(scramble)
+
+    cube.solve_cross('astar', max_nodes=1)
+    cube.find_step()
+
+    assert cube.step == 'f2l'
+    assert not cube.optimal['cross']
+
+
+def test_load_table(tmp_path):
+    """
+    Test that a table saved by another process while building is loaded
+    instead, that no temporary file is left behind and that tables of
+    different directories are kept apart.
+    """
+    path = tmp_path / 'cross.npy'
+
+    def builder():
+        np.save(str(path), np.arange(3, dtype=np.uint8))
+        return np.zeros(3, np.uint8)
+
+    assert list(load_table('cross', builder, str(tmp_path))) == [0, 1, 2]
+    assert [p.name for p in tmp_path.iterdir()] == ['cross.npy']
+    assert list(cross_table(str(tmp_path))) == [0, 1, 2]
+    assert len(cross_table()) == 24 ** 4
@@ -0,0 +1,63 @@
+"""
+Tests the local database of the OLL and PLL algorithms.
+"""
+import json
+from time import perf_counter
+
+import pytest
+
+from cfop.algorithms import database, oll_algs, pll_algs
+from cfop.oll import build_index as oll_index
+from cfop.pll import build_index as pll_index
+
+
+def test_load():
+    """
+    Test that the database has every case and loads quickly.
+    """
+    database._DB.clear()
+    t0 = perf_counter()
+    oll, pll = oll_algs.get_algs(), pll_algs.get_algs()
+
+    assert perf_counter() - t0 < 0.1
+    assert len(oll) == 57 and len(pll) == 21
+    assert all(oll.values()) and all(pll.values())
+
+
+def test_checksum(tmp_path):
+    """
+    Test that a database whose algs were changed or that has another schema
+    version is not loaded.
+    """
+    db = database.load()
+    for key, value in [('algs', {'oll': {}, 'pll': {}}),
+                       ('schema_version', database.SCHEMA_VERSION + 1)]:
+        path = str(tmp_path / '{}.json'.format(key))
+        with open(path, 'w') as db_file:
+            json.dump(dict(db, **{key: value}), db_file)
+
+        with pytest.raises(Exception):
+            database.load(path)
+
+
+def test_write(tmp_path):
+    """
+    Test that a written database is loaded with the same algs.
+    """
+    path = str(tmp_path / 'algs.json')
+    algs = {'oll': oll_algs.get_algs(), 'pll': pll_algs.get_algs()}
+    database.write(algs, path)
+
+    assert database.get_algs('oll', path) == algs['oll']
+    assert database.get_algs('pll', path) == algs['pll']
+
+
+def test_indexes():
+    """
+    Test that the algs of the database cover every OLL and PLL case.
+    """
+    oll = set(case for case, _ in oll_index(oll_algs.get_algs()).values())
+    pll = set(case for case, _ in pll_index(pll_algs.get_algs()).values())
+
+    assert len(oll) == 57 + 1
+    assert len(pll) == 21 + 1
@@ -0,0 +1,130 @@
+"""
+Tests the F2L solving class.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from cfop.f2l import F2L
+from cfop.solver import Solver
+import cfop.algorithms.tools as tl
+
+
+@pytest.mark.parametrize('num_repeat', range(3))
+def test_f2l(num_repeat):
+    """
+    Given a scrambled cube, it will test the F2L solving from f2l.py.
+    """
+    scramble = tl.random_scramble(20)
+    cube = Solver()
+    cube.apply_alg(scramble)
+
+    start_perm = tl.dict_to_list(cube.perm)
+    cube.solve_cross()
+    cube.solve_f2l()
+    cube.find_step()
+    final_perm = tl.dict_to_list(cube.perm)
+
+    assert cube.step in ['oll', 'pll', 'solved'], \
+        'The test failed on solve number {}.'.format(num_repeat) + \
+        ' The perm \n{}\n\n was solved to:'.format(start_perm) + \
+        '\n{}\n\nand failed to solve the F2L.'.format(final_perm)
+
+
+def test_f2l_astar():
+    """
+    Test that the F2L found by A* pathfinding solves the F2L and is never
+    shorter than the one from the pruning tables for the same order.
+    """
+    scramble = tl.random_scramble(20)
+    cube = Solver()
+    cube.apply_alg(scramble)
+    cube.solve_cross()
+    table_f2l = F2L(cube.perm, ['go', 'gr', 'bo', 'br'])
+    astar_f2l = F2L(cube.perm, ['go', 'gr', 'bo', 'br'], 'astar')
+
+    cube.apply_alg(''.join(astar_f2l.algs))
+    cube.find_step()
+
+    assert cube.step in ['oll', 'pll', 'solved']
+    assert len(table_f2l.algs[0]) <= len(astar_f2l.algs[0])
+
+
+def test_f2l_astar_flip():
+    """
+    Test a scramble where A* used to stop on the first pair with a cross edge
+    flipped in its solved position.
+    """
+    cube = Solver()
+    cube.apply_alg('KET#KADRURC$@TE@EC%@')
+    cube.solve_cross()
+    f2l = F2L(cube.perm, ['go'], 'astar')
+
+    cube.apply_alg(f2l.algs[0])
+    cube.find_step()
+
+    assert cube.step == 'f2l', \
+        "First pair alg {} broke the cross.".format(f2l.algs[0])
+
+
+@pytest.mark.parametrize('method', ['table', 'astar'])
+def test_f2l_budget(method):
+    """
+    Test that the F2L search stops when its budget runs out and says so.
+    """
+    cube = Solver()
+    cube.apply_alg('KET#KADRURC$@TE@EC%@')
+    cube.solve_cross()
+    cube.solve_f2l(method=method, max_nodes=10)
+
+    assert not cube.optimal['f2l']
+    assert len(cube.falg) == 4
+
+    cube = Solver()
+    cube.apply_alg('KET#KADRURC$@TE@EC%@')
+    cube.solve_cross()
+    cube.solve_f2l(method=method, time_limit=60)
+
+    assert cube.optimal['f2l']
+
+
+@pytest.mark.parametrize('method', ['table', 'astar'])
+def test_f2l_budget_keeps_cross(method):
+    """
+    Test that an F2L stopped by its budget never undoes the cross.
+    """
+    for _ in range(10):
+        cube = Solver()
+        cube.apply_alg(tl.random_scramble(20))
+        cube.solve_cross()
+        cube.solve_f2l(method=method, max_nodes=0)
+        cube.find_step()
+
+        assert cube.step != 'cross', \
+            'The F2L algs {} broke the cross.'.format(cube.falg)
+
+
+@pytest.mark.parametrize('workers', [None, 2, 'executor'])
+def test_order_search(workers):
+    """
+    Test that the best order of the pairs is never longer than the default
+    order, whether it is searched in this process, a new pool or an existing
+    executor.
+    """
+    scramble = tl.alg_to_code("R U R' U' F' U' F")
+    cube = Solver()
+    cube.apply_alg(scramble)
+    cube.solve_cross()
+    default = Solver(cube.perm.copy())
+    default.solve_f2l()
+
+    if workers == 'executor':
+        with ProcessPoolExecutor(2) as executor:
+            cube.solve_f2l(order_search=True, executor=executor)
+    else:
+        cube.solve_f2l(order_search=True, workers=workers)
+    cube.find_step()
+
+    assert cube.step in ['oll', 'pll', 'solved']
+    assert sorted(cube.f2l_pairs) == sorted(default.f2l_pairs)
+    assert len(''.join(cube.falg)) <= len(''.join(default.falg))
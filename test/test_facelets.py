@@ -0,0 +1,68 @@
+"""
+Tests the compact facelet state of the Cube class against the dict form.
+"""
+import pytest
+
+from cfop.cube import Cube
+from cfop.facelets import (IDENTITY, compile_alg, compose, dict_to_facelets,
+                           facelets_to_dict, invert)
+import cfop.algorithms.tools as tl
+
+INITIAL_PERM = ['gobowrowb', 'ogbgoygwg', 'yrobgywww',
+                'wgrorrbby', 'ywwybygbo', 'rgrbyryor']
+ALL_TURNS = 'ULFRBDulfrbdTKEQACtkeqac!@#$%^123456Mm7xyzXYZ890'
+
+
+def test_conversion():
+    """
+    Test that converting to facelets and back gives the same dict.
+    """
+    perm = Cube(INITIAL_PERM).perm
+
+    assert dict_to_facelets(perm) == ''.join(INITIAL_PERM)
+    assert facelets_to_dict(dict_to_facelets(perm)) == perm
+
+
+@pytest.mark.parametrize('turn', ALL_TURNS)
+def test_turn(turn):
+    """
+    Test every turn and rotation on a compact cube against the dict form.
+    """
+    cube = Cube(INITIAL_PERM)
+    compact_cube = Cube(INITIAL_PERM, compact=True)
+    cube.apply_alg(turn)
+    compact_cube.apply_alg(turn)
+
+    assert compact_cube.perm == cube.perm, \
+        "Failed with the turn '{}'\n\n".format(turn) + \
+        "Got this permutation:\n{}\n\n".format(
+            tl.dict_to_list(compact_cube.perm)) + \
+        "Instead of this permutation:\n{}".format(tl.dict_to_list(cube.perm))
+
+
+def test_scramble():
+    """
+    Test a random scramble on a compact cube against the dict form.
+    """
+    scramble = tl.random_scramble(30)
+    cube = Cube()
+    compact_cube = Cube(compact=True)
+    cube.apply_alg(scramble)
+    compact_cube.apply_alg(scramble)
+
+    assert compact_cube.facelets == dict_to_facelets(cube.perm)
+    assert tl.dict_to_list(compact_cube.perm) == tl.dict_to_list(cube.perm)
+
+
+def test_compile_alg():
+    """
+    Test that a compiled algorithm matches the algorithm and its inverse.
+    """
+    alg = "R U R' U R U2 R'"
+    inverse = "R U2 R' U' R U' R'"
+
+    assert compile_alg(alg, True) == compile_alg(tl.alg_to_code(alg))
+    assert compose(compile_alg(alg, True), compile_alg(inverse, True)) == \
+        IDENTITY
+    assert invert(compile_alg(alg, True)) == compile_alg(inverse, True)
+    assert compile_alg('') == IDENTITY
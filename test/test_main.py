@@ -0,0 +1,47 @@
+"""
+Tests the command line solver in __main__.py.
+"""
+import json
+
+from cfop.__main__ import main
+from cfop.formats import parse_scramble
+
+SOLVED = ['wwwwwwwww', 'ooooooooo', 'ggggggggg', 'rrrrrrrrr', 'bbbbbbbbb',
+          'yyyyyyyyy']
+
+
+def test_parse_scramble():
+    """
+    Test that a line is read as a permutation if it is one and otherwise as
+    an algorithm.
+    """
+    assert parse_scramble(" R U R' U'\n") == "R U R' U'"
+    assert parse_scramble(str(SOLVED) + '\n') == SOLVED
+    assert parse_scramble(' '.join(SOLVED)) == SOLVED
+    assert parse_scramble(''.join(SOLVED)) == SOLVED
+    assert parse_scramble('[R U]') == '[R U]'
+
+
+def test_main(tmp_path, capsys):
+    """
+    Test that every line of a file is solved and written as a JSON line.
+    """
+    path = tmp_path / 'scrambles.txt'
+    path.write_text("F2 B2 L R' D\n\n{}\nR Q\n".format(SOLVED))
+
+    assert main([str(path), '--workers', '0']) == 0
+    solves = [json.loads(line)
+              for line in capsys.readouterr().out.splitlines()]
+
+    assert [solve['index'] for solve in solves] == [0, 1, 2]
+    assert solves[0]['step'] == 'solved'
+    moves = solves[0]['moves']
+    assert moves.pop('total') == sum(moves.values()) > 0
+    assert solves[1]['scramble'] == SOLVED
+    assert solves[1]['moves']['total'] == 0
+    assert solves[2]['error'] is not None
+    assert solves[0]['stats']['f2l']['expanded'] > 0
+
+    assert main([str(path), '--workers', '0', '--stats']) == 0
+    search = json.loads(capsys.readouterr().err)
+    assert search['expanded'] >= solves[0]['stats']['f2l']['expanded']
@@ -0,0 +1,62 @@
+"""
+Tests the OLL solving class.
+"""
+import pytest
+
+from cfop.oll import OLL, build_index
+from cfop.solver import Solver
+import cfop.algorithms.tools as tl
+
+# A few OLL algs so the tests don't need the speedsolving wiki
+OLL_ALGS = {'OLL 2': ["F R U R' U' F' f R U R' U' f'"],
+            'OLL 20': ["r U R' U' M2 U R U' R' U' M'"],
+            'OLL 21': ["(R U2 R') (U' R U R') (U' R U' R')"],
+            'OLL 22': ["R U2' R2' U' R2 U' R2' U2' R"],
+            'OLL 26': ["y' R U2 R' U' R U' R'"],
+            'OLL 27': ["R U R' U R U2 R'", "Rw U Rw' U Rw U2 Rw'"],
+            'OLL 33': ["R U R' U' R' F R F'"],
+            'OLL 45': ["F R U R' U' F'"],
+            'OLL 57': ["R U R' U' M' U R U' r'"]}
+INDEX = build_index(OLL_ALGS)
+
+
+def test_index():
+    """
+    Test that each case is in the index under all four pre-AUFs and that an
+    alg that doesn't keep the F2L is skipped.
+    """
+    cases = [case for case, _ in INDEX.values()]
+
+    assert len(set(cases)) == len(OLL_ALGS) + 1
+    assert cases.count('OLL 21') == 2
+    assert cases.count('OLL 20') == 1
+    assert all(alg[1:] != tl.wiki_to_code("Rw U Rw' U Rw U2 Rw'")
+               for _, alg in INDEX.values())
+
+
+@pytest.mark.parametrize('case', OLL_ALGS)
+def test_oll(case):
+    """
+    Test that the case an alg solves is found and solved from each pre-AUF.
+    """
+    for auf in ['', 'U', 'T', '!']:
+        cube = Solver()
+        cube.apply_alg(tl.invert_code(tl.wiki_to_code(OLL_ALGS[case][0])) +
+                       auf)
+        cube.solve_oll(INDEX)
+        cube.find_step()
+
+        assert cube.oll_case == case
+        assert cube.step in ['pll', 'solved'], \
+            'OLL {} with a pre-AUF of {} was not oriented.'.format(case, auf)
+
+
+def test_not_oll():
+    """
+    Test that a cube that isn't at the OLL step raises an exception.
+    """
+    cube = Solver()
+    cube.apply_alg('R')
+
+    with pytest.raises(Exception):
+        OLL(cube.perm, INDEX)
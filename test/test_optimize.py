@@ -0,0 +1,74 @@
+"""
+Tests the optimizer of whole solves.
+"""
+import pytest
+
+from cfop.algorithms.tools import (alg_to_code, code_to_alg, move_count,
+                                   random_scramble)
+from cfop.facelets import compile_alg
+from cfop.optimize import absorb_rotations, merge_moves, optimize, savings
+from cfop.solver import Solver
+
+
+@pytest.mark.parametrize('alg, merged', [
+    ("U U'", ''), ('U U2', "U'"), ('R L R', 'R2 L'), ("R U U' L R'", 'L'),
+    ("F2 B F2 B'", ''), ("x x' R", 'R'), ("M' r R", "M' r R"),
+    ("D U D' U' R", 'R')])
+def test_merge(alg, merged):
+    """
+    Test that moves on the same axis merge and cancel.
+    """
+    code = merge_moves(alg_to_code(alg))
+
+    assert (code_to_alg(code) if code else '') == merged
+    assert compile_alg(code) == compile_alg(alg_to_code(alg))
+
+
+def test_rotations():
+    """
+    Test that rotations are taken out without changing what the alg does
+    once the cube is turned back.
+    """
+    code = alg_to_code("y R U R' y' F x2 D")
+    moves, rotation = absorb_rotations(code)
+
+    assert not any(turn in 'xyzXYZ890' for turn in moves)
+    assert compile_alg(moves + rotation) == compile_alg(code)
+    assert rotation == '8'
+
+
+@pytest.mark.parametrize('num_repeat', range(20))
+def test_random(num_repeat):
+    """
+    Test that a random alg with every kind of turn does the same once
+    optimized and is never longer.
+    """
+    code = random_scramble(30) + 'yM' + random_scramble(5) + 'X7u'
+    optimized = optimize(code, keep_rotation=True)
+
+    assert compile_alg(optimized) == compile_alg(code), \
+        'The alg {} was optimized to {}.'.format(code, optimized)
+    assert savings(code, optimized)['saved'] >= 0
+
+
+def test_solver():
+    """
+    Test that the optimized solve still solves the cube and is never longer
+    than the stage algs.
+    """
+    scramble = random_scramble(20)
+    cube = Solver()
+    cube.apply_alg(scramble)
+    cube.solve_cross(inspection=True, workers=0)
+    cube.solve_f2l()
+    cube.solve_oll()
+    cube.solve_pll()
+    saved = cube.optimize()
+
+    check = Solver()
+    check.apply_alg(scramble + cube.opt_alg)
+    check.find_step()
+
+    assert check.step == 'solved'
+    assert saved['after'] == move_count(cube.opt_alg)
+    assert saved['saved'] >= 0
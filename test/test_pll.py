@@ -0,0 +1,55 @@
+"""
+Tests the PLL solving class.
+"""
+import pytest
+
+from cfop.pll import build_index
+from cfop.solver import Solver
+import cfop.algorithms.tools as tl
+
+# A few PLL algs so the tests don't need the speedsolving wiki
+PLL_ALGS = {'T Permutation': ["R U R' U' R' F R2 U' R' U' R U R' F'"],
+            'Ua Permutation': ["R U' R U R U R U' R' U' R2",
+                               "M2 U M U2 M' U M2"],
+            'Ub Permutation': ["R2 U R U R' U' R' U' R' U R'"],
+            'H Permutation': ["M2 U M2 U2 M2 U M2"],
+            'Aa Permutation': ["x R' U R' D2 R U' R' D2 R2 x'"],
+            'Jb Permutation': ["R U R' F' R U R' U' R' F R2 U' R'"],
+            'Y Permutation': ["F R U' R' U' R U R' F' R U R' U' R' F R F'"]}
+INDEX = build_index(PLL_ALGS)
+
+
+def test_index():
+    """
+    Test that every case is in the table and that the metric picks the alg.
+    """
+    cases = set(case for case, _ in INDEX.values())
+
+    assert cases == set(PLL_ALGS) | {'PLL skip'}
+    # H commutes with U so its 16 pairs of AUFs give only 4 signatures
+    assert [case for case, _ in INDEX.values()].count('H Permutation') == 4
+
+    stm = build_index(PLL_ALGS, 'stm')
+    ua = tl.wiki_to_code("M2 U M U2 M' U M2")
+    assert any(ua in alg for _, alg in stm.values())
+    assert not any(ua in alg for _, alg in INDEX.values())
+
+
+@pytest.mark.parametrize('case', PLL_ALGS)
+def test_pll(case):
+    """
+    Test that the case an alg solves is found and solved with every pre-AUF
+    and post-AUF.
+    """
+    alg = tl.invert_code(tl.wiki_to_code(PLL_ALGS[case][0]))
+    for post in ['', 'U', 'T', '!']:
+        for pre in ['', 'U', 'T', '!']:
+            cube = Solver()
+            cube.apply_alg(post + alg + pre)
+            cube.solve_pll(INDEX)
+            cube.find_step()
+
+            assert cube.pll_case == case
+            assert cube.step == 'solved', \
+                '{} with AUFs of {} and {} was not solved.'.format(case, pre,
+                                                                   post)
@@ -0,0 +1,80 @@
+"""
+Tests the bulk move scrambles and random states.
+"""
+import numpy as np
+
+from cfop.cube import CubeBatch
+from cfop.scramble import (TURN_SPACE, apply_moves, is_solvable,
+                           moves_to_codes, random_moves, random_states)
+from cfop.solver import solve_scramble
+
+
+def test_seed():
+    """
+    Test that the same seed gives the same scrambles and states.
+    """
+    assert (random_moves(100, seed=7) == random_moves(100, seed=7)).all()
+    assert (random_moves(100, seed=7) != random_moves(100, seed=8)).any()
+    assert (random_states(100, seed=7).states ==
+            random_states(100, seed=7).states).all()
+
+
+def test_moves():
+    """
+    Test that no face is turned twice in a row or right after its opposite
+    and that every turn is drawn.
+    """
+    moves = random_moves(5000, 25, seed=1)
+    faces = moves // 3
+
+    assert moves.shape == (5000, 25)
+    assert not (faces[:, 1:] == faces[:, :-1]).any(), 'Face turned twice'
+    assert not ((faces[:, 2:] == faces[:, :-2]) &
+                ((faces[:, 1:-1] + 3) % 6 == faces[:, 2:])).any(), \
+        'Face turned again after its opposite'
+    assert set(np.unique(moves)) == set(range(len(TURN_SPACE)))
+
+
+def test_codes():
+    """
+    Test that applying the moves matches applying their code syntax.
+    """
+    moves = random_moves(50, seed=2)
+    codes = moves_to_codes(moves)
+    batch = CubeBatch(len(codes))
+    batch.apply_algs(codes)
+
+    assert all(len(code) == 20 for code in codes)
+    assert (apply_moves(moves).states == batch.states).all()
+
+
+def test_is_solvable():
+    """
+    Test that scrambled cubes are solvable and that a twisted corner, a
+    flipped edge or two swapped edges are not.
+    """
+    batch = apply_moves(random_moves(500, seed=3))
+    assert is_solvable(batch).all()
+
+    states = np.repeat(CubeBatch(1).states, 3, axis=0)
+    # Twists the UFR corner, flips the UF edge and swaps the UF and UR edges
+    states[0, [8, 20, 27]] = states[0, [20, 27, 8]]
+    states[1, [7, 19]] = states[1, [19, 7]]
+    states[2, [7, 19, 5, 28]] = states[2, [5, 28, 7, 19]]
+
+    assert not is_solvable(states).any()
+
+
+def test_random_states():
+    """
+    Test that the random states are solvable and different and that the
+    solver solves them.
+    """
+    batch = random_states(1000, seed=4)
+
+    assert is_solvable(batch).all()
+    assert len(set(batch.facelets())) == 1000
+    for perm in batch.to_lists()[:3]:
+        result = solve_scramble(perm)
+        assert result['error'] is None and result['step'] == 'solved', \
+            'Could not solve the random state {}'.format(perm)
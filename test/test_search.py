@@ -0,0 +1,124 @@
+"""
+Tests the SearchStats record of the Cross and F2L searches.
+"""
+import pickle
+
+import pytest
+
+from cfop.cross import Cross
+from cfop.f2l import F2L
+from cfop.search import SearchStats
+from cfop.solver import Solver, solve_scramble
+
+SCRAMBLE = 'KET#KADRURC$@TE@EC%@'
+
+
+def _cube(stage=None):
+    """
+    Returns the scrambled cube and, if stage is 'cross', with its cross
+    solved.
+    """
+    cube = Solver()
+    cube.apply_alg(SCRAMBLE)
+    if stage == 'cross':
+        cube.solve_cross()
+
+    return cube
+
+
+def test_add():
+    """
+    Test that stats add up field by field with the peaks as the most and
+    that they sum, compare, pickle and convert to a dict.
+    """
+    one = SearchStats(generated=10, expanded=4, peak_open=7, depth=3,
+                      time=0.5)
+    two = SearchStats(generated=2, expanded=1, peak_open=9, depth=1,
+                      time=0.25)
+    total = one + two
+
+    assert (total.generated, total.expanded) == (12, 5)
+    assert (total.peak_open, total.depth) == (9, 3)
+    assert total.time == 0.75
+    assert sum([one, two]) == total == sum([two, one], SearchStats())
+    assert total.branching_factor == 12 / 5
+    assert SearchStats().branching_factor == 0
+    assert pickle.loads(pickle.dumps(total)) == total
+    assert SearchStats(**total.to_dict()) == total
+    assert set(total.to_dict()) == set(SearchStats.FIELDS)
+
+
+def test_cross_astar():
+    """
+    Test that the A* counts agree with each other: every node pushed was
+    evaluated and popped or left in the open set, and every pop was a node
+    expanded, a duplicate or the goal.
+    """
+    cube = _cube()
+    cross = Cross(cube.perm, 'astar')
+    stats = cross.stats
+
+    assert stats.expanded > 0 and stats.time > 0
+    assert stats.generated >= stats.expanded
+    assert stats.evaluations == stats.generated + 1
+    assert 0 < stats.peak_open <= stats.evaluations
+    assert stats.depth == len(cross.alg) <= 11
+    assert stats.heap_ops > stats.evaluations
+
+    table = Cross(cube.perm)
+    assert table.stats.expanded == table.stats.depth == len(table.alg)
+    assert table.stats.peak_open == table.stats.heap_ops == 0
+
+
+@pytest.mark.parametrize('method', ['table', 'astar'])
+def test_f2l(method):
+    """
+    Test that the F2L keeps the stats of each pair and adds them up.
+    """
+    cube = _cube('cross')
+    f2l = F2L(cube.perm, ['go', 'gr', 'bo', 'br'], method)
+
+    assert len(f2l.pair_stats) == 4
+    assert all(stats.expanded > 0 for stats in f2l.pair_stats)
+    assert f2l.stats == sum(f2l.pair_stats)
+    # A* can expand nodes deeper than the alg it finds
+    if method == 'table':
+        assert f2l.stats.depth == max(map(len, f2l.algs))
+    else:
+        assert f2l.stats.depth >= max(map(len, f2l.algs))
+
+
+def test_budget():
+    """
+    Test that the searches stop counting soon after the budget runs out
+    and that the greedy finish is counted.
+    """
+    cube = _cube('cross')
+    cube.solve_f2l(max_nodes=10)
+
+    assert not cube.optimal['f2l']
+    assert 10 < cube.stats['f2l'].expanded < 20
+    assert cube.stats['f2l'].generated > cube.stats['f2l'].expanded
+
+
+def test_solver():
+    """
+    Test that the Solver keeps the stats of each stage and that a solve
+    result has them.
+    """
+    cube = _cube()
+    cube.solve_cross()
+    cube.solve_f2l()
+
+    assert set(cube.stats) == {'cross', 'f2l'}
+    assert cube.search_stats == cube.stats['cross'] + cube.stats['f2l']
+    assert cube.pair_stats and cube.stats['f2l'] == sum(cube.pair_stats)
+
+    result = solve_scramble(SCRAMBLE)
+    assert set(result['stats']) == {'cross', 'f2l'}
+    assert result['stats']['f2l'].expanded == cube.stats['f2l'].expanded
+
+    cube = _cube()
+    cube.solve_cross(inspection=True, workers=0)
+    assert cube.stats['cross'] == sum(result['stats'] for result
+                                      in cube.inspection.values())
@@ -0,0 +1,117 @@
+"""
+Tests the local solve server.
+"""
+import asyncio
+import json
+
+from cfop.server import SolveServer
+
+SCRAMBLES = ["F2 B2 L R' D", "R U R' U'", 'R Q', "U2 F' L2 D B"]
+
+
+async def _request(address, method, target, body=b''):
+    """
+    Sends one HTTP request to the server and returns the status and the body
+    of the response.
+    """
+    reader, writer = await asyncio.open_connection(*address)
+    writer.write('{} {} HTTP/1.1\r\nHost: localhost\r\n'.format(
+        method, target).encode() +
+        'Content-Length: {}\r\n\r\n'.format(len(body)).encode() + body)
+    response = await reader.read()
+    writer.close()
+
+    head, _, body = response.partition(b'\r\n\r\n')
+    if b'chunked' in head:
+        chunks = b''
+        while True:
+            size, _, body = body.partition(b'\r\n')
+            if not int(size, 16):
+                break
+            chunks += body[:int(size, 16)]
+            body = body[int(size, 16) + 2:]
+        body = chunks
+
+    return int(head.split()[1]), body.decode()
+
+
+async def _serve_and_request():
+    """
+    Solves the scrambles with one request and with concurrent requests.
+    """
+    server = SolveServer(workers=1, max_batch=8, max_wait=0.05,
+                         max_body=1000, max_scrambles=len(SCRAMBLES))
+    await server.start()
+    try:
+        one = await _request(server.address, 'POST', '/solve',
+                             '\n'.join(SCRAMBLES).encode())
+        many = await asyncio.gather(*[
+            _request(server.address, 'POST', '/solve', scramble.encode())
+            for scramble in SCRAMBLES])
+        stats = await _request(server.address, 'GET', '/stats')
+        errors = [await _request(server.address, 'GET', '/solve'),
+                  await _request(server.address, 'GET', '/nothing'),
+                  await _request(server.address, 'POST', '/solve', b'\xff'),
+                  await _request(server.address, 'POST', '/solve',
+                                 '\n'.join(SCRAMBLES + ['R']).encode())]
+
+        # Only the headers are sent so the body is never read
+        reader, writer = await asyncio.open_connection(*server.address)
+        writer.write(b'POST /solve HTTP/1.1\r\nContent-Length: 1001\r\n\r\n')
+        errors.append(int((await reader.read()).split()[1]))
+        writer.close()
+    finally:
+        await server.close()
+
+    return one, many, stats, errors
+
+
+def test_server():
+    """
+    Test that the scrambles are solved in order, that concurrent requests
+    are batched together, that the stats are served and that bad or too
+    large requests are refused.
+    """
+    one, many, stats, errors = asyncio.run(_serve_and_request())
+
+    assert one[0] == 200
+    solves = [json.loads(line) for line in one[1].splitlines()]
+    assert [solve['scramble'] for solve in solves] == SCRAMBLES
+    assert [solve['step'] for solve in solves] == \
+        ['solved', 'solved', None, 'solved']
+
+    assert [json.loads(body)['algs'] for _, body in many] == \
+        [solve['algs'] for solve in solves]
+
+    stats = json.loads(stats[1])
+    assert stats['solved'] == 2 * len(SCRAMBLES)
+    # The concurrent requests were solved in fewer batches than requests
+    assert stats['batches'] < 2 * len(SCRAMBLES)
+    assert stats['queued'] == stats['in_flight'] == 0
+    assert stats['latency']['p50'] <= stats['latency']['p99']
+    assert stats['search']['expanded'] > 0
+
+    assert [status for status, _ in errors[:-1]] == [405, 404, 400, 413]
+    assert errors[-1] == 413
+
+
+def test_unix_socket(tmp_path):
+    """
+    Test that the server can be used over a Unix socket.
+    """
+    async def serve_and_request(path):
+        server = SolveServer(workers=1)
+        await server.start(path=path)
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b'GET /stats HTTP/1.1\r\n\r\n')
+            response = await reader.read()
+            writer.close()
+        finally:
+            await server.close()
+        return response
+
+    response = asyncio.run(serve_and_request(str(tmp_path / 'cfop.sock')))
+
+    assert response.startswith(b'HTTP/1.1 200')
+    assert json.loads(response.partition(b'\r\n\r\n')[2])['solved'] == 0
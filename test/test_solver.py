@@ -0,0 +1,180 @@
+"""
+Tests solving many cubes at once with solve_many.
+"""
+from itertools import count, islice
+
+import pytest
+
+from cfop.cube import CubeBatch
+from cfop.solver import STAGES, Solver, solve_many, solve_scramble
+import cfop.algorithms.tools as tl
+
+SCRAMBLES = [tl.random_scramble(20) for _ in range(6)]
+
+
+def _is_solved(result):
+    """
+    Returns if applying the algs of a result to its scramble solves the cube.
+    """
+    cube = Solver()
+    algs = result['algs']
+    cube.apply_alg(result['scramble'] + algs['cross'] + ''.join(algs['f2l']) +
+                   algs['oll'] + algs['pll'])
+    cube.find_step()
+
+    return cube.step == 'solved'
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_ordered(workers):
+    """
+    Test that every scramble is solved and yielded in the input order.
+    """
+    results = list(solve_many(SCRAMBLES, workers, chunksize=2))
+
+    assert [result['index'] for result in results] == list(range(6))
+    assert [result['scramble'] for result in results] == SCRAMBLES
+    for result in results:
+        assert result['step'] == 'solved' and result['error'] is None
+        assert sorted(result['times']) == sorted(STAGES)
+        assert _is_solved(result), \
+            'The scramble {} was not solved.'.format(result['scramble'])
+
+
+def test_unordered():
+    """
+    Test that the results in completion order are the same as in input
+    order.
+    """
+    ordered = list(solve_many(SCRAMBLES, 2, chunksize=1))
+    unordered = list(solve_many(SCRAMBLES, 2, chunksize=1, ordered=False))
+
+    assert sorted(result['index'] for result in unordered) == list(range(6))
+    assert sorted((result['index'], result['algs']) for result in unordered
+                  ) == [(result['index'], result['algs'])
+                        for result in ordered]
+
+
+def test_lazy():
+    """
+    Test that the scrambles are read as they are needed so an endless input
+    can be solved.
+    """
+    scrambles = (SCRAMBLES[n % 6] for n in count())
+    results = list(islice(solve_many(scrambles, 2, chunksize=2), 3))
+
+    assert [result['index'] for result in results] == [0, 1, 2]
+
+
+def test_error():
+    """
+    Test that a scramble that can't be read fails on its own.
+    """
+    results = list(solve_many(['Rw', "R U R'"], 0, alg_input=True))
+
+    assert results[0]['error'] is not None
+    assert results[1]['step'] == 'solved'
+
+
+def test_budget():
+    """
+    Test that a solve stops after a stage its budget cut short and still
+    says which step it got to and which searches finished.
+    """
+    result = solve_scramble('KET#KADRURC$@TE@EC%@', max_nodes=0)
+
+    assert result['error'] is None
+    assert result['step'] == 'f2l'
+    assert result['optimal'] == {'cross': True, 'f2l': False}
+    assert sorted(result['algs']) == ['cross', 'f2l']
+
+
+@pytest.mark.parametrize('num_repeat', range(3))
+def test_find_step(num_repeat):
+    """
+    Test that the step kept up to date by apply_alg is the same as the one
+    found from scratch for the cube after each stage, with rotations and
+    slices in between.
+    """
+    cube = Solver()
+    cube.apply_alg(tl.random_scramble(20))
+    stages = [lambda: cube.apply_alg('y'), cube.solve_cross,
+              cube.solve_f2l, lambda: cube.apply_alg('X7'),
+              lambda: cube.apply_alg('7x'), cube.solve_oll,
+              lambda: cube.apply_alg('9'), cube.solve_pll]
+
+    for stage in stages:
+        stage()
+        cube.find_step()
+
+        assert cube.step == CubeBatch([cube.perm]).find_steps()[0]
+
+    assert cube.step == 'solved'
+
+
+def test_turn_rotate():
+    """
+    Test that turns and rotations done with turn_rotate instead of apply_alg
+    keep the step found by find_step up to date.
+    """
+    cube = Solver()
+    for turn in [('cw', 'r'), ('ccw', 'y'), ('dt', 'm'), ('ccw', 'r'),
+                 ('cw', 'u', True)]:
+        cube.turn_rotate(*turn)
+        cube.find_step()
+
+        assert cube.step == CubeBatch([cube.perm]).find_steps()[0], \
+            'The step is wrong after turn_rotate{}'.format(turn)
+    assert cube.step == 'cross'
+
+
+def test_solve_iter():
+    """
+    Test that solve_iter yields each stage in order and that their algs
+    solve the cube.
+    """
+    scramble = tl.random_scramble(20)
+    cube = Solver()
+    cube.apply_alg(scramble)
+    events = list(cube.solve_iter())
+
+    assert [event.stage for event in events] == STAGES
+    assert cube.step == 'solved'
+    assert all(event.time >= 0 and event.optimal for event in events)
+    assert events[0].nodes > 0 and events[2].nodes == 0
+    assert [event.moves for event in events] == \
+        [tl.move_count(event.alg) for event in events]
+
+    check = Solver()
+    check.apply_alg(scramble + ''.join(event.alg for event in events))
+    check.find_step()
+
+    assert check.step == 'solved'
+
+
+def test_solve_iter_stop():
+    """
+    Test that solve_iter starts at the step the cube is at, stops when it is
+    closed and stops after a stage that didn't finish.
+    """
+    cube = Solver()
+    cube.apply_alg("RUQT")
+    events = cube.solve_iter()
+
+    assert next(events).stage == 'f2l'
+    events.close()
+    cube.find_step()
+    assert cube.step in ['oll', 'pll', 'solved']
+
+    cube = Solver()
+    cube.apply_alg('KET#KADRURC$@TE@EC%@')
+    events = list(cube.solve_iter(max_nodes=0))
+    cube.find_step()
+    assert [event.stage for event in events] == ['cross', 'f2l']
+    assert not events[-1].optimal
+    assert cube.step == 'f2l', 'The F2L was done without any nodes'
+
+    cube = Solver()
+    cube.solve_it()
+    assert cube.step == 'solved'
+    assert list(cube.solve_iter()) == []
@@ -0,0 +1,63 @@
+"""
+Tests the canonicalization of cube states under their symmetries.
+"""
+import pytest
+
+from cfop.algorithms.tools import invert_code, random_scramble
+from cfop.cube import CubeBatch
+from cfop.facelets import SOLVED, apply_perm, compile_alg
+from cfop.symmetry import (GROUPS, SYMMETRIES, canonical, canonical_many,
+                           to_canonical, to_original, transform)
+
+SCRAMBLES = [random_scramble(20) for _ in range(10)]
+
+
+def _state(alg):
+    """
+    Returns the facelets of a solved cube after alg.
+    """
+    return apply_perm(SOLVED, compile_alg(alg))
+
+
+def test_groups():
+    """
+    Test that there are 48 different symmetries and 8 that keep the Down
+    face.
+    """
+    assert len(set(perm for _, perm in SYMMETRIES)) == 48
+    assert len(GROUPS['down']) == 8
+
+
+@pytest.mark.parametrize('scramble', SCRAMBLES[:3])
+def test_solutions(scramble):
+    """
+    Test that the solution of a state mapped by any symmetry solves the
+    state it came from once mapped back.
+    """
+    state = _state(scramble)
+    solution = invert_code(scramble)
+    for symmetry in range(len(SYMMETRIES)):
+        mapped, trans = transform(state, symmetry)
+        mapped_solution = to_canonical(solution, trans)
+
+        assert apply_perm(mapped, compile_alg(mapped_solution)) == SOLVED
+        assert to_original(mapped_solution, trans) == solution
+
+
+@pytest.mark.parametrize('group', ['all', 'down'])
+def test_canonical(group):
+    """
+    Test that every state of a class has the same representative and that
+    the bulk path gives the same ones.
+    """
+    states = [_state(scramble) for scramble in SCRAMBLES]
+    reps = [canonical(state, group) for state in states]
+
+    for state, (rep, _) in zip(states, reps):
+        for symmetry in GROUPS[group]:
+            assert canonical(transform(state, symmetry)[0], group)[0] == rep
+
+    bulk_reps, symmetries = canonical_many(CubeBatch(states).states, group)
+
+    assert CubeBatch(bulk_reps).facelets() == [rep for rep, _ in reps]
+    assert list(symmetries) == [trans.symmetry for _, trans in reps]
@@ -28,3 +28,36 @@ def test_code_to_alg():
                '{} translated into {},'.format(turn, tl.code_to_alg(turn)) + \
                ' not {} as it should.'.format(ALG[n])
 
+
+def test_wiki_to_code():
+    """
+    Test the conversion of the algorithms as written on the speedsolving wiki
+    """
+    wiki = ["(y') Rw U2' R' E2 S'", "r U R' U' M' U R U' r'", "R3 U4"]
+    codes = ['Yr!Q6^eF', tl.alg_to_code("r U R' U' M' U R U' r'"), 'Q']
+
+    for alg, code in zip(wiki, codes):
+        assert tl.wiki_to_code(alg) == code, \
+               '{} translated into {},'.format(alg, tl.wiki_to_code(alg)) + \
+               ' not {} as it should.'.format(code)
+
+def test_invert_code():
+    """
+    Test that inverting each turn gives the inverse turn
+    """
+    for n, turn in enumerate(CODE):
+        inverse = tl.alg_to_code(ALG[n] + "'" if len(ALG[n]) == 1 else
+                                 ALG[n] if ALG[n][-1] == '2' else ALG[n][0])
+        assert tl.invert_code(turn) == inverse
+
+def test_move_count():
+    """
+    Test counting the moves of an algorithm in each metric
+    """
+    code = tl.alg_to_code("x R U2 M' r2 y'")
+    counts = {'htm': 5, 'stm': 4, 'qtm': 7}
+
+    for metric, count in counts.items():
+        assert tl.move_count(code, metric) == count, \
+               '{} has {} moves in {}'.format(code, count, metric) + \
+               ' but {} were counted.'.format(tl.move_count(code, metric))
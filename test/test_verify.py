@@ -0,0 +1,97 @@
+"""
+Tests the verifying and ranking of the OLL and PLL algorithms.
+"""
+from time import perf_counter
+
+from cfop.algorithms import oll_algs, pll_algs
+from cfop.algorithms.verify import rank_key, verify
+
+
+def test_database():
+    """
+    Test that every alg in the database passes and is already ranked.
+    """
+    for alg_set, algs in [('oll', oll_algs.get_algs()),
+                          ('pll', pll_algs.get_algs())]:
+        ranked, rejected = verify(algs, alg_set)
+
+        assert not rejected, \
+            'The {} algs {} did not pass.'.format(alg_set, rejected)
+        assert ranked == algs, \
+            'The {} algs in the database are not ranked.'.format(alg_set)
+
+
+def test_broken():
+    """
+    Test that algs that can't be read, that aren't at the right step or that
+    solve another case are rejected.
+    """
+    algs = {'OLL 45': ["FRUR'U'F'", "RUR'", "y2 F R U R' U' F'",
+                       'RUQ', "RUR'URU2R'"],
+            'OLL 27': ["RUR'URU2R'"]}
+    ranked, rejected = verify(algs, 'oll')
+
+    assert ranked == {'OLL 45': ["FRUR'U'F'", "y2 F R U R' U' F'"],
+                      'OLL 27': ["RUR'URU2R'"]}
+    assert sorted(rejected) == [
+        ('OLL 45', 'RUQ', 'could not be read'),
+        ('OLL 45', "RUR'", 'is not at the oll step'),
+        ('OLL 45', "RUR'URU2R'", 'solves another case')]
+
+
+def test_same_case():
+    """
+    Test that a case can't claim the case of another case, whether it loses
+    to more algs or ties with another case with one alg each.
+    """
+    algs = {'OLL 45': ["FRUR'U'F'", "y2 F R U R' U' F'"],
+            'OLL 27': ["FRUR'U'F'"],
+            'OLL 26': ["RUR'URU2R'"], 'OLL 21': ["y RUR'URU2R'"]}
+    ranked, rejected = verify(algs, 'oll')
+
+    assert ranked == {'OLL 45': ["FRUR'U'F'", "y2 F R U R' U' F'"],
+                      'OLL 27': [], 'OLL 26': [], 'OLL 21': []}
+    assert sorted(rejected) == [
+        ('OLL 21', "y RUR'URU2R'", 'solves the same case as OLL 26'),
+        ('OLL 26', "RUR'URU2R'", 'solves the same case as OLL 21'),
+        ('OLL 27', "FRUR'U'F'", 'solves the same case as OLL 45')]
+
+
+def test_aufs():
+    """
+    Test that an alg is the same case with any pre-AUF or post-AUF.
+    """
+    algs = {'T Permutation': ["RUR'U'R'FR2U'R'U'RUR'F'",
+                              "U'RUR'U'R'FR2U'R'U'RUR'F'U2",
+                              "RUR'U'R'FR2U'R'U'RUR'F'U"]}
+    ranked, rejected = verify(algs, 'pll')
+
+    assert not rejected
+    assert ranked['T Permutation'][0] == algs['T Permutation'][0]
+
+
+def test_rank():
+    """
+    Test that the algs are ranked by HTM, then STM, then rotations.
+    """
+    assert rank_key("R U R' U'") == (4, 4, 0)
+    assert rank_key("y R U M' U'") == (5, 4, 1)
+    assert sorted(["yRUR'", "RUM'", "RUR'"], key=rank_key) == \
+        ["RUR'", "yRUR'", "RUM'"]
+
+
+def test_speed():
+    """
+    Test that about a thousand algs are verified in well under a second.
+    """
+    aufs = ['', 'y', "y'", 'y2', 'U', "U'", 'U2', 'yU', "y'U2", "y2U'",
+            'Uy', "U'y'", 'U2y2', "yU'", "y'U", 'y2U2', 'x2z2']
+    algs = {case: [auf + alg for alg in case_algs for auf in aufs]
+            for case, case_algs in oll_algs.get_algs().items()}
+    verify(oll_algs.get_algs(), 'oll')
+
+    t0 = perf_counter()
+    ranked, rejected = verify(algs, 'oll')
+
+    assert perf_counter() - t0 < 0.5
+    assert sum(map(len, ranked.values())) > 1000 and not rejected